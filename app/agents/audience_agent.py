@@ -2,11 +2,13 @@ import json
 import re
 from langchain_core.prompts import ChatPromptTemplate
 
+from app.utils.llm_cache import llm_cache, parses_as_json
+
 class AudienceAgent:
     def __init__(self, llm):
         self.llm = llm
 
-    def run(self, company: str, product: str, icp: str, desc: str, comp_context: str, usecase_context: str) -> dict:
+    def _prompt(self):
         prompt = ChatPromptTemplate.from_messages([
             ("system", "You are an Audience Targeting Expert. Define the primary and secondary target audience profiles based on the use cases and initial ICP hint. Return strictly valid JSON."),
             ("human", """Company: {company}
@@ -19,11 +21,21 @@ Use cases: {usecase_context}
 Return JSON with exactly:
 {{"target_users": {{"primary": {{"profile": "...", "pain_points": ["..."], "motivations": ["..."]}}, "secondary": {{"profile": "...", "pain_points": ["..."], "motivations": ["..."]}}}}}}""")
         ])
-        
-        chain = prompt | self.llm
+        return prompt
+
+    def run(self, company: str, product: str, icp: str, desc: str, comp_context: str, usecase_context: str, use_cache: bool = True) -> dict:
+        try:
+            raw = llm_cache.invoke(self.llm, self._prompt(), {"company": company, "product": product, "icp": icp, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context}, "audience", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
+        except Exception as e:
+            print(f"[AudienceAgent] Error: {e}")
+            return {"target_users": {}}
+
+    async def arun(self, company: str, product: str, icp: str, desc: str, comp_context: str, usecase_context: str, use_cache: bool = True) -> dict:
+        """Async `run`: awaits the LLM without blocking the event loop; cancelling the caller aborts the request."""
         try:
-            result = chain.invoke({"company": company, "product": product, "icp": icp, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context})
-            return self._parse(result.content)
+            raw = await llm_cache.ainvoke(self.llm, self._prompt(), {"company": company, "product": product, "icp": icp, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context}, "audience", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
         except Exception as e:
             print(f"[AudienceAgent] Error: {e}")
             return {"target_users": {}}
@@ -2,11 +2,13 @@ import json
 import re
 from langchain_core.prompts import ChatPromptTemplate
 
+from app.utils.llm_cache import llm_cache, parses_as_json
+
 class CompetitionAgent:
     def __init__(self, llm):
         self.llm = llm
 
-    def run(self, company: str, product: str, desc: str, context: str) -> dict:
+    def _prompt(self):
         prompt = ChatPromptTemplate.from_messages([
             ("system", "You are an expert Competitive Intelligence Analyst. Identify the market competition, alternatives, and advantages for the specific product being launched based on the context. Return strictly valid JSON."),
             ("human", """Company: {company}
@@ -19,11 +21,21 @@ Scraped Context:
 Return JSON with exactly these keys:
 {{"competitors": ["Comp 1", "Comp 2"], "alternative_product": "What alternatives exist in the market?", "advantages": "How is this product better than alternatives?"}}""")
         ])
-        
-        chain = prompt | self.llm
+        return prompt
+
+    def run(self, company: str, product: str, desc: str, context: str, use_cache: bool = True) -> dict:
+        try:
+            raw = llm_cache.invoke(self.llm, self._prompt(), {"company": company, "product": product, "desc": desc, "context": context}, "competition", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
+        except Exception as e:
+            print(f"[CompetitionAgent] Error: {e}")
+            return {"competitors": [], "alternative_product": "", "advantages": ""}
+
+    async def arun(self, company: str, product: str, desc: str, context: str, use_cache: bool = True) -> dict:
+        """Async `run`: awaits the LLM without blocking the event loop; cancelling the caller aborts the request."""
         try:
-            result = chain.invoke({"company": company, "product": product, "desc": desc, "context": context})
-            return self._parse(result.content)
+            raw = await llm_cache.ainvoke(self.llm, self._prompt(), {"company": company, "product": product, "desc": desc, "context": context}, "competition", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
         except Exception as e:
             print(f"[CompetitionAgent] Error: {e}")
             return {"competitors": [], "alternative_product": "", "advantages": ""}
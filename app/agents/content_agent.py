@@ -10,12 +10,13 @@ import json
 import re
 import os
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-from typing import Optional
+from typing import Callable, Optional
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.output_parsers import JsonOutputParser
 
 from app.agents.prompt_templates import get_template_for_type, get_monthly_template
+from app.utils.llm_cache import llm_cache, parses_as_json
 from app.utils.vector_db import VectorDB
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -124,6 +125,18 @@ class ContentAgent:
 
         raise ValueError(f"Could not parse model output as JSON:\n{raw[:500]}")
 
+    def _invoke_json(self, prompt, invoke_inputs: dict, use_cache: bool = True) -> dict:
+        """
+        Invoke the LLM through the shared response cache and parse the JSON.
+        Only parseable responses are cached, so the raw fallback below never
+        replays a broken one.
+        """
+        raw = llm_cache.invoke(
+            self.llm, prompt, invoke_inputs, "content",
+            use_cache=use_cache, accept=parses_as_json,
+        )
+        return self.parser.parse(raw)
+
     def generate(
         self,
         brand: str,
@@ -134,6 +147,7 @@ class ContentAgent:
         content_types: list[str],
         template_type: str = "educational",
         caption_size: str = "average",
+        use_cache: bool = True,
     ) -> dict:
         """
         Single content piece generation (original behavior).
@@ -152,7 +166,6 @@ class ContentAgent:
         print(f"[ContentAgent] Retrieved {len(context)} chars of context")
 
         prompt = get_template_for_type(template_type, content_types)
-        chain = prompt | self.llm | self.parser
 
         print(f"[ContentAgent] Invoking Gemini ({GEMINI_MODEL}) with template '{template_type}'...")
 
@@ -169,7 +182,7 @@ class ContentAgent:
         }
 
         executor = ThreadPoolExecutor(max_workers=1)
-        future = executor.submit(chain.invoke, invoke_inputs)
+        future = executor.submit(self._invoke_json, prompt, invoke_inputs, use_cache)
         try:
             result = future.result(timeout=LLM_TIMEOUT)
             print("[ContentAgent] Generation successful.")
@@ -213,10 +226,14 @@ class ContentAgent:
         content_types: list[str],
         template_type: str = "educational",
         caption_size: str = "average",
+        use_cache: bool = True,
+        on_day: Optional[Callable[[dict], None]] = None,
     ) -> dict:
         """
         Generate a 7-day weekly content calendar.
-        Calls LLM in a single batch for all 7 days.
+        Calls LLM in a single batch for all 7 days. Identical inputs reuse
+        the cached response unless use_cache is False. on_day, if given, is
+        called with each day dict as soon as its batch is done.
 
         Returns:
             {"days": [{"day": 1, "content_type": "...", ...}, ...]}
@@ -243,6 +260,7 @@ class ContentAgent:
             day_end = min(day_start + DAYS_PER_BATCH - 1, TOTAL_DAYS)
 
             print(f"\n[ContentAgent] === Batch {batch_idx + 1}/{num_batches}: Days {day_start}-{day_end} ===")
+            batch_from = len(all_days)
 
             day_assignments_lines = []
             for day in range(day_start, day_end + 1):
@@ -277,9 +295,8 @@ class ContentAgent:
             print(f"[ContentAgent] Invoking Gemini for Days {day_start}-{day_end}...")
 
             try:
-                chain = prompt | self.llm | self.parser
                 executor = ThreadPoolExecutor(max_workers=1)
-                future = executor.submit(chain.invoke, invoke_inputs)
+                future = executor.submit(self._invoke_json, prompt, invoke_inputs, use_cache)
 
                 try:
                     batch_result = future.result(timeout=LLM_TIMEOUT)
@@ -325,6 +342,10 @@ class ContentAgent:
                         "error": str(e),
                     })
 
+            if on_day:
+                for day_content in all_days[batch_from:]:
+                    on_day(day_content)
+
         print(f"\n[ContentAgent] Weekly calendar complete: {len(all_days)} days generated")
 
         return {
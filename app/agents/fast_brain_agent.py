@@ -0,0 +1,74 @@
+import json
+import re
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.utils.llm_cache import llm_cache, parses_as_json
+
+class FastBrainAgent:
+    """
+    Single-call AI Brain: competition, use cases, objectives, audience and
+    positioning from one structured LLM call, instead of one agent each.
+    Trades some depth (later sections can't build on separately reasoned
+    earlier ones) for one round trip.
+    """
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def _prompt(self):
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", "You are a Brand Strategy team in one: Competitive Intelligence Analyst, Product Marketing Manager, Campaign Strategist, Audience Targeting Expert and Master Brand Strategist. Work through the sections in order, letting each build on the previous ones. Respect the tone. Return strictly valid JSON."),
+            ("human", """Company: {company}
+Product/Service: {product}
+Hint ICP: {icp}
+Tone: {tone}
+Campaign Description: {desc}
+
+Scraped Context:
+{context}
+
+Return JSON with exactly these keys:
+{{"competitors": ["Comp 1", "Comp 2"],
+"alternative_product": "What alternatives exist in the market?",
+"advantages": "How is this product better than alternatives?",
+"use_cases": [{{"title": "...", "description": "..."}}],
+"objectives": ["SMART objective 1", "SMART objective 2", "SMART objective 3"],
+"target_users": {{"primary": {{"profile": "...", "pain_points": ["..."], "motivations": ["..."]}}, "secondary": {{"profile": "...", "pain_points": ["..."], "motivations": ["..."]}}}},
+"positioning": {{"statement": "One clear positioning statement", "taglines": ["...", "...", "..."]}}}}""")
+        ])
+        return prompt
+
+    def run(self, company: str, product: str, icp: str, tone: str, desc: str, context: str, use_cache: bool = True) -> dict:
+        try:
+            raw = llm_cache.invoke(self.llm, self._prompt(), {"company": company, "product": product, "icp": icp, "tone": tone, "desc": desc, "context": context}, "fast_brain", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
+        except Exception as e:
+            print(f"[FastBrainAgent] Error: {e}")
+            return self._empty()
+
+    async def arun(self, company: str, product: str, icp: str, tone: str, desc: str, context: str, use_cache: bool = True) -> dict:
+        """Async `run`: awaits the LLM without blocking the event loop; cancelling the caller aborts the request."""
+        try:
+            raw = await llm_cache.ainvoke(self.llm, self._prompt(), {"company": company, "product": product, "icp": icp, "tone": tone, "desc": desc, "context": context}, "fast_brain", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
+        except Exception as e:
+            print(f"[FastBrainAgent] Error: {e}")
+            return self._empty()
+
+    @staticmethod
+    def _empty() -> dict:
+        return {
+            "competitors": [], "alternative_product": "", "advantages": "",
+            "use_cases": [], "objectives": [], "target_users": {}, "positioning": {},
+        }
+
+    def _parse(self, raw: str) -> dict:
+        cleaned = re.sub(r"```(?:json)?", "", raw).strip().rstrip("`").strip()
+        try:
+            return json.loads(cleaned)
+        except:
+            match = re.search(r"\{.*\}", cleaned, re.DOTALL)
+            if match:
+                try: return json.loads(match.group())
+                except: pass
+            return self._empty()
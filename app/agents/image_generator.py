@@ -9,6 +9,7 @@ and returns static URL paths for the frontend.
 import os
 import uuid
 from pathlib import Path
+from typing import Callable, Optional
 
 from google import genai
 from google.genai import types
@@ -171,7 +172,8 @@ class ImageGenerator:
             print(f"[ImageGenerator] Image generation failed: {e}")
             return None
 
-    def generate_for_days(self, days: list[dict], campaign_id: int, company_name: str = "", website_url: str = "", visual_identity: str = "", logo_path: str | None = None) -> list[dict]:
+    def generate_for_days(self, days: list[dict], campaign_id: int, company_name: str = "", website_url: str = "", visual_identity: str = "", logo_path: str | None = None,
+                          on_image: Optional[Callable[[int, Optional[str], str], None]] = None) -> list[dict]:
         """
         Generate images for all canonical post days in a content calendar.
 
@@ -182,6 +184,8 @@ class ImageGenerator:
             website_url: Website URL for branding context.
             visual_identity: Text analysis of the brand's visual style.
             logo_path: Path to the brand logo image to embed in generated images.
+            on_image: Called as on_image(day, slide, image_url) after each image is
+                saved; slide is None for single-image posts, else "1", "2"... or "cta".
 
         Returns:
             Updated list of day dicts with image_url populated.
@@ -202,6 +206,8 @@ class ImageGenerator:
                     if image_url:
                         day["image_url"] = image_url
                         print(f"[ImageGenerator] Day {day.get('day')}: {image_url}")
+                        if on_image:
+                            on_image(day.get("day"), None, image_url)
                     else:
                         print(f"[ImageGenerator] Day {day.get('day')}: Image generation failed, continuing.")
                 else:
@@ -231,6 +237,8 @@ class ImageGenerator:
                         if image_url:
                             slide["image_url"] = image_url
                             print(f"[ImageGenerator] Day {day.get('day')} Slide {idx+1}: {image_url}")
+                            if on_image:
+                                on_image(day.get("day"), str(idx + 1), image_url)
                         else:
                             print(f"[ImageGenerator] Day {day.get('day')} Slide {idx+1}: Image generation failed.")
 
@@ -255,6 +263,8 @@ class ImageGenerator:
                         if image_url:
                             cta_slide["image_url"] = image_url
                             print(f"[ImageGenerator] Day {day.get('day')} CTA Slide: {image_url}")
+                            if on_image:
+                                on_image(day.get("day"), "cta", image_url)
                         else:
                             print(f"[ImageGenerator] Day {day.get('day')} CTA Slide: Image generation failed.")
 
@@ -2,11 +2,13 @@ import json
 import re
 from langchain_core.prompts import ChatPromptTemplate
 
+from app.utils.llm_cache import llm_cache, parses_as_json
+
 class ObjectivesAgent:
     def __init__(self, llm):
         self.llm = llm
 
-    def run(self, company: str, product: str, desc: str, comp_context: str, usecase_context: str) -> dict:
+    def _prompt(self):
         prompt = ChatPromptTemplate.from_messages([
             ("system", "You are a Campaign Strategist. Define the SMART objectives for this campaign based on the use cases and competition. Return strictly valid JSON."),
             ("human", """Company: {company}
@@ -18,11 +20,21 @@ Use cases: {usecase_context}
 Return JSON with exactly:
 {{"objectives": ["Objective 1", "Objective 2", "Objective 3"]}}""")
         ])
-        
-        chain = prompt | self.llm
+        return prompt
+
+    def run(self, company: str, product: str, desc: str, comp_context: str, usecase_context: str, use_cache: bool = True) -> dict:
+        try:
+            raw = llm_cache.invoke(self.llm, self._prompt(), {"company": company, "product": product, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context}, "objectives", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
+        except Exception as e:
+            print(f"[ObjectivesAgent] Error: {e}")
+            return {"objectives": []}
+
+    async def arun(self, company: str, product: str, desc: str, comp_context: str, usecase_context: str, use_cache: bool = True) -> dict:
+        """Async `run`: awaits the LLM without blocking the event loop; cancelling the caller aborts the request."""
         try:
-            result = chain.invoke({"company": company, "product": product, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context})
-            return self._parse(result.content)
+            raw = await llm_cache.ainvoke(self.llm, self._prompt(), {"company": company, "product": product, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context}, "objectives", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
         except Exception as e:
             print(f"[ObjectivesAgent] Error: {e}")
             return {"objectives": []}
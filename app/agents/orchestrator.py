@@ -1,8 +1,11 @@
+import asyncio
+import hashlib
+import operator
 import os
-from typing import TypedDict, List, Optional
+from typing import Annotated, TypedDict, List, Optional
 
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from app.agents.content_agent import ContentAgent
@@ -15,8 +18,11 @@ from app.agents.objectives_agent import ObjectivesAgent
 from app.agents.audience_agent import AudienceAgent
 from app.agents.positioning_agent import PositioningAgent
 from app.agents.visual_analyzer_agent import VisualAnalyzerAgent
-from app.domain.brand.scraping_orchestrator import ScrapingOrchestrator
+from app.agents.fast_brain_agent import FastBrainAgent
+from app.domain.brand.scraping_orchestrator import ScrapingOrchestrator, POSTS_KEYS
 from app.domain.scraping.website_scraper import scrape_website
+from app.utils.graph_checkpointer import build_checkpointer
+from app.utils.semantic_cache import semantic_cache
 from app.utils.text_processor import TextProcessor
 from app.utils.vector_db import VectorDB
 
@@ -25,6 +31,9 @@ import json
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GEMINI_MODEL = "gemini-2.5-flash"
 LLM_TIMEOUT = int(os.getenv("LLM_TIMEOUT", "600"))
+# "full": one agent per strategy section; "fast": one combined LLM call.
+# Campaigns can override it per run via the brain_mode state key.
+AI_BRAIN_MODE = os.getenv("AI_BRAIN_MODE", "full")
 
 
 class AgentState(TypedDict):
@@ -43,204 +52,508 @@ class AgentState(TypedDict):
     twitter_handle: Optional[str]
     linkedin_handle: Optional[str]
     website_url: Optional[str]
+    force_refresh: bool
+    brain_mode: Optional[str]
+    use_llm_cache: bool
 
-    scraped_data: dict
+    # platform -> scrape summary; the raw scrape stays out of state
+    scraped_summaries: dict
     ai_brain: dict
     generated_content: dict
     publish_result: dict
 
 
+def _emit(event: str, **data):
+    """
+    Push a progress event onto the graph's "custom" stream (consumed by the
+    campaign job runner for SSE). A no-op when the graph isn't streaming it.
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return  # called outside a graph run
+    writer({"event": event, **data})
+
+
 # ---------------------------------------------------------------------------
 # Node 1: Scrape social media platforms and populate the vector DB
 # ---------------------------------------------------------------------------
-async def scrape_node(state: AgentState):
-    """Scrapes social media platforms AND the company website, then populates the vector DB."""
-    print(f"[Orchestrator] Running scrape_node for '{state['company_name']}'...")
+async def _scrape_company_website(state: AgentState) -> Optional[dict]:
+    """Scrape the company website; returns its data, or None if nothing usable."""
+    website_url = state.get("website_url")
+    if not (website_url and website_url.strip()):
+        return None
+    try:
+        print(f"[Orchestrator] Scraping website: {website_url}")
+        website_data = await scrape_website(website_url.strip(), force_refresh=state.get("force_refresh", False))
+
+        pages = website_data.get("pages", [])
+        if not pages:
+            print("[Orchestrator] Website scraping returned no pages.")
+            return None
+
+        # Print scraped content to console
+        print(f"\n{'='*60}")
+        print(f"[Orchestrator] WEBSITE SCRAPED CONTENT for '{state['company_name']}'")
+        print(f"{'='*60}")
+        for page in pages:
+            print(f"\n--- {page['url']} ---")
+            print(f"Title: {page.get('title', 'N/A')}")
+            print(f"Meta:  {page.get('meta_description', 'N/A')}")
+            print(f"Content:\n{page.get('content', '')}")
+        print(f"{'='*60}\n")
+        return website_data
+    except Exception as e:
+        print(f"[Orchestrator] Website scraping failed (non-fatal): {e}")
+        return None
 
-    # ── Social media scraping ─────────────────────────────────────────
-    scraped_data = await ScrapingOrchestrator.scrape_all_platforms(
-        instagram_handle=state.get("instagram_handle"),
-        linkedin_handle=state.get("linkedin_handle"),
-        twitter_handle=state.get("twitter_handle")
-    )
 
-    if not scraped_data:
-        scraped_data = {}
+def _scrape_summary(source: str, data: dict) -> dict:
+    """What later nodes need from a scrape result: its size and image URLs."""
+    if source == "website":
+        return {"pages": len(data.get("pages", []))}
+    posts = data.get(POSTS_KEYS[source], [])
+    return {"items": len(posts), "image_urls": [p["image_url"] for p in posts if p.get("image_url")]}
 
-    # ── Website scraping ──────────────────────────────────────────────
-    website_url = state.get("website_url")
-    if website_url and website_url.strip():
-        try:
-            print(f"[Orchestrator] Scraping website: {website_url}")
-            website_data = scrape_website(website_url.strip())
-
-            pages = website_data.get("pages", [])
-            if pages:
-                # Print scraped content to console
-                print(f"\n{'='*60}")
-                print(f"[Orchestrator] WEBSITE SCRAPED CONTENT for '{state['company_name']}'")
-                print(f"{'='*60}")
-                for page in pages:
-                    print(f"\n--- {page['url']} ---")
-                    print(f"Title: {page.get('title', 'N/A')}")
-                    print(f"Meta:  {page.get('meta_description', 'N/A')}")
-                    print(f"Content:\n{page.get('content', '')}")
-                print(f"{'='*60}\n")
-
-                # Add to scraped_data so it gets processed together
-                scraped_data["website"] = website_data
-            else:
-                print("[Orchestrator] Website scraping returned no pages.")
-        except Exception as e:
-            print(f"[Orchestrator] Website scraping failed (non-fatal): {e}")
 
-    # ── Process & embed all scraped data ──────────────────────────────
-    if scraped_data:
-        text_processor = TextProcessor()
-        vector_db = VectorDB()
-        chunks = text_processor.process_all_platforms(scraped_data, state['company_name'])
+async def scrape_node(state: AgentState):
+    """
+    Scrapes social media platforms AND the company website, then populates the vector DB.
+    Each source is processed and embedded as soon as its scrape finishes,
+    while the slower ones are still running. Graph state only gets a
+    summary of each result (see _scrape_summary); the raw data ends up in
+    the vector DB.
+    """
+    company_name = state['company_name']
+    print(f"[Orchestrator] Running scrape_node for '{company_name}'...")
 
+    text_processor = TextProcessor()
+    vector_db = VectorDB()
+    scraped_summaries = {}
+
+    async def _embed(source: str, data: dict):
+        summary = scraped_summaries[source] = _scrape_summary(source, data)
+        _emit("scrape_done", platform=source, items=summary.get("items", summary.get("pages", 0)))
+        chunks = text_processor.process_all_platforms({source: data}, company_name)
+        failed = 0
         if chunks:
-            print(f"[Orchestrator] Embedding {len(chunks)} chunks into vector DB...")
-            vector_db.add_posts(state['company_name'], chunks)
+            print(f"[Orchestrator] Embedding {len(chunks)} {source} chunks into vector DB...")
+            # Off the event loop so the other scrapes keep making progress
+            failed = await asyncio.to_thread(vector_db.add_posts, company_name, chunks)
+        if source in POSTS_KEYS:
+            if failed:
+                # Unmarked posts come back in the next delta and are retried
+                print(f"[Orchestrator] {failed} {source} chunks failed to embed; not advancing its high-water mark")
+            else:
+                ScrapingOrchestrator.record_high_water_marks(source, state[f"{source}_handle"], data)
 
-    return {"scraped_data": scraped_data or {}}
+    # ── Website scraping runs alongside the social platforms ──────────
+    website_task = asyncio.create_task(_scrape_company_website(state))
+
+    # ── Social media scraping, embedded platform by platform ──────────
+    async for platform, data in ScrapingOrchestrator.scrape_platforms_as_completed(
+        instagram_handle=state.get("instagram_handle"),
+        linkedin_handle=state.get("linkedin_handle"),
+        twitter_handle=state.get("twitter_handle"),
+        force_refresh=state.get("force_refresh", False),
+        brand=company_name
+    ):
+        await _embed(platform, data)
+
+    website_data = await website_task
+    if website_data:
+        await _embed("website", website_data)
+
+    return {"scraped_summaries": scraped_summaries}
 
 
 # ---------------------------------------------------------------------------
-# Node 2: AI Brain — run the strategy agents sequentially
+# Node 2: AI Brain — strategy agents as a fan-out/fan-in subgraph
 # ---------------------------------------------------------------------------
-async def ai_brain_node(state: AgentState):
-    """Runs Competition → Usecase → Objectives → Audience → Positioning → VisualAnalyzer agents."""
-    company_name = state["company_name"]
-    product_service = state.get("product_service", "")
-    icp = state.get("icp", "")
-    tone = state.get("tone", "")
-    description = state.get("description", "")
-    campaign_id = state.get("campaign_id", 0)
+class BrainState(TypedDict, total=False):
+    # Inputs, shared with AgentState
+    campaign_id: int
+    company_name: str
+    product_service: str
+    icp: str
+    tone: str
+    description: str
+    scraped_summaries: dict
+    instagram_handle: Optional[str]
+    twitter_handle: Optional[str]
+    linkedin_handle: Optional[str]
+    brain_mode: Optional[str]
+    use_llm_cache: bool
+    force_refresh: bool
+
+    # Intermediate agent outputs
+    brand_context: str
+    context_digest: str
+    # Agents that ran fresh (semantic cache miss or bypass) this run
+    semantic_misses: Annotated[List[str], operator.add]
+    competition: dict
+    usecase: dict
+    objectives: dict
+    audience: dict
+    positioning: dict
+    visual_identity: str
+
+    # Output, returned to the parent graph
+    ai_brain: dict
+
+
+_brain_llm = None
+_brain_vector_db = None
 
+
+def _get_brain_llm() -> ChatGoogleGenerativeAI:
+    """Shared LLM client for the strategy agents."""
+    global _brain_llm
+    if _brain_llm is None:
+        _brain_llm = ChatGoogleGenerativeAI(
+            model=GEMINI_MODEL,
+            google_api_key=GOOGLE_API_KEY,
+            temperature=0.7,
+            max_output_tokens=8192,
+            timeout=LLM_TIMEOUT,
+        )
+    return _brain_llm
+
+
+def _get_brain_vector_db() -> VectorDB:
+    global _brain_vector_db
+    if _brain_vector_db is None:
+        _brain_vector_db = VectorDB()
+    return _brain_vector_db
+
+
+# Agent insight written to memory -> BrainState key holding it
+_INSIGHT_KEYS = {
+    "competition": "competition",
+    "usecase": "usecase",
+    "objectives": "objectives",
+    "audience": "audience",
+    "positioning": "positioning",
+    "visual": "visual_identity",
+}
+# Pending background memory writes (strong refs so they aren't garbage collected)
+_memory_writes: set = set()
+
+
+def _save_to_memory(company_name: str, campaign_id: int, insights: dict):
+    """Writes all of a run's agent insights in one chunked, batch-embedded add."""
+    try:
+        _get_brain_vector_db().add_texts(
+            company=company_name,
+            texts=list(insights.values()),
+            metadatas=[
+                {"type": "agent_insight", "campaign_id": campaign_id, "agent": agent_type}
+                for agent_type in insights
+            ]
+        )
+        print(f"[Orchestrator] Saved {len(insights)} agent insights to memory")
+    except Exception as e:
+        print(f"[Orchestrator] Failed to save memory to vector DB: {e}")
+
+
+def _schedule_memory_write(state: BrainState):
+    """
+    Saves the agent outputs to the vector DB in a background task, off the
+    campaign's critical path: the response never waits on the embedding
+    calls, and a failed write only logs.
+    """
+    insights = {
+        agent_type: str(state[key])
+        for agent_type, key in _INSIGHT_KEYS.items()
+        if state.get(key) and state.get(key) != "No visual context analyzed."
+    }
+    if not insights:
+        return
+    task = asyncio.create_task(asyncio.to_thread(
+        _save_to_memory, state["company_name"], state.get("campaign_id", 0), insights
+    ))
+    _memory_writes.add(task)
+    task.add_done_callback(_memory_writes.discard)
+
+
+async def wait_for_memory_writes():
+    """Lets pending background memory writes finish, e.g. before shutdown."""
+    if _memory_writes:
+        await asyncio.gather(*_memory_writes, return_exceptions=True)
+
+
+async def brain_context_node(state: BrainState):
+    """Retrieves the scraped brand context the strategy agents share."""
+    company_name = state["company_name"]
     print(f"\n{'='*50}")
     print(f"[Orchestrator] Starting AI Brain Pipeline for {company_name}")
     print(f"{'='*50}")
 
-    # --- Shared LLM & vector DB ------------------------------------------
-    llm = ChatGoogleGenerativeAI(
-        model=GEMINI_MODEL,
-        google_api_key=GOOGLE_API_KEY,
-        temperature=0.7,
-        max_output_tokens=8192,
-        timeout=LLM_TIMEOUT,
-    )
-    vector_db = VectorDB()
-
-    # --- Retrieve scraped context from vector DB -------------------------
-    def _get_brand_context(query: str, top_k: int = 10) -> str:
-        try:
-            results = vector_db.search(company_name=company_name, query=query, top_k=top_k)
-            if not results:
-                return "No past context available."
+    query = f"{company_name} brand context, {state.get('product_service', '')}, {state.get('description', '')}"
+    try:
+        results = await asyncio.to_thread(
+            _get_brain_vector_db().search, company_name=company_name, query=query, top_k=15
+        )
+        if not results:
+            brand_context = "No past context available."
+        else:
             chunks = [
                 f"[Context {i}]\n{r.get('text', '').strip()}"
                 for i, r in enumerate(results, 1)
                 if r.get('text', '').strip()
             ]
-            return "\n\n".join(chunks)
-        except Exception as e:
-            print(f"[Orchestrator] Vector DB retrieval failed: {e}")
-            return "Context retrieval failed."
-
-    def _save_to_memory(agent_type: str, data_str: str):
-        try:
-            vector_db.add_texts(
-                company=company_name,
-                texts=[data_str],
-                metadatas=[{"type": "agent_insight", "campaign_id": campaign_id, "agent": agent_type}]
-            )
-        except Exception as e:
-            print(f"[Orchestrator] Failed to save memory to vector DB: {e}")
-
-    scraped_context = _get_brand_context(
-        f"{company_name} brand context, {product_service}, {description}", top_k=15
+            brand_context = "\n\n".join(chunks)
+    except Exception as e:
+        print(f"[Orchestrator] Vector DB retrieval failed: {e}")
+        brand_context = "Context retrieval failed."
+    return {"brand_context": brand_context,
+            "context_digest": await asyncio.to_thread(_context_digest, company_name, brand_context)}
+
+
+def _context_digest(company_name: str, brand_context: str) -> str:
+    """
+    Scopes semantic cache entries to the brand's ingested content: a digest
+    of its scraped doc ids, so newly ingested posts or pages start fresh
+    while campaigns with other products or descriptions (which change the
+    retrieved context) still share entries. Agent insights are left out.
+    Falls back to the retrieved context itself if the ids can't be read.
+    """
+    try:
+        key = "\n".join(_get_brain_vector_db().scraped_doc_ids(company_name))
+    except Exception as e:
+        print(f"[Orchestrator] Could not list scraped docs for the cache key: {e}")
+        key = "context:" + brand_context
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _campaign_fields(state: BrainState, *extra: str) -> dict:
+    """Campaign inputs an agent's output depends on, for the semantic cache."""
+    fields = {"product": state.get("product_service", ""), "description": state.get("description", "")}
+    for name in extra:
+        fields[name] = state.get(name, "")
+    return fields
+
+
+# Brain nodes whose output goes through the semantic cache
+SEMANTIC_CACHED_NODES = ("competition", "usecase", "objectives", "audience", "positioning", "fast")
+
+
+async def _semantic_cached(state: BrainState, agent_type: str, fields: dict, run, upstream=()):
+    """
+    Runs an agent through the semantic cache: a near-identical earlier
+    campaign for the same brand and ingested content reuses its output.
+    Bypassed when the run opts out of caching or re-scrapes (force_refresh),
+    and when an `upstream` agent whose output this one builds on ran fresh
+    this run, so cached and fresh outputs aren't mixed.
+    Returns (output, state update recording a miss).
+    """
+    fresh_upstream = [agent for agent in upstream if agent in state.get("semantic_misses", [])]
+    output, hit = await semantic_cache.get_or_run(
+        state["company_name"], agent_type, fields, run,
+        use_cache=(state.get("use_llm_cache", True) and not state.get("force_refresh", False)
+                   and not fresh_upstream),
+        accept=lambda out: any(out.values()),
+        context_key=state.get("context_digest", ""),
+    )
+    return output, ({} if hit else {"semantic_misses": [agent_type]})
+
+
+async def brain_competition_node(state: BrainState):
+    print("[AI Brain] Running CompetitionAgent...")
+    competition_out, misses = await _semantic_cached(
+        state, "competition", _campaign_fields(state),
+        lambda: CompetitionAgent(_get_brain_llm()).arun(
+            state["company_name"], state.get("product_service", ""), state.get("description", ""),
+            state["brand_context"],
+            use_cache=state.get("use_llm_cache", True)
+        ),
+    )
+    return {"competition": competition_out, **misses}
+
+
+async def brain_usecase_node(state: BrainState):
+    print("[AI Brain] Running UsecaseAgent...")
+    usecase_out, misses = await _semantic_cached(
+        state, "usecase", _campaign_fields(state),
+        lambda: UsecaseAgent(_get_brain_llm()).arun(
+            state["company_name"], state.get("product_service", ""), state.get("description", ""),
+            state["brand_context"], str(state["competition"]),
+            use_cache=state.get("use_llm_cache", True)
+        ),
+        upstream=("competition",),
     )
+    return {"usecase": usecase_out, **misses}
+
+
+async def brain_objectives_node(state: BrainState):
+    print("[AI Brain] Running ObjectivesAgent...")
+    objectives_out, misses = await _semantic_cached(
+        state, "objectives", _campaign_fields(state),
+        lambda: ObjectivesAgent(_get_brain_llm()).arun(
+            state["company_name"], state.get("product_service", ""), state.get("description", ""),
+            str(state["competition"]), str(state["usecase"]),
+            use_cache=state.get("use_llm_cache", True)
+        ),
+        upstream=("competition", "usecase"),
+    )
+    return {"objectives": objectives_out, **misses}
+
+
+async def brain_audience_node(state: BrainState):
+    print("[AI Brain] Running AudienceAgent...")
+    audience_out, misses = await _semantic_cached(
+        state, "audience", _campaign_fields(state, "icp"),
+        lambda: AudienceAgent(_get_brain_llm()).arun(
+            state["company_name"], state.get("product_service", ""), state.get("icp", ""),
+            state.get("description", ""), str(state["competition"]), str(state["usecase"]),
+            use_cache=state.get("use_llm_cache", True)
+        ),
+        upstream=("competition", "usecase"),
+    )
+    return {"audience": audience_out, **misses}
+
+
+async def brain_positioning_node(state: BrainState):
+    print("[AI Brain] Running PositioningAgent...")
+    positioning_out, misses = await _semantic_cached(
+        state, "positioning", _campaign_fields(state, "icp", "tone"),
+        lambda: PositioningAgent(_get_brain_llm()).arun(
+            state["company_name"], state.get("product_service", ""), state.get("tone", ""),
+            state.get("description", ""), str(state["competition"]), str(state["usecase"]),
+            str(state["audience"]),
+            use_cache=state.get("use_llm_cache", True)
+        ),
+        upstream=("competition", "usecase", "audience"),
+    )
+    return {"positioning": positioning_out, **misses}
+
+
+async def brain_fast_node(state: BrainState):
+    """Fast mode: every strategy section from one LLM call, in the per-agent output shapes."""
+    print("[AI Brain] Running FastBrainAgent (single call)...")
+    out, misses = await _semantic_cached(
+        state, "fast_brain", _campaign_fields(state, "icp", "tone"),
+        lambda: FastBrainAgent(_get_brain_llm()).arun(
+            state["company_name"], state.get("product_service", ""), state.get("icp", ""),
+            state.get("tone", ""), state.get("description", ""), state["brand_context"],
+            use_cache=state.get("use_llm_cache", True)
+        ),
+    )
+    sections = {
+        "competition": {
+            "competitors": out.get("competitors", []),
+            "alternative_product": out.get("alternative_product", ""),
+            "advantages": out.get("advantages", ""),
+        },
+        "usecase": {"use_cases": out.get("use_cases", [])},
+        "objectives": {"objectives": out.get("objectives", [])},
+        "audience": {"target_users": out.get("target_users", {})},
+        "positioning": {"positioning": out.get("positioning", {})},
+    }
+    return {**sections, **misses}
+
 
-    # --- Agent 1: Competition --------------------------------------------
-    print("[Agent 1/5] Running CompetitionAgent...")
-    competition_agent = CompetitionAgent(llm)
-    competition_out = competition_agent.run(company_name, product_service, description, scraped_context)
-    _save_to_memory("competition", str(competition_out))
-
-    # --- Agent 2: Use-case ------------------------------------------------
-    print("[Agent 2/5] Running UsecaseAgent...")
-    usecase_agent = UsecaseAgent(llm)
-    usecase_out = usecase_agent.run(company_name, product_service, description, scraped_context, str(competition_out))
-    _save_to_memory("usecase", str(usecase_out))
-
-    # --- Agent 3: Objectives ----------------------------------------------
-    print("[Agent 3/5] Running ObjectivesAgent...")
-    objectives_agent = ObjectivesAgent(llm)
-    objectives_out = objectives_agent.run(company_name, product_service, description, str(competition_out), str(usecase_out))
-    _save_to_memory("objectives", str(objectives_out))
-
-    # --- Agent 4: Audience ------------------------------------------------
-    print("[Agent 4/5] Running AudienceAgent...")
-    audience_agent = AudienceAgent(llm)
-    audience_out = audience_agent.run(company_name, product_service, icp, description, str(competition_out), str(usecase_out))
-    _save_to_memory("audience", str(audience_out))
-
-    # --- Agent 5: Positioning ---------------------------------------------
-    print("[Agent 5/5] Running PositioningAgent...")
-    positioning_agent = PositioningAgent(llm)
-    positioning_out = positioning_agent.run(company_name, product_service, tone, description, str(competition_out), str(usecase_out), str(audience_out))
-    _save_to_memory("positioning", str(positioning_out))
-
-    # --- Agent 6: Visual Analyzer -----------------------------------------
-    print("[Agent 6/6] Running VisualAnalyzerAgent...")
-    scraped_data = state.get("scraped_data", {})
+def _route_brain_mode(state: BrainState) -> str:
+    mode = state.get("brain_mode") or AI_BRAIN_MODE
+    if mode not in ("full", "fast"):
+        print(f"[AI Brain] Unknown brain mode '{mode}', using full")
+        mode = "full"
+    print(f"[AI Brain] Mode: {mode}")
+    return "fast" if mode == "fast" else "competition"
+
+
+def _brand_image_urls(state: BrainState) -> List[str]:
+    """
+    This run's scraped images, then the brand's earlier known ones: an
+    incremental scrape often returns few or no new posts.
+    """
+    scraped_summaries = state.get("scraped_summaries") or {}
     image_urls = []
-    
-    # Extract from Instagram
-    ig_data = scraped_data.get("instagram", {})
-    if ig_data:
-        for post in ig_data.get("last_10_posts_and_reels", []):
-            if post.get("image_url"):
-                image_urls.append(post.get("image_url"))
-                
-    # Extract from LinkedIn
-    li_data = scraped_data.get("linkedin", {})
-    if li_data:
-        for post in li_data.get("recent_posts", []):
-            if post.get("image_url"):
-                image_urls.append(post.get("image_url"))
-                
-    # Extract from Twitter
-    tw_data = scraped_data.get("twitter", {})
-    if tw_data:
-        for post in tw_data.get("posts", []):
-            if post.get("image_url"):
-                image_urls.append(post.get("image_url"))
-                
-    visual_identity = "No visual context analyzed."
-    if image_urls:
-        visual_agent = VisualAnalyzerAgent()
-        visual_identity = await visual_agent.analyze_images(company_name, image_urls)
-        _save_to_memory("visual", visual_identity)
-
-    # --- Assemble AI Brain ------------------------------------------------
+    for platform in ("instagram", "linkedin", "twitter"):
+        image_urls.extend((scraped_summaries.get(platform) or {}).get("image_urls", []))
+        handle = state.get(f"{platform}_handle")
+        if handle:
+            image_urls.extend(ScrapingOrchestrator.known_image_urls(platform, handle))
+    return list(dict.fromkeys(image_urls))
+
+
+async def brain_visual_node(state: BrainState):
+    """Analyzes the brand's post images; needs nothing from the other agents."""
+    print("[AI Brain] Running VisualAnalyzerAgent...")
+    image_urls = _brand_image_urls(state)
+    if not image_urls:
+        return {"visual_identity": "No visual context analyzed."}
+
+    visual_identity = await VisualAnalyzerAgent().analyze_images(
+        state["company_name"], image_urls, use_cache=state.get("use_llm_cache", True)
+    )
+    return {"visual_identity": visual_identity}
+
+
+async def brain_assemble_node(state: BrainState):
+    """Fan-in: combines the agent outputs into the ai_brain dict and queues their memory write."""
+    competition_out = state.get("competition", {})
     ai_brain = {
         "competitors": competition_out.get("competitors", []),
         "alternative_product": competition_out.get("alternative_product", ""),
         "advantages": competition_out.get("advantages", ""),
-        "use_cases": usecase_out.get("use_cases", []),
-        "objectives": objectives_out.get("objectives", []),
-        "target_users": audience_out.get("target_users", {}),
-        "positioning": positioning_out.get("positioning", {}),
-        "visual_identity": visual_identity,
+        "use_cases": state.get("usecase", {}).get("use_cases", []),
+        "objectives": state.get("objectives", {}).get("objectives", []),
+        "target_users": state.get("audience", {}).get("target_users", {}),
+        "positioning": state.get("positioning", {}).get("positioning", {}),
+        "visual_identity": state.get("visual_identity", "No visual context analyzed."),
     }
-
     print("[Orchestrator] AI Brain Generation Complete!")
+    _schedule_memory_write(state)
     return {"ai_brain": ai_brain}
 
 
+def build_ai_brain_graph():
+    """Builds the AI Brain subgraph.
+
+    Flow (independent branches run concurrently):
+      START ─┬─ context ─┬─ competition → usecase ─┬─ objectives ─────────────┐
+             │           │                         └─ audience → positioning ─┼─ assemble → END
+             │           └─ fast (fast mode only) ────────────────────────────┤
+             └─ visual ───────────────────────────────────────────────────────┘
+
+    The critical path is four LLM calls (competition, usecase, audience,
+    positioning); objectives and the visual analysis run alongside it.
+    In fast mode (brain_mode / AI_BRAIN_MODE = "fast") context is followed
+    by a single combined call instead, still alongside visual.
+    Agents run via their async `arun`, so LLM calls never block the event
+    loop, and cancelling the graph run cancels the in-flight requests.
+    Strategy agents go through the semantic cache, so a near-repeat
+    campaign for the same brand reuses earlier outputs. Their insights are
+    saved to the vector DB in one background write once assemble runs.
+    """
+    builder = StateGraph(BrainState)
+
+    builder.add_node("context", brain_context_node)
+    builder.add_node("competition", brain_competition_node)
+    builder.add_node("usecase", brain_usecase_node)
+    builder.add_node("objectives", brain_objectives_node)
+    builder.add_node("audience", brain_audience_node)
+    builder.add_node("positioning", brain_positioning_node)
+    builder.add_node("visual", brain_visual_node)
+    builder.add_node("fast", brain_fast_node)
+    builder.add_node("assemble", brain_assemble_node)
+
+    builder.add_edge(START, "context")
+    builder.add_edge(START, "visual")
+    builder.add_conditional_edges("context", _route_brain_mode, ["competition", "fast"])
+    builder.add_edge("competition", "usecase")
+    builder.add_edge("usecase", "objectives")
+    builder.add_edge("usecase", "audience")
+    builder.add_edge("audience", "positioning")
+    # Fan-in: assemble waits for every branch of whichever mode ran
+    builder.add_edge(["objectives", "positioning", "visual"], "assemble")
+    builder.add_edge(["fast", "visual"], "assemble")
+    builder.add_edge("assemble", END)
+
+    return builder.compile()
+
+
 # ---------------------------------------------------------------------------
 # Node 3: Content generation — 7-day calendar via RAG
 # ---------------------------------------------------------------------------
@@ -265,7 +578,9 @@ def generate_node(state: AgentState):
         caption_size=state.get('caption_size', 'average'),
         description=enhanced_description,
         content_types=state['content_types'],
-        template_type=state['template_type']
+        template_type=state['template_type'],
+        use_cache=state.get('use_llm_cache', True),
+        on_day=lambda day: _emit("day_generated", day=day)
     )
 
     return {"generated_content": monthly_content}
@@ -320,7 +635,8 @@ def image_gen_node(state: AgentState):
             company_name=state.get("company_name", ""),
             website_url=state.get("website_url", ""),
             visual_identity=visual_identity,
-            logo_path=logo_path
+            logo_path=logo_path,
+            on_image=lambda day, slide, url: _emit("image_ready", day=day, slide=slide, image_url=url)
         )
         generated_content["days"] = updated_days
         
@@ -361,7 +677,8 @@ def video_gen_node(state: AgentState):
             campaign_id,
             company_name=state.get("company_name", ""),
             website_url=state.get("website_url", ""),
-            visual_identity=visual_identity
+            visual_identity=visual_identity,
+            on_video=lambda day, url: _emit("video_ready", day=day, video_url=url)
         )
         generated_content["days"] = updated_days
         
@@ -414,14 +731,14 @@ def build_orchestrator_graph():
     """Builds and compiles the StateGraph with human-in-the-loop interruption.
 
     Flow:
-      scrape → ai_brain → generate → [router]
+      scrape → ai_brain (subgraph, see build_ai_brain_graph) → generate → [router]
         ├─ canonical_post/image → image_gen → publish
         └─ video_script         → video_gen → publish
     """
     builder = StateGraph(AgentState)
 
     builder.add_node("scrape", scrape_node)
-    builder.add_node("ai_brain", ai_brain_node)
+    builder.add_node("ai_brain", build_ai_brain_graph())
     builder.add_node("generate", generate_node)
     builder.add_node("image_gen", image_gen_node)
     builder.add_node("video_gen", video_gen_node)
@@ -435,11 +752,11 @@ def build_orchestrator_graph():
     builder.add_edge("video_gen", "publish")
     builder.add_edge("publish", END)
 
-    # Use MemorySaver checkpointer to persist state across interruptions
-    memory = MemorySaver()
+    # In-process until app startup swaps in the Postgres saver (see graph_checkpointer)
+    checkpointer = build_checkpointer()
 
     # Compile graph to interrupt explicitly before the "publish" node
-    graph = builder.compile(checkpointer=memory, interrupt_before=["publish"])
+    graph = builder.compile(checkpointer=checkpointer, interrupt_before=["publish"])
     return graph
 
 # Ensure we have a singleton graph ready to be imported
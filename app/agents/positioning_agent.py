@@ -2,11 +2,13 @@ import json
 import re
 from langchain_core.prompts import ChatPromptTemplate
 
+from app.utils.llm_cache import llm_cache, parses_as_json
+
 class PositioningAgent:
     def __init__(self, llm):
         self.llm = llm
 
-    def run(self, company: str, product: str, tone: str, desc: str, comp_context: str, usecase_context: str, aud_context: str) -> dict:
+    def _prompt(self):
         prompt = ChatPromptTemplate.from_messages([
             ("system", "You are a Master Brand Strategist. Synthesize all previous intelligence to generate the final product positioning statement and 3 taglines. Tone should be respected. Return strictly valid JSON."),
             ("human", """Company: {company}
@@ -20,11 +22,21 @@ Audience: {aud_context}
 Return JSON with exactly:
 {{"positioning": {{"statement": "One clear positioning statement", "taglines": ["...", "...", "..."]}}}}""")
         ])
-        
-        chain = prompt | self.llm
+        return prompt
+
+    def run(self, company: str, product: str, tone: str, desc: str, comp_context: str, usecase_context: str, aud_context: str, use_cache: bool = True) -> dict:
+        try:
+            raw = llm_cache.invoke(self.llm, self._prompt(), {"company": company, "product": product, "tone": tone, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context, "aud_context": aud_context}, "positioning", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
+        except Exception as e:
+            print(f"[PositioningAgent] Error: {e}")
+            return {"positioning": {}}
+
+    async def arun(self, company: str, product: str, tone: str, desc: str, comp_context: str, usecase_context: str, aud_context: str, use_cache: bool = True) -> dict:
+        """Async `run`: awaits the LLM without blocking the event loop; cancelling the caller aborts the request."""
         try:
-            result = chain.invoke({"company": company, "product": product, "tone": tone, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context, "aud_context": aud_context})
-            return self._parse(result.content)
+            raw = await llm_cache.ainvoke(self.llm, self._prompt(), {"company": company, "product": product, "tone": tone, "desc": desc, "comp_context": comp_context, "usecase_context": usecase_context, "aud_context": aud_context}, "positioning", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
         except Exception as e:
             print(f"[PositioningAgent] Error: {e}")
             return {"positioning": {}}
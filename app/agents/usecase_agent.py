@@ -2,11 +2,13 @@ import json
 import re
 from langchain_core.prompts import ChatPromptTemplate
 
+from app.utils.llm_cache import llm_cache, parses_as_json
+
 class UsecaseAgent:
     def __init__(self, llm):
         self.llm = llm
 
-    def run(self, company: str, product: str, desc: str, context: str, comp_context: str) -> dict:
+    def _prompt(self):
         prompt = ChatPromptTemplate.from_messages([
             ("system", "You are an expert Product Marketing Manager. Define specific use cases for the product being launched considering the competitive landscape. Return strictly valid JSON."),
             ("human", """Company: {company}
@@ -20,11 +22,21 @@ Scraped Context:
 Return JSON with exactly:
 {{"use_cases": [{{"title": "...", "description": "..."}}]}}""")
         ])
-        
-        chain = prompt | self.llm
+        return prompt
+
+    def run(self, company: str, product: str, desc: str, context: str, comp_context: str, use_cache: bool = True) -> dict:
+        try:
+            raw = llm_cache.invoke(self.llm, self._prompt(), {"company": company, "product": product, "desc": desc, "context": context, "comp_context": comp_context}, "usecase", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
+        except Exception as e:
+            print(f"[UsecaseAgent] Error: {e}")
+            return {"use_cases": []}
+
+    async def arun(self, company: str, product: str, desc: str, context: str, comp_context: str, use_cache: bool = True) -> dict:
+        """Async `run`: awaits the LLM without blocking the event loop; cancelling the caller aborts the request."""
         try:
-            result = chain.invoke({"company": company, "product": product, "desc": desc, "context": context, "comp_context": comp_context})
-            return self._parse(result.content)
+            raw = await llm_cache.ainvoke(self.llm, self._prompt(), {"company": company, "product": product, "desc": desc, "context": context, "comp_context": comp_context}, "usecase", use_cache=use_cache, accept=parses_as_json)
+            return self._parse(raw)
         except Exception as e:
             print(f"[UsecaseAgent] Error: {e}")
             return {"use_cases": []}
@@ -10,6 +10,7 @@ import os
 import time
 import uuid
 from pathlib import Path
+from typing import Callable, Optional
 
 from google import genai
 
@@ -98,7 +99,8 @@ class VideoGenerator:
             print(f"[VideoGenerator] Video generation failed: {e}")
             return None
 
-    def generate_for_days(self, days: list[dict], campaign_id: int, company_name: str = "", website_url: str = "", visual_identity: str = "") -> list[dict]:
+    def generate_for_days(self, days: list[dict], campaign_id: int, company_name: str = "", website_url: str = "", visual_identity: str = "",
+                          on_video: Optional[Callable[[int, str], None]] = None) -> list[dict]:
         """
         Generate videos for all video_script days in a content calendar.
 
@@ -108,6 +110,7 @@ class VideoGenerator:
             company_name: Name of the company for branding context.
             website_url: Website URL for branding context.
             visual_identity: Text analysis of the brand's visual style.
+            on_video: Called as on_video(day, video_url) after each video is saved.
 
         Returns:
             Updated list of day dicts with video_url populated.
@@ -125,6 +128,8 @@ class VideoGenerator:
                     if video_url:
                         day["video_url"] = video_url
                         print(f"[VideoGenerator] Day {day.get('day')}: {video_url}")
+                        if on_video:
+                            on_video(day.get("day"), video_url)
                     else:
                         print(f"[VideoGenerator] Day {day.get('day')}: Video generation failed, continuing.")
                 else:
@@ -1,8 +1,12 @@
+import asyncio
+import hashlib
 import os
 import httpx
 from google import genai
 from google.genai import types
 
+from app.utils.llm_cache import llm_cache
+
 class VisualAnalyzerAgent:
     """
     Downloads scraped images from a company's social media and uses Gemini
@@ -14,13 +18,30 @@ class VisualAnalyzerAgent:
         self.client = genai.Client(api_key=self.api_key)
         self.model_name = "gemini-2.5-flash"
         
-    async def analyze_images(self, company_name: str, image_urls: list[str]) -> str:
+    @staticmethod
+    async def _download(http_client: httpx.AsyncClient, url: str):
+        try:
+            response = await http_client.get(url, timeout=10.0)
+            if response.status_code != 200:
+                return None
+            mime_type = response.headers.get("content-type", "image/jpeg")
+            # Default to image/jpeg if it's some generic binary stream
+            if "image" not in mime_type:
+                mime_type = "image/jpeg"
+            return types.Part.from_bytes(data=response.content, mime_type=mime_type)
+        except Exception as e:
+            print(f"   [VisualAnalyzer] Failed to download image {url}: {e}")
+            return None
+
+    async def analyze_images(self, company_name: str, image_urls: list[str], use_cache: bool = True) -> str:
         """
         Downloads the images and sends them to Gemini for visual analysis.
-        Returns a detailed visual identity guideline string.
+        Returns a detailed visual identity guideline string. The same prompt
+        and image bytes reuse a cached analysis unless use_cache is False.
         """
-        # Filter out empty or duplicate URLs
-        unique_urls = list(set([url for url in image_urls if url]))
+        # Filter out empty or duplicate URLs, keeping scrape order so the
+        # same posts always yield the same images (and cache key)
+        unique_urls = list(dict.fromkeys(url for url in image_urls if url))
         
         if not unique_urls:
             return "No visual context available from past posts."
@@ -29,26 +50,10 @@ class VisualAnalyzerAgent:
         unique_urls = unique_urls[:5]
         print(f"[VisualAnalyzer] Analyzing {len(unique_urls)} images for {company_name}")
         
-        image_parts = []
         async with httpx.AsyncClient() as http_client:
-            for url in unique_urls:
-                try:
-                    response = await http_client.get(url, timeout=10.0)
-                    if response.status_code == 200:
-                        mime_type = response.headers.get("content-type", "image/jpeg")
-                        # Default to image/jpeg if it's some generic binary stream
-                        if "image" not in mime_type:
-                            mime_type = "image/jpeg"
-                            
-                        image_parts.append(
-                            types.Part.from_bytes(
-                                data=response.content,
-                                mime_type=mime_type
-                            )
-                        )
-                except Exception as e:
-                    print(f"   [VisualAnalyzer] Failed to download image {url}: {e}")
-                    
+            downloads = await asyncio.gather(*(self._download(http_client, url) for url in unique_urls))
+        image_parts = [part for part in downloads if part is not None]
+
         if not image_parts:
             return "Failed to retrieve any visual context."
             
@@ -67,14 +72,26 @@ class VisualAnalyzerAgent:
         
         # Pass the text prompt first, then the images
         contents = [prompt] + image_parts
-        
+
+        # Cache key: the prompt plus a digest of each image's bytes
+        cache_key = "\n".join([prompt] + [
+            hashlib.sha256(part.inline_data.data).hexdigest() for part in image_parts
+        ])
+        if use_cache:
+            cached = await asyncio.to_thread(llm_cache.get, "visual_analyzer", self.model_name, None, cache_key)
+            if cached is not None:
+                return cached
+
         try:
             print(f"[VisualAnalyzer] Sending {len(image_parts)} images to {self.model_name}")
-            response = self.client.models.generate_content(
+            # Async client: the event loop stays free, and cancelling the caller aborts the request
+            response = await self.client.aio.models.generate_content(
                 model=self.model_name,
                 contents=contents,
             )
             print("[VisualAnalyzer] Analysis complete.")
+            if use_cache and response.text:
+                await asyncio.to_thread(llm_cache.set, "visual_analyzer", self.model_name, None, cache_key, response.text)
             return response.text
         except Exception as e:
             print(f"[VisualAnalyzer] Failed to analyze images: {e}")
@@ -3,12 +3,20 @@ Campaign Route — Scraping + Multi-Agent AI Brain + RAG Content Generation
 
 POST /campaign/create
   - Accepts brand_id, product_service, icp, tone, description, content_types, template_type
-  - Runs the full LangGraph pipeline:
+  - Queues the full LangGraph pipeline on the background job runner:
       scrape → ai_brain (5 agents) → generate (7-day calendar) → (pause) → publish
-  - Returns strict JSON with AI Brain + daily content assignments
+  - Returns the campaign_id immediately (wait=true blocks for the full result)
+
+GET /campaign/{campaign_id}/status
+  - Stage plus per-node progress while the pipeline runs
+
+GET /campaign/{campaign_id}/events
+  - Server-sent events as the pipeline runs: scrape done per platform, each
+    brain agent, each calendar day, each image/video, then completed/failed
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Literal, Optional
 import json
@@ -16,6 +24,7 @@ import asyncio
 
 from app.utils.db_service import get_connection
 from app.agents.orchestrator import graph
+from app.domain.campaign.job_runner import campaign_jobs, CampaignQueueFull, TERMINAL_EVENTS
 import json
 
 
@@ -38,6 +47,23 @@ class CampaignCreate(BaseModel):
         default="educational",
         description="Prompt template strategy for content generation",
     )
+    force_refresh: bool = Field(
+        default=False,
+        description="Re-scrape even if a cached scrape for this brand is still fresh",
+    )
+    brain_mode: Optional[Literal["full", "fast"]] = Field(
+        default=None,
+        description="AI Brain mode: 'full' runs one agent per strategy section, "
+                    "'fast' asks for all of them in a single LLM call. Defaults to AI_BRAIN_MODE",
+    )
+    use_llm_cache: bool = Field(
+        default=True,
+        description="Reuse cached LLM responses for identical prompts; false forces fresh generations",
+    )
+    wait: bool = Field(
+        default=False,
+        description="Block until the pipeline finishes and return the full result instead of just the campaign_id",
+    )
 
 
 async def _scrape_and_embed(
@@ -97,8 +123,9 @@ async def create_campaign(data: CampaignCreate):
         cur.execute(
             """
             INSERT INTO campaigns
-                (brand_id, product_service, icp, tone, caption_size, description, content_type, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                (brand_id, product_service, icp, tone, caption_size, description, content_type, status,
+                 worker_id, heartbeat_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
             RETURNING id;
             """,
             (
@@ -109,16 +136,14 @@ async def create_campaign(data: CampaignCreate):
                 data.caption_size,
                 data.description,
                 ",".join(data.content_types),
-                "generating",
+                "queued",
+                campaign_jobs.worker_id,
             ),
         )
         campaign_id = cur.fetchone()["id"]
         conn.commit()
 
-        # ----- Run the full LangGraph pipeline -----
-        print(f"[campaign] Running LangGraph pipeline for '{company_name}'...")
-
-        config = {"configurable": {"thread_id": str(campaign_id)}}
+        # ----- Queue the full LangGraph pipeline -----
         initial_state = {
             "brand_id": data.brand_id,
             "campaign_id": campaign_id,
@@ -134,27 +159,36 @@ async def create_campaign(data: CampaignCreate):
             "twitter_handle": brand.get("twitter_handle"),
             "linkedin_handle": brand.get("linkedin_url"),
             "website_url": brand.get("website_url"),
+            "force_refresh": data.force_refresh,
+            "brain_mode": data.brain_mode,
+            "use_llm_cache": data.use_llm_cache,
         }
 
-        # The graph will run: scrape → ai_brain → generate, then pause BEFORE 'publish'
-        result_state = await graph.ainvoke(initial_state, config=config)
+        # The graph will run: scrape → ai_brain → generate, then pause BEFORE 'publish'.
+        # The job runner persists status/progress and the final AI Brain + content.
+        try:
+            job = campaign_jobs.submit(campaign_id, initial_state)
+        except CampaignQueueFull as e:
+            cur.execute("UPDATE campaigns SET status = %s WHERE id = %s;", ("rejected", campaign_id))
+            conn.commit()
+            raise HTTPException(status_code=503, detail=f"Campaign queue is full, try again later ({e})")
+        print(f"[campaign] Queued LangGraph pipeline for '{company_name}' (campaign {campaign_id})")
+
+        if not data.wait:
+            return {
+                "success": True,
+                "campaign_id": campaign_id,
+                "company": company_name,
+                "status": "queued",
+                "queue_position": campaign_jobs.queue_position(campaign_id),
+                "status_url": f"/campaign/{campaign_id}/status",
+                "events_url": f"/campaign/{campaign_id}/events",
+            }
 
+        result_state = await asyncio.shield(job)  # a dropped client must not cancel the run
         ai_brain = result_state.get("ai_brain", {})
         monthly_content = result_state.get("generated_content", {})
 
-        # Persist AI Brain + generated content to DB
-        cur.execute(
-            """
-            UPDATE campaigns
-            SET ai_brain = %s, generated_content = %s, status = %s
-            WHERE id = %s;
-            """,
-            (json.dumps(ai_brain), json.dumps(monthly_content), "completed", campaign_id),
-        )
-        conn.commit()
-
-        print(f"[campaign] 7-day calendar saved. Total days: {monthly_content.get('total_days', 0)}")
-
         return {
             "success": True,
             "campaign_id": campaign_id,
@@ -165,6 +199,8 @@ async def create_campaign(data: CampaignCreate):
             "generated_content": monthly_content,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         conn.rollback()
         print(f"[campaign] Error: {e}")
@@ -175,6 +211,86 @@ async def create_campaign(data: CampaignCreate):
         conn.close()
 
 
+@router.get("/campaign/{campaign_id}/status")
+def get_campaign_status(campaign_id: int):
+    """Lightweight progress check for a queued or running campaign (no content payloads)."""
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        cur.execute("SELECT id, status, progress FROM campaigns WHERE id = %s", (campaign_id,))
+        campaign = cur.fetchone()
+
+        if not campaign:
+            raise HTTPException(status_code=404, detail="Campaign not found")
+
+        progress = campaign["progress"] or {}
+        return {
+            "success": True,
+            "campaign_id": campaign["id"],
+            "status": campaign["status"],
+            "queue_position": campaign_jobs.queue_position(campaign_id),
+            "nodes": progress.get("nodes", {}),
+            "started_at": progress.get("started_at"),
+            "finished_at": progress.get("finished_at"),
+            "error": progress.get("error"),
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[campaign] Status Error: {e}")
+        raise HTTPException(status_code=500, detail="Database error occurred")
+    finally:
+        cur.close()
+        conn.close()
+
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _sse(entry: dict) -> str:
+    return f"event: {entry['event']}\ndata: {json.dumps(entry, default=str)}\n\n"
+
+
+@router.get("/campaign/{campaign_id}/events")
+async def stream_campaign_events(campaign_id: int):
+    """
+    Streams pipeline events for a campaign as server-sent events. Events that
+    already happened are replayed first. Campaigns not queued or running on
+    this worker get a single "status" event from the database.
+    """
+    queue = campaign_jobs.subscribe(campaign_id)
+
+    if queue is None:
+        status = await asyncio.to_thread(get_campaign_status, campaign_id)  # 404s for unknown campaigns
+
+        async def _snapshot():
+            yield _sse({"event": "status", **status})
+
+        return StreamingResponse(_snapshot(), media_type="text/event-stream")
+
+    async def _events():
+        try:
+            while True:
+                try:
+                    entry = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(entry)
+                if entry["event"] in TERMINAL_EVENTS:
+                    break
+        finally:
+            campaign_jobs.unsubscribe(campaign_id, queue)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/campaign/{campaign_id}")
 def get_campaign(campaign_id: int):
     """Fetch an existing campaign by ID, including its 7-day generated content."""
@@ -234,20 +350,26 @@ async def publish_campaign(campaign_id: int, data: CampaignPublish):
     """
     config = {"configurable": {"thread_id": str(campaign_id)}}
     
-    current_state = graph.get_state(config)
+    current_state = await graph.aget_state(config)
     if not current_state or not current_state.next:
         raise HTTPException(status_code=400, detail="Graph is not paused at a point where it can be resumed.")
         
     # User might have made manual edits to the content in the UI. 
     # Update the graph state with their modified version of the 7-day plan
     state_update = {"generated_content": data.approved_content}
-    graph.update_state(config, state_update)
+    await graph.aupdate_state(config, state_update)
     
     # Resume the graph by passing None for input (it will continue to the active node)
     print(f"[campaign] Resuming LangGraph for campaign {campaign_id} -> publish node")
     final_state = await graph.ainvoke(None, config=config)
     
     publish_result = final_state.get("publish_result", {})
+
+    # The thread is finished: drop its checkpoints instead of waiting for the TTL sweep
+    try:
+        await graph.checkpointer.adelete_thread(str(campaign_id))
+    except Exception as e:
+        print(f"[campaign] Could not delete checkpoints for campaign {campaign_id}: {e}")
     
     conn = get_connection()
     cur = conn.cursor()
@@ -1,5 +1,7 @@
 import asyncio
-from typing import Dict, Optional
+import os
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from pathlib import Path
 import sys
 
@@ -8,20 +10,57 @@ sys.path.append(str(Path(__file__).parent))
 from app.domain.scraping.instagram_service import scrape_instagram
 from app.domain.scraping.linkedin_service import scrape_linkedin
 from app.domain.scraping.twitter_service import get_twitter_data
+from app.domain.scraping.high_water_marks import HighWaterMarkStore, post_key, INCREMENTAL_SCRAPING
+from app.domain.scraping.scrape_scheduler import scrape_scheduler
+from app.domain.scraping.scrape_workers import workers_enabled, run_in_worker
+from app.utils.scrape_cache import scrape_cache
+
+
+# Where each scraper puts its list of posts
+POSTS_KEYS = {
+    "instagram": "last_10_posts_and_reels",
+    "linkedin": "recent_posts",
+    "twitter": "posts",
+}
+
+# Per-platform scrape timeouts, and the deadline for a whole multi-platform scrape.
+# LinkedIn's scroll loop is the usual straggler.
+PLATFORM_TIMEOUTS = {
+    "instagram": float(os.getenv("SCRAPE_INSTAGRAM_TIMEOUT_SECONDS", "180")),
+    "linkedin": float(os.getenv("SCRAPE_LINKEDIN_TIMEOUT_SECONDS", "240")),
+    "twitter": float(os.getenv("SCRAPE_TWITTER_TIMEOUT_SECONDS", "180")),
+}
+SCRAPE_DEADLINE_SECONDS = float(os.getenv("SCRAPE_DEADLINE_SECONDS", "300"))
+
+# Scrape cache variant of incremental results: a delta only stands in for another delta
+DELTA_CACHE_VARIANT = "delta"
 
 
 class ScrapingOrchestrator:
     """
     Orchestrates scraping across all social media platforms.
     Handles parallel execution and error handling.
+
+    Scrapes are incremental: per-handle high-water marks let each scraper
+    stop at previously seen posts, so only new posts are reported downstream.
+    Callers record the marks (record_high_water_marks) after ingesting a
+    platform's posts.
+
+    Every platform scrape goes through the shared scrape scheduler, which
+    caps concurrent sessions per platform, paces them, shares slots fairly
+    between brands and coalesces concurrent scrapes of the same handle.
+    With SCRAPE_WORKER_PROCESSES set, the scrapes themselves run in worker
+    processes (see scrape_workers).
     """
+
+    high_water_marks = HighWaterMarkStore()
     
     @staticmethod
-    async def scrape_instagram_safe(profile_url: str) -> Optional[Dict]:
+    async def scrape_instagram_safe(profile_url: str, known_post_ids: Optional[Set[str]] = None) -> Optional[Dict]:
         """Safely scrape Instagram"""
         try:
             print(f"Scraping Instagram: {profile_url}")
-            result = await scrape_instagram(profile_url)
+            result = await scrape_instagram(profile_url, known_post_ids=known_post_ids)
             print(f"Instagram scraping complete")
             return result
         except Exception as e:
@@ -29,11 +68,11 @@ class ScrapingOrchestrator:
             return None
     
     @staticmethod
-    async def scrape_linkedin_safe(company_url: str) -> Optional[Dict]:
+    async def scrape_linkedin_safe(company_url: str, known_post_ids: Optional[Set[str]] = None) -> Optional[Dict]:
         """Safely scrape LinkedIn"""
         try:
             print(f"Scraping LinkedIn: {company_url}")
-            result = await scrape_linkedin(company_url)
+            result = await scrape_linkedin(company_url, known_post_ids=known_post_ids)
             print(f"LinkedIn scraping complete")
             return result
         except Exception as e:
@@ -41,22 +80,186 @@ class ScrapingOrchestrator:
             return None
     
     @staticmethod
-    async def scrape_twitter_safe(username: str) -> Optional[Dict]:
+    async def scrape_twitter_safe(username: str, known_post_ids: Optional[Set[str]] = None) -> Optional[Dict]:
         """Safely scrape Twitter"""
         try:
             print(f"Scraping Twitter: @{username}")
-            result = await get_twitter_data(username)
+            result = await get_twitter_data(username, known_post_ids=known_post_ids)
             print(f"Twitter scraping complete")
             return result
         except Exception as e:
             print(f"Twitter scraping failed: {e}")
             return None
+
+    @staticmethod
+    def platform_target(platform: str, handle: str) -> str:
+        """What the platform's scraper is called with for a handle (profile URL or username)."""
+        if platform == "instagram":
+            return f"https://www.instagram.com/{handle}/"
+        if platform == "linkedin":
+            return f"https://www.linkedin.com/company/{handle}/"
+        return handle
+
+    @staticmethod
+    def _known_ids(platform: str, handle: str, incremental: bool) -> Set[str]:
+        if not incremental:
+            return set()
+        known = ScrapingOrchestrator.high_water_marks.known_ids(platform, handle)
+        if known:
+            print(f"{platform}: {len(known)} previously scraped posts for '{handle}', scraping delta only")
+        return known
+
+    @staticmethod
+    def record_high_water_marks(platform: str, handle: str, result: Dict):
+        """
+        Mark a scrape's posts as seen so the next incremental scrape stops at
+        them. Call only once they are ingested (chunked and embedded):
+        posts marked but never stored would be skipped for good.
+        """
+        posts = result.get(POSTS_KEYS[platform], [])
+        try:
+            ScrapingOrchestrator.high_water_marks.update(
+                platform, handle, [post_key(p) for p in posts],
+                image_urls=[p.get("image_url") for p in posts],
+            )
+        except Exception as e:
+            print(f"Failed to save high-water mark for {platform}/{handle}: {e}")
+
+    @staticmethod
+    def known_image_urls(platform: str, handle: str) -> List[str]:
+        """Image URLs of the handle's recent ingested posts, newest first (not just the last delta)."""
+        return ScrapingOrchestrator.high_water_marks.known_image_urls(platform, handle)
     
+    @staticmethod
+    def cache_variant(incremental: bool) -> str:
+        """Scrape cache variant for a scrape mode; full scrapes use the plain key."""
+        return DELTA_CACHE_VARIANT if incremental else ""
+
+    @staticmethod
+    def is_failed(platform: str, result: Dict) -> bool:
+        """Scrapers return an error payload instead of raising; don't cache those."""
+        if platform == "instagram":
+            return bool(result.get("profile", {}).get("error"))
+        if platform == "linkedin":
+            return bool(result.get("company_info", {}).get("error"))
+        return not result.get(POSTS_KEYS[platform])
+    
+    @staticmethod
+    async def _scrape_platform(platform: str, handle: str, incremental: bool,
+                               force_refresh: bool) -> Optional[Dict]:
+        """One scheduled platform scrape: delta against high-water marks, then cache."""
+        # A job that waited in the queue may find a result cached by the one ahead of it
+        variant = ScrapingOrchestrator.cache_variant(incremental)
+        if not force_refresh:
+            cached = scrape_cache.get(platform, handle, variant)
+            if cached is not None:
+                return cached
+
+        known = ScrapingOrchestrator._known_ids(platform, handle, incremental)
+        target = ScrapingOrchestrator.platform_target(platform, handle)
+
+        if workers_enabled():
+            # Browser and parsing run in a separate process, killed if it hangs
+            result = await run_in_worker(platform, target, known)
+        elif platform == "instagram":
+            result = await ScrapingOrchestrator.scrape_instagram_safe(target, known)
+        elif platform == "linkedin":
+            result = await ScrapingOrchestrator.scrape_linkedin_safe(target, known)
+        else:
+            result = await ScrapingOrchestrator.scrape_twitter_safe(target, known)
+
+        if result:
+            # High-water marks are recorded by the caller once the posts are ingested
+            if not ScrapingOrchestrator.is_failed(platform, result):
+                scrape_cache.set(platform, handle, result, variant)
+            print(f"{platform}: {len(result.get(POSTS_KEYS[platform], []))} new posts")
+        return result
+
+    @staticmethod
+    async def _scrape_with_timeout(platform: str, handle: str, brand: str, incremental: bool,
+                                   force_refresh: bool, timeout: float) -> Tuple[str, Optional[Dict]]:
+        job = partial(ScrapingOrchestrator._scrape_platform, platform, handle, incremental, force_refresh)
+        try:
+            result = await asyncio.wait_for(
+                scrape_scheduler.submit(platform, handle, brand, job, variant=(incremental, force_refresh)),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            print(f"{platform} scrape timed out after {timeout:g}s, skipping")
+            result = None
+        return platform, result
+
+    @staticmethod
+    async def scrape_platforms_as_completed(
+        instagram_handle: Optional[str] = None,
+        linkedin_handle: Optional[str] = None,
+        twitter_handle: Optional[str] = None,
+        incremental: bool = INCREMENTAL_SCRAPING,
+        force_refresh: bool = False,
+        brand: Optional[str] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        deadline_seconds: float = SCRAPE_DEADLINE_SECONDS
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Scrape all platforms in parallel, yielding (platform, result) as each
+        one finishes so callers can process it while the others run.
+
+        Cached results are yielded first. A platform exceeding its timeout
+        (PLATFORM_TIMEOUTS, overridable via `timeouts`) is skipped; once
+        `deadline_seconds` pass, any still-running scrapes are cancelled and
+        the iteration ends with what has completed. Failed or timed-out
+        platforms are not yielded.
+        """
+        timeouts = {**PLATFORM_TIMEOUTS, **(timeouts or {})}
+        handles = {
+            key: handle
+            for key, handle in (("instagram", instagram_handle), ("linkedin", linkedin_handle), ("twitter", twitter_handle))
+            if handle
+        }
+        brand = brand or next(iter(handles.values()), "")
+
+        pending = set()
+        for key, handle in handles.items():
+            # Serve recent results from the scrape cache without launching a browser
+            if not force_refresh:
+                cached = scrape_cache.get(key, handle, ScrapingOrchestrator.cache_variant(incremental))
+                if cached is not None:
+                    yield key, cached
+                    continue
+            pending.add(asyncio.create_task(ScrapingOrchestrator._scrape_with_timeout(
+                key, handle, brand, incremental, force_refresh, timeouts.get(key, deadline_seconds)
+            )))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_seconds
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    print(f"Scrape deadline of {deadline_seconds:g}s reached, "
+                          f"cancelling {len(pending)} unfinished platform(s)")
+                    break
+                for task in done:
+                    key, result = task.result()
+                    if result:
+                        yield key, result
+        finally:
+            # Deadline hit or the caller stopped iterating early
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
     @staticmethod
     async def scrape_all_platforms(
         instagram_handle: Optional[str] = None,
         linkedin_handle: Optional[str] = None,
-        twitter_handle: Optional[str] = None
+        twitter_handle: Optional[str] = None,
+        incremental: bool = INCREMENTAL_SCRAPING,
+        force_refresh: bool = False,
+        brand: Optional[str] = None
     ) -> Dict:
         """
         Scrape all platforms in parallel.
@@ -65,41 +268,34 @@ class ScrapingOrchestrator:
             instagram_handle: Instagram username
             linkedin_handle: LinkedIn company handle
             twitter_handle: Twitter username
+            incremental: Only return posts newer than the stored high-water
+                marks (pass False for a full re-scrape)
+            force_refresh: Ignore cached results younger than the cache TTL
+            brand: Company the scrape is for; the scheduler shares platform
+                slots fairly between brands (defaults to the first handle)
             
         Returns:
-            Dictionary with results from all platforms
+            Dictionary with results from all platforms that finished within
+            their timeouts (see scrape_platforms_as_completed)
         """
         print("\n" + "="*60)
         print("Starting multi-platform scraping...")
         print("="*60 + "\n")
-        
-        tasks = []
-        platform_keys = []
-        
-        if instagram_handle:
-            instagram_url = f"https://www.instagram.com/{instagram_handle}/"
-            tasks.append(ScrapingOrchestrator.scrape_instagram_safe(instagram_url))
-            platform_keys.append("instagram")
-        
-        if linkedin_handle:
-            linkedin_url = f"https://www.linkedin.com/company/{linkedin_handle}/"
-            tasks.append(ScrapingOrchestrator.scrape_linkedin_safe(linkedin_url))
-            platform_keys.append("linkedin")
-        
-        if twitter_handle:
-            tasks.append(ScrapingOrchestrator.scrape_twitter_safe(twitter_handle))
-            platform_keys.append("twitter")
-        
-        if not tasks:
+
+        if not (instagram_handle or linkedin_handle or twitter_handle):
             print("No platforms to scrape")
             return {}
-        
-        results = await asyncio.gather(*tasks)
-        
+
         combined_results = {}
-        for key, result in zip(platform_keys, results):
-            if result:
-                combined_results[key] = result
+        async for key, result in ScrapingOrchestrator.scrape_platforms_as_completed(
+            instagram_handle=instagram_handle,
+            linkedin_handle=linkedin_handle,
+            twitter_handle=twitter_handle,
+            incremental=incremental,
+            force_refresh=force_refresh,
+            brand=brand,
+        ):
+            combined_results[key] = result
         
         print("\n" + "="*60)
         print(f"Scraping complete! Collected data from {len(combined_results)} platforms")
@@ -107,7 +303,6 @@ class ScrapingOrchestrator:
         
         return combined_results
 
-
 if __name__ == "__main__":
     async def test():
         results = await ScrapingOrchestrator.scrape_all_platforms(
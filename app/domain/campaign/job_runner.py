@@ -0,0 +1,414 @@
+"""
+Campaign job runner.
+
+Runs the campaign graph (scrape → ai_brain → generate → image_gen →
+video_gen, pausing before publish) in the background, so /campaign/create
+can return the campaign_id immediately instead of holding the request open
+for the whole pipeline.
+
+  - Bounded pool: CAMPAIGN_WORKERS runs at a time per process (default 2);
+    further jobs wait in a queue of at most CAMPAIGN_QUEUE_MAX (default 100).
+  - Progress is persisted as it happens: campaigns.status moves through
+    queued → scraping → ai_brain → generating → generating_images →
+    generating_videos → completed (or failed), and campaigns.progress
+    records when each graph node, brain agents included, finished.
+  - GET /campaign/{id}/status reads both back, so any worker can answer.
+  - Jobs are held in memory: on shutdown, running and still-queued
+    campaigns are marked "interrupted". Each process records itself as
+    the owner (campaigns.worker_id) of the campaigns it holds and renews
+    campaigns.heartbeat_at every CAMPAIGN_HEARTBEAT_SECONDS (default 15);
+    every process periodically marks queued or running campaigns whose
+    heartbeat is older than CAMPAIGN_STALE_SECONDS (default 90), i.e.
+    whose owner crashed, as "interrupted" too. Re-create those campaigns
+    to run them again. An interrupted campaign is never written back.
+  - Node-level events (scrape done per platform, each brain agent, each
+    calendar day, each image/video) are fanned out to `subscribe`rs for
+    the SSE endpoint GET /campaign/{id}/events. Each job keeps its event
+    history, so a subscriber that connects late still gets the full feed.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.agents.orchestrator import graph, SEMANTIC_CACHED_NODES
+from app.utils.db_service import get_connection
+
+
+CAMPAIGN_WORKERS = int(os.getenv("CAMPAIGN_WORKERS", "2"))
+CAMPAIGN_QUEUE_MAX = int(os.getenv("CAMPAIGN_QUEUE_MAX", "100"))
+CAMPAIGN_HEARTBEAT_SECONDS = float(os.getenv("CAMPAIGN_HEARTBEAT_SECONDS", "15"))
+CAMPAIGN_STALE_SECONDS = float(os.getenv("CAMPAIGN_STALE_SECONDS", "90"))
+
+# campaigns.status once a top-level graph node has finished
+STATUS_AFTER_NODE = {
+    "scrape": "ai_brain",
+    "ai_brain": "generating",
+    "generate": "generating_images",
+    "image_gen": "generating_videos",
+}
+
+# campaigns.status values of a campaign that is queued or mid-run
+ACTIVE_STATUSES = ("queued", "scraping", *STATUS_AFTER_NODE.values())
+
+# Brain state keys that are shared plumbing, not an agent's result
+_BRAIN_INTERNAL_KEYS = ("brand_context", "context_digest", "semantic_misses")
+
+# Events after which a job's feed ends
+TERMINAL_EVENTS = ("completed", "failed", "interrupted")
+
+
+class CampaignQueueFull(Exception):
+    """Raised by `submit` when CAMPAIGN_QUEUE_MAX jobs are already waiting."""
+
+
+class _Job:
+    def __init__(self, campaign_id: int, initial_state: Dict):
+        self.campaign_id = campaign_id
+        self.initial_state = initial_state
+        self.result: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.events: List[Dict] = []
+        self.subscribers: List[asyncio.Queue] = []
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _node_name(namespace: tuple, node: str) -> str:
+    """"ai_brain/competition" for subgraph nodes, plain name for top-level ones."""
+    return "/".join([ns.split(":")[0] for ns in namespace] + [node])
+
+
+def _brain_agent_payload(agent: str, output: Dict, elapsed: float) -> Dict:
+    """
+    brain_agent_done fields: the agent, seconds since the brain started,
+    whether the semantic cache served it (None if it doesn't use it) and
+    its own result keys, without the retrieved context.
+    """
+    cached = None
+    if agent in SEMANTIC_CACHED_NODES:
+        cached = not output.get("semantic_misses")
+    result = {key: value for key, value in output.items() if key not in _BRAIN_INTERNAL_KEYS}
+    return {"agent": agent, "elapsed_s": round(elapsed, 1), "cached": cached, "result": result}
+
+
+def _publish(job: _Job, event: str, **data):
+    """Record an event on the job and hand it to every live subscriber."""
+    entry = {"event": event, "campaign_id": job.campaign_id, "at": _now(), **data}
+    job.events.append(entry)
+    for queue in job.subscribers:
+        queue.put_nowait(entry)
+
+
+def _consume_exception(future: asyncio.Future):
+    # Nobody awaits the result of a wait=False campaign; its error is in the DB and events
+    if not future.cancelled():
+        future.exception()
+
+
+def _save_progress(campaign_id: int, status: str, progress: Dict, ai_brain: Optional[Dict] = None,
+                   generated_content: Optional[Dict] = None):
+    """Write status and progress, unless the campaign was marked interrupted meanwhile."""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        if ai_brain is None:
+            cur.execute(
+                """
+                UPDATE campaigns SET status = %s, progress = %s, heartbeat_at = NOW()
+                WHERE id = %s AND status <> 'interrupted';
+                """,
+                (status, json.dumps(progress), campaign_id),
+            )
+        else:
+            cur.execute(
+                """
+                UPDATE campaigns
+                SET ai_brain = %s, generated_content = %s, status = %s, progress = %s, heartbeat_at = NOW()
+                WHERE id = %s AND status <> 'interrupted';
+                """,
+                (json.dumps(ai_brain), json.dumps(generated_content), status, json.dumps(progress), campaign_id),
+            )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[CampaignJobs] Could not save progress for campaign {campaign_id}: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _heartbeat(worker_id: str, campaign_ids: List[int]):
+    """Renew this process's claim on the campaigns it holds."""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "UPDATE campaigns SET worker_id = %s, heartbeat_at = NOW() WHERE id = ANY(%s) AND status IN %s;",
+            (worker_id, campaign_ids, ACTIVE_STATUSES),
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[CampaignJobs] Heartbeat failed: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _mark_interrupted(error: str, campaign_ids: Optional[List[int]] = None,
+                      stale_seconds: float = CAMPAIGN_STALE_SECONDS) -> int:
+    """
+    Set status "interrupted" on the given campaigns, or, when no ids are
+    given, on every queued or running campaign whose owner's heartbeat is
+    older than `stale_seconds`. The error is merged into the existing
+    progress so the node history is kept. Returns rows changed.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    note = json.dumps({"error": error, "interrupted_at": _now()})
+    try:
+        if campaign_ids is None:
+            cur.execute(
+                """
+                UPDATE campaigns
+                SET status = 'interrupted', progress = COALESCE(progress, '{}'::jsonb) || %s::jsonb
+                WHERE status IN %s
+                  AND (heartbeat_at IS NULL OR heartbeat_at < NOW() - make_interval(secs => %s));
+                """,
+                (note, ACTIVE_STATUSES, stale_seconds),
+            )
+        else:
+            cur.execute(
+                """
+                UPDATE campaigns
+                SET status = 'interrupted', progress = COALESCE(progress, '{}'::jsonb) || %s::jsonb
+                WHERE id = ANY(%s);
+                """,
+                (note, list(campaign_ids)),
+            )
+        conn.commit()
+        return cur.rowcount
+    except Exception as e:
+        conn.rollback()
+        print(f"[CampaignJobs] Could not mark campaigns interrupted: {e}")
+        return 0
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _ensure_schema():
+    """Adds the job runner's columns to databases created before they existed (see schema.sql)."""
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS progress JSONB;
+            ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS worker_id VARCHAR(100);
+            ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;
+        """)
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+class CampaignJobRunner:
+    """Bounded background pool running campaign graphs."""
+
+    def __init__(self, workers: int = CAMPAIGN_WORKERS, queue_max: int = CAMPAIGN_QUEUE_MAX):
+        self.workers = max(1, workers)
+        self.queue_max = queue_max
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: "OrderedDict[int, _Job]" = OrderedDict()
+        self._running: Dict[int, _Job] = {}
+        self._tasks = []
+        # Owner id written to campaigns.worker_id
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def start(self):
+        """Starts the worker tasks and the heartbeat; called on app startup."""
+        try:
+            await asyncio.to_thread(_ensure_schema)
+        except Exception as e:
+            print(f"[CampaignJobs] Could not add the job runner columns: {e}")
+        await self._reap_stale()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat_loop()))
+        print(f"[CampaignJobs] Started {self.workers} campaign workers ({self.worker_id})")
+
+    async def _reap_stale(self):
+        abandoned = await asyncio.to_thread(_mark_interrupted, "Worker stopped before the campaign finished")
+        if abandoned:
+            print(f"[CampaignJobs] Marked {abandoned} campaigns with a stale heartbeat as interrupted")
+
+    async def _heartbeat_loop(self):
+        """Keeps this process's campaigns claimed and reaps those of dead workers."""
+        while True:
+            await asyncio.sleep(CAMPAIGN_HEARTBEAT_SECONDS)
+            held = [*self._pending, *self._running]
+            if held:
+                await asyncio.to_thread(_heartbeat, self.worker_id, held)
+            await self._reap_stale()
+
+    async def stop(self):
+        """Cancels the workers; running and still-queued campaigns are marked interrupted."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        queued = list(self._pending.values())
+        self._pending.clear()
+        if not queued:
+            return
+        error = "Server shut down before the campaign started"
+        for job in queued:
+            _publish(job, "interrupted", error=error)
+            if not job.result.done():
+                job.result.cancel()
+        await asyncio.to_thread(_mark_interrupted, error, [job.campaign_id for job in queued])
+
+    def submit(self, campaign_id: int, initial_state: Dict) -> asyncio.Future:
+        """
+        Queue a campaign run. Returns a future resolving to the final graph
+        values (or raising the run's error) for callers that want to wait.
+        """
+        if len(self._pending) >= self.queue_max:
+            raise CampaignQueueFull(f"{len(self._pending)} campaigns already queued")
+        job = _Job(campaign_id, initial_state)
+        job.result.add_done_callback(_consume_exception)
+        self._pending[campaign_id] = job
+        self._queue.put_nowait(job)
+        _publish(job, "queued", queue_position=len(self._pending))
+        return job.result
+
+    def subscribe(self, campaign_id: int) -> Optional[asyncio.Queue]:
+        """
+        Event queue for a campaign queued or running on this worker, replaying
+        what already happened; None if it isn't (finished, or another worker).
+        Call `unsubscribe` when done.
+        """
+        job = self._pending.get(campaign_id) or self._running.get(campaign_id)
+        if job is None:
+            return None
+        queue = asyncio.Queue()
+        for entry in job.events:
+            queue.put_nowait(entry)
+        job.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, campaign_id: int, queue: asyncio.Queue):
+        job = self._pending.get(campaign_id) or self._running.get(campaign_id)
+        if job is not None and queue in job.subscribers:
+            job.subscribers.remove(queue)
+
+    def queue_position(self, campaign_id: int) -> Optional[int]:
+        """1-based position among jobs queued on this worker, None if not queued here."""
+        for position, queued_id in enumerate(self._pending, 1):
+            if queued_id == campaign_id:
+                return position
+        return None
+
+    def metrics(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "running": list(self._running),
+            "queued": len(self._pending),
+            "queue_max": self.queue_max,
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            self._pending.pop(job.campaign_id, None)
+            self._running[job.campaign_id] = job
+            try:
+                values = await self._run(job)
+                if not job.result.done():
+                    job.result.set_result(values)
+            except asyncio.CancelledError:
+                error = "Worker shut down before the campaign finished"
+                _publish(job, "interrupted", error=error)
+                await asyncio.to_thread(_mark_interrupted, error, [job.campaign_id])
+                if not job.result.done():
+                    job.result.cancel()
+                raise
+            except Exception as e:
+                if not job.result.done():
+                    job.result.set_exception(e)
+            finally:
+                self._running.pop(job.campaign_id, None)
+                self._queue.task_done()
+
+    async def _run(self, job: _Job) -> Dict:
+        campaign_id = job.campaign_id
+        config = {"configurable": {"thread_id": str(campaign_id)}}
+        progress = {"started_at": _now(), "nodes": {}}
+        print(f"[CampaignJobs] Running campaign {campaign_id}")
+        await asyncio.to_thread(_save_progress, campaign_id, "scraping", progress)
+
+        try:
+            status = "scraping"
+            stage_started = time.monotonic()
+            _publish(job, "status", status=status)
+            async for namespace, mode, chunk in graph.astream(
+                job.initial_state, config=config, stream_mode=["updates", "custom"], subgraphs=True
+            ):
+                if mode == "custom":
+                    # Emitted from inside nodes (see orchestrator._emit)
+                    event = dict(chunk)
+                    _publish(job, event.pop("event", "custom"), **event)
+                    continue
+
+                previous = status
+                for node, output in chunk.items():
+                    if node.startswith("__"):
+                        continue  # e.g. __interrupt__ before publish
+                    name = _node_name(namespace, node)
+                    progress["nodes"][name] = {"finished_at": _now()}
+                    if not namespace:
+                        status = STATUS_AFTER_NODE.get(node, status)
+                        stage_started = time.monotonic()
+                        _publish(job, "node_done", node=node)
+                    elif namespace[0].startswith("ai_brain:"):
+                        _publish(job, "brain_agent_done", **_brain_agent_payload(
+                            node, output or {}, time.monotonic() - stage_started
+                        ))
+                    else:
+                        _publish(job, "node_done", node=name)
+                progress["current"] = status
+                if status != previous:
+                    _publish(job, "status", status=status)
+                await asyncio.to_thread(_save_progress, campaign_id, status, progress)
+
+            values = (await graph.aget_state(config)).values
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[CampaignJobs] Campaign {campaign_id} failed: {e}")
+            progress.update({"error": str(e), "failed_at": _now()})
+            _publish(job, "failed", error=str(e))
+            await asyncio.to_thread(_save_progress, campaign_id, "failed", progress)
+            raise
+
+        ai_brain = values.get("ai_brain", {})
+        generated_content = values.get("generated_content", {})
+        progress.update({"current": "completed", "finished_at": _now()})
+        await asyncio.to_thread(_save_progress, campaign_id, "completed", progress, ai_brain, generated_content)
+        _publish(job, "completed", total_days=generated_content.get("total_days", 0))
+        print(f"[CampaignJobs] Campaign {campaign_id} ready to publish. "
+              f"Total days: {generated_content.get('total_days', 0)}")
+        return values
+
+
+campaign_jobs = CampaignJobRunner()
@@ -0,0 +1,98 @@
+"""
+Cross-page boilerplate removal for website crawls.
+
+Nav menus, footers and cookie banners repeat on every page of a site.
+A text block that appears on enough of the crawled pages is treated as
+boilerplate and stripped, so each page keeps only its own content before
+it is truncated and chunked for embedding. Blocks repeated within a page
+(a <section> and the <p> tags inside it) are collapsed at the same time.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List
+
+# A block is boilerplate once it appears on this share of pages (and on at least two)
+BOILERPLATE_MIN_PAGE_FRACTION = 0.5
+# Boilerplate this long is also cut out of blocks that merely contain it
+# (e.g. a <section> wrapping the footer); shorter phrases are too likely
+# to occur in real content
+_MIN_EMBEDDED_CHARS = 40
+
+_WS = re.compile(r"\s+")
+
+
+def _normalise(block: str) -> str:
+    return _WS.sub(" ", block).strip().lower()
+
+
+def find_boilerplate(pages: List[Dict]) -> List[str]:
+    """
+    Return the blocks shared by enough pages to count as boilerplate,
+    longest first. Each page contributes its "blocks" list.
+    """
+    with_blocks = [page for page in pages if page.get("blocks")]
+    if len(with_blocks) < 2:
+        return []
+
+    threshold = max(2, int(len(with_blocks) * BOILERPLATE_MIN_PAGE_FRACTION + 0.999))
+    counts = Counter()
+    original = {}
+    for page in with_blocks:
+        keys = set()
+        for block in page["blocks"]:
+            key = _normalise(block)
+            original.setdefault(key, block)
+            keys.add(key)
+        counts.update(keys)
+
+    shared = [original[key] for key, count in counts.items() if count >= threshold]
+    return sorted(shared, key=len, reverse=True)
+
+
+def _drop_nested(blocks: List[str]) -> List[str]:
+    """Drop blocks whose text is already contained in an earlier kept block."""
+    kept: List[str] = []
+    for block in blocks:
+        if not any(block in other for other in kept):
+            kept.append(block)
+    return kept
+
+
+def _strip_embedded(text: str, boilerplate: List[str]) -> str:
+    for block in boilerplate:
+        if len(block) >= _MIN_EMBEDDED_CHARS and block in text:
+            text = text.replace(block, " ")
+    return _WS.sub(" ", text).strip()
+
+
+def strip_boilerplate(pages: List[Dict]) -> int:
+    """
+    Remove shared and repeated blocks from every page's "content", in place.
+    Pages with blocks are rebuilt from their unique blocks; pages without
+    (all-visible-text fallback) have long boilerplate cut out of the text.
+    Returns the number of characters removed across all pages.
+    """
+    boilerplate = find_boilerplate(pages)
+    shared_keys = {_normalise(block) for block in boilerplate}
+    removed = 0
+    for page in pages:
+        before = len(page["content"])
+        if page.get("blocks"):
+            unique = [block for block in page["blocks"] if _normalise(block) not in shared_keys]
+            content = _WS.sub(" ", " ".join(_drop_nested(unique))).strip()
+            content = _strip_embedded(content, boilerplate)
+        elif boilerplate:
+            content = _strip_embedded(page["content"], boilerplate)
+        else:
+            continue
+
+        # Never leave a page empty: a site whose pages are all chrome still says something
+        if len(content) >= 30:
+            page["content"] = content
+            removed += before - len(content)
+
+    if removed:
+        print(f"[Boilerplate] {len(boilerplate)} shared blocks across {len(pages)} pages, "
+              f"removed {removed} chars")
+    return removed
@@ -0,0 +1,132 @@
+"""
+High-water marks for incremental scraping.
+
+Stores, per (platform, handle), the identifiers of the most recent posts
+already scraped so the scrapers can stop scrolling once they reach known
+content and only report new posts downstream. Marks are recorded once a
+scrape's posts have been ingested, never straight from the scraper.
+
+Also keeps the handle's most recent post image URLs, since a delta scrape
+alone often has none for the visual analysis.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+
+_DEFAULT_STORE_PATH = Path("data/scrape_state/high_water_marks.json")
+
+# How many post ids / image URLs to remember per handle
+MAX_IDS_PER_HANDLE = 100
+MAX_IMAGES_PER_HANDLE = 20
+
+# Consecutive known posts that mean "we've caught up".
+# Kept above Instagram's three pinned posts so pins don't stop a scroll early.
+KNOWN_STREAK_TO_STOP = 4
+
+INCREMENTAL_SCRAPING = os.getenv("SCRAPE_INCREMENTAL", "true").lower() in ("1", "true", "yes")
+
+
+def post_key(post: Dict) -> str:
+    """
+    Stable identifier for a scraped post.
+    Prefers the LinkedIn URN, then a post-specific URL, then a content hash.
+    """
+    if post.get("urn"):
+        return post["urn"]
+
+    url = post.get("post_url", "")
+    if "/p/" in url or "/reel/" in url or "/status/" in url:
+        return url
+
+    text = post.get("content", "") or post.get("caption", "")
+    return "sha1:" + hashlib.sha1(text[:500].encode("utf-8")).hexdigest()
+
+
+def reached_known(post_ids: List[str], known: Set[str]) -> bool:
+    """
+    True once `post_ids` (in page order) contains a run of
+    KNOWN_STREAK_TO_STOP consecutive ids that were already scraped.
+    """
+    if not known:
+        return False
+    streak = 0
+    for pid in post_ids:
+        streak = streak + 1 if pid in known else 0
+        if streak >= KNOWN_STREAK_TO_STOP:
+            return True
+    return False
+
+
+class HighWaterMarkStore:
+    """
+    JSON-backed store of recently seen post ids, keyed by platform and handle.
+    """
+
+    def __init__(self, store_path: Path = _DEFAULT_STORE_PATH):
+        self.store_path = Path(store_path)
+        self.marks = self._load()
+
+    def _load(self) -> Dict:
+        if self.store_path.exists():
+            try:
+                with open(self.store_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"[HighWaterMarks] Could not read {self.store_path}: {e}")
+        return {}
+
+    def _save(self):
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.marks, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.store_path)
+
+    @staticmethod
+    def _key(platform: str, handle: str) -> str:
+        return f"{platform}:{handle.lower().strip().rstrip('/')}"
+
+    def known_ids(self, platform: str, handle: str) -> Set[str]:
+        """Return the set of post ids already seen for this handle."""
+        entry = self.marks.get(self._key(platform, handle), {})
+        return set(entry.get("seen", []))
+
+    def newest(self, platform: str, handle: str) -> Optional[str]:
+        """Return the newest post id recorded for this handle, if any."""
+        return self.marks.get(self._key(platform, handle), {}).get("newest")
+
+    def known_image_urls(self, platform: str, handle: str) -> List[str]:
+        """Image URLs of the handle's most recent ingested posts, newest first."""
+        return list(self.marks.get(self._key(platform, handle), {}).get("images", []))
+
+    def update(self, platform: str, handle: str, post_ids: Iterable[str], image_urls: Iterable[str] = ()):
+        """
+        Record newly scraped post ids (newest first) ahead of the existing
+        ones, and likewise their image URLs.
+        """
+        post_ids = [pid for pid in post_ids if pid]
+        if not post_ids:
+            return
+
+        key = self._key(platform, handle)
+        entry = self.marks.get(key, {})
+        merged = list(dict.fromkeys(post_ids + entry.get("seen", [])))[:MAX_IDS_PER_HANDLE]
+        images = list(dict.fromkeys([url for url in image_urls if url] + entry.get("images", [])))
+
+        self.marks[key] = {
+            "newest": post_ids[0],
+            "seen": merged,
+            "images": images[:MAX_IMAGES_PER_HANDLE],
+            "updated_at": datetime.now().isoformat(),
+        }
+        self._save()
+
+    def reset(self, platform: str, handle: str):
+        """Forget a handle so the next scrape is a full one."""
+        if self.marks.pop(self._key(platform, handle), None) is not None:
+            self._save()
@@ -2,7 +2,10 @@ import asyncio
 import json
 import re
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from app.utils.html_extract import extract_og_meta, extract_hrefs
+from app.utils.stealth_browser import create_stealth_context
+from app.domain.scraping.high_water_marks import reached_known
+from app.utils.capture_archive import capture_archive
 
 PROFILE_URL = "https://www.instagram.com/spacex/"
 POSTS_LIMIT = 20
@@ -12,11 +15,85 @@ def extract_hashtags(text):
     return re.findall(r"#\w+", text)
 
 
-async def scrape_instagram(profile_url):
+def parse_profile(html, profile_url):
+    """Profile data from a profile page's HTML."""
+    meta = extract_og_meta(html)
+    profile_data = {}
+    if "og:description" in meta:
+        profile_data["description"] = meta["og:description"]
+    profile_data["profile_url"] = profile_url
+    return profile_data
+
+
+def parse_post_links(html):
+    """Post/reel URLs linked from a profile page, in page order."""
+    post_links = []
+    for href in extract_hrefs(html):
+        if "/p/" in href or "/reel/" in href:
+            full_link = f"https://www.instagram.com{href}"
+            if full_link not in post_links:
+                post_links.append(full_link)
+    return post_links
+
+
+def parse_post(html, link):
+    """A post dict from a single post/reel page's HTML."""
+    post_meta = extract_og_meta(html)
+    caption = post_meta.get("og:description", "")
+
+    likes = ""
+    if caption:
+        like_match = re.search(r"([\d,]+)\s+Likes", caption)
+        if like_match:
+            likes = like_match.group(1)
+
+    return {
+        "media_type": "reel" if "/reel/" in link else "post",
+        "post_url": link,
+        "caption": caption,
+        "hashtags": extract_hashtags(caption),
+        "likes": likes,
+        "image_url": post_meta.get("og:image", ""),
+        "post_date": post_meta.get("time", "")
+    }
+
+
+def rebuild_from_capture(manifest, archive):
+    """Rebuild a scrape_instagram result from an archived capture, offline."""
+    profile_url = manifest["target"]
+    profile_data = {"profile_url": profile_url}
+    posts_data = []
+    for capture in manifest["captures"]:
+        if capture["kind"] == "profile_html":
+            profile_data = parse_profile(archive.read(capture), profile_url)
+        elif capture["kind"] == "post_html":
+            posts_data.append(parse_post(archive.read(capture), capture["url"]))
+    return {"profile": profile_data, "last_10_posts_and_reels": posts_data}
+
+
+async def _visible_post_links(page):
+    """Post/reel links currently in the DOM, in page order."""
+    hrefs = await page.evaluate(
+        """() => Array.from(
+            document.querySelectorAll("a[href*='/p/'], a[href*='/reel/']"),
+            a => a.getAttribute('href')
+        )"""
+    )
+    return list(dict.fromkeys(f"https://www.instagram.com{h}" for h in hrefs if h))
+
+
+async def scrape_instagram(profile_url, known_post_ids=None):
     """
     Scrape Instagram profile and posts.
     Works for public profiles without login.
+
+    If `known_post_ids` (post URLs from a previous scrape) is given, scrolling
+    stops once known posts are reached and only new posts are visited.
+
+    Raw pages are kept in the capture archive for offline re-parsing.
     """
+    known_post_ids = known_post_ids or set()
+    capture = capture_archive.start("instagram", profile_url, incremental=bool(known_post_ids))
     print(f"\n{'='*60}")
     print(f"INSTAGRAM SCRAPER STARTED")
     print(f"{'='*60}")
@@ -33,7 +110,7 @@ async def scrape_instagram(profile_url):
                     headless=True,
                     args=["--disable-blink-features=AutomationControlled"]
                 )
-                context = await browser.new_context()
+                context = await create_stealth_context(browser, block_profile="instagram")
                 page = await context.new_page()
                 print("Browser launched successfully\n")
             except Exception as e:
@@ -53,19 +130,14 @@ async def scrape_instagram(profile_url):
             try:
                 print("3️ Extracting profile data...")
                 html = await page.content()
-                soup = BeautifulSoup(html, "html.parser")
+                await asyncio.to_thread(capture.add, "profile_html", profile_url, html)
+                profile_data = await asyncio.to_thread(parse_profile, html, profile_url)
 
                 if "Log in to Instagram" in html or "Sign up" in html:
                     print("Instagram is showing login page")
-                
-                profile_data = {}
-                meta_desc = soup.find("meta", property="og:description")
 
-                if meta_desc:
-                    profile_data["description"] = meta_desc["content"]
-                    print(f"   Profile: {meta_desc['content'][:50]}...")
-
-                profile_data["profile_url"] = profile_url
+                if "description" in profile_data:
+                    print(f"   Profile: {profile_data['description'][:50]}...")
                 print("Profile data extracted\n")
             except Exception as e:
                 print(f"Failed to extract profile data: {e}")
@@ -77,6 +149,9 @@ async def scrape_instagram(profile_url):
                     await page.mouse.wheel(0, 8000)
                     await page.wait_for_timeout(2000)
                     print(f"   Scroll {i+1}/5 complete")
+                    if known_post_ids and reached_known(await _visible_post_links(page), known_post_ids):
+                        print("   Reached previously scraped posts, stopping scroll")
+                        break
                 print("Scrolling complete\n")
             except Exception as e:
                 print(f"Scrolling error: {e}\n")
@@ -84,17 +159,15 @@ async def scrape_instagram(profile_url):
             try:
                 print("5️ Finding post links...")
                 html = await page.content()
-                soup = BeautifulSoup(html, "html.parser")
-
-                post_links = []
-                for a in soup.find_all("a", href=True):
-                    href = a["href"]
-                    if "/p/" in href or "/reel/" in href:
-                        full_link = f"https://www.instagram.com{href}"
-                        if full_link not in post_links:
-                            post_links.append(full_link)
+                await asyncio.to_thread(capture.add, "feed_html", profile_url, html)
+                post_links = await asyncio.to_thread(parse_post_links, html)
 
                 print(f"Found {len(post_links)} post/reel links")
+
+                if known_post_ids:
+                    new_links = [link for link in post_links if link not in known_post_ids]
+                    print(f"   Skipping {len(post_links) - len(new_links)} already scraped posts")
+                    post_links = new_links
             except Exception as e:
                 print(f"   Failed to find post links: {e}")
                 post_links = []
@@ -117,41 +190,12 @@ async def scrape_instagram(profile_url):
                     await page.wait_for_timeout(4000)
 
                     post_html = await page.content()
-                    post_soup = BeautifulSoup(post_html, "html.parser")
-
-                    caption = ""
-                    image_url = ""
-                    post_date = ""
-                    likes = ""
-                    media_type = "reel" if "/reel/" in link else "post"
-
-                    desc = post_soup.find("meta", property="og:description")
-                    if desc:
-                        caption = desc["content"]
-                        print(f"      Caption: {caption[:50]}...")
-
-                    img = post_soup.find("meta", property="og:image")
-                    if img:
-                        image_url = img["content"]
-
-                    time_tag = post_soup.find("time")
-                    if time_tag:
-                        post_date = time_tag.get("datetime", "")
-
-                    if caption:
-                        like_match = re.search(r"([\d,]+)\s+Likes", caption)
-                        if like_match:
-                            likes = like_match.group(1)
-
-                    posts_data.append({
-                        "media_type": media_type,
-                        "post_url": link,
-                        "caption": caption,
-                        "hashtags": extract_hashtags(caption),
-                        "likes": likes,
-                        "image_url": image_url,
-                        "post_date": post_date
-                    })
+                    await asyncio.to_thread(capture.add, "post_html", link, post_html)
+                    post = await asyncio.to_thread(parse_post, post_html, link)
+                    if post["caption"]:
+                        print(f"      Caption: {post['caption'][:50]}...")
+
+                    posts_data.append(post)
                     print(f"      Post scraped successfully")
 
                     await asyncio.sleep(2)
@@ -160,6 +204,8 @@ async def scrape_instagram(profile_url):
                     print(f"      Failed: {e}")
                     continue
 
+            traffic = context.traffic_stats.summary()
+            context.traffic_stats.log("Instagram")
             await browser.close()
 
             print(f"\n{'='*60}")
@@ -170,7 +216,8 @@ async def scrape_instagram(profile_url):
 
             return {
                 "profile": profile_data,
-                "last_10_posts_and_reels": posts_data
+                "last_10_posts_and_reels": posts_data,
+                "traffic": traffic
             }
 
     except Exception as e:
@@ -184,6 +231,8 @@ async def scrape_instagram(profile_url):
             "profile": {"profile_url": profile_url, "error": str(e)},
             "last_10_posts_and_reels": []
         }
+    finally:
+        await asyncio.to_thread(capture.save)
 
 
 if __name__ == "__main__":
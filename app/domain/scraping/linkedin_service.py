@@ -1,23 +1,188 @@
 import asyncio
 import json
-from pathlib import Path
+import re
+from datetime import datetime, timezone
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from app.utils.html_extract import extract_linkedin, INVISIBLE_TAGS
+from app.utils.capture_archive import capture_archive
 from app.utils.stealth_browser import create_stealth_browser, create_stealth_context, create_stealth_page
+from app.domain.scraping.high_water_marks import post_key, reached_known
+from app.domain.scraping.linkedin_session import SESSION_FILE, INVALID, session_health, is_logged_out
 
 COMPANY_URL = "https://www.linkedin.com/company/odoo/"
 LIMIT = 20
 
+POST_SELECTORS = [
+    "div.feed-shared-update-v2",
+    "div[data-urn*='activity']",
+    "div.occludable-update",
+    "article",
+]
 
-async def scrape_linkedin(company_url):
+
+# Runs in the page: picks the first selector that matches, skips posts the
+# caller already has, and returns compact JSON instead of the whole DOM.
+# Post text is the block's text nodes joined with spaces, leaving out
+# script/style and other invisible tags -- the same text html_extract's
+# offline extract_linkedin produces.
+# Activity URN ids are snowflakes whose top bits are the post time in ms.
+_EXTRACT_POSTS_JS = """
+({selectors, limit, skip, hidden}) => {
+    const skipped = new Set(skip);
+    const hiddenTags = new Set(hidden);
+    const clean = (s) => (s || "").replace(/\\s+/g, " ").trim();
+    const textOf = (root) => {
+        const parts = [];
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, {
+            acceptNode: (node) => {
+                for (let el = node.parentElement; el && el !== root.parentElement; el = el.parentElement) {
+                    if (hiddenTags.has(el.localName)) return NodeFilter.FILTER_REJECT;
+                }
+                return NodeFilter.FILTER_ACCEPT;
+            },
+        });
+        while (walker.nextNode()) {
+            const part = walker.currentNode.nodeValue.trim();
+            if (part) parts.push(part);
+        }
+        return clean(parts.join(" "));
+    };
+
+    let blocks = [], usedSelector = null;
+    for (const selector of selectors) {
+        blocks = document.querySelectorAll(selector);
+        if (blocks.length) { usedSelector = selector; break; }
+    }
+
+    const posts = [];
+    for (const block of blocks) {
+        if (skipped.size >= limit) break;  // skip + posts pulled so far
+
+        let urn = block.getAttribute("data-urn");
+        if (!urn) {
+            const inner = block.querySelector("[data-urn]");
+            urn = inner ? inner.getAttribute("data-urn") : "";
+        }
+        const text = textOf(block);
+        const key = urn || text.slice(0, 200);
+        if (!key || skipped.has(key)) continue;
+        skipped.add(key);
+
+        let image = "";
+        const img = block.querySelector("img");
+        const src = img ? img.getAttribute("src") : null;
+        if (src && !src.startsWith("data:")) image = src;
+
+        let timestamp = "";
+        const time = block.querySelector("time[datetime]");
+        const activityId = (urn.match(/activity:(\\d+)/) || [])[1];
+        if (time) {
+            timestamp = time.getAttribute("datetime");
+        } else if (activityId) {
+            timestamp = new Date(Number(BigInt(activityId) >> 22n)).toISOString();
+        }
+
+        posts.push({key, urn, text, image_url: image, timestamp});
+    }
+
+    const about = document.querySelector("p.break-words") || document.querySelector("p");
+    const companyInfo = {};
+    if (document.title) companyInfo.company_name = document.title.trim();
+    if (about) companyInfo.about = about.textContent.trim();
+
+    return {company_info: companyInfo, posts, used_selector: usedSelector};
+}
+"""
+
+
+def urn_timestamp(urn):
+    """Post time encoded in an activity URN id, formatted like JS toISOString()."""
+    match = re.search(r"activity:(\d+)", urn or "")
+    if not match:
+        return ""
+    ms = int(match.group(1)) >> 22
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{ms % 1000:03d}Z"
+
+
+def _to_post(block, company_url):
+    """Output post dict for an extracted block, or None if it has no real text."""
+    text = block["text"]
+    if not text or len(text) <= 20:
+        return None
+    return {
+        "content": text,
+        "post_date": block.get("timestamp") or urn_timestamp(block["urn"]),
+        "post_url": company_url,
+        "image_url": block["image_url"],
+        "urn": block["urn"]
+    }
+
+
+def _block_key(block):
+    """post_key of the post a block becomes: its URN, else a hash of its text."""
+    return post_key({"urn": block["urn"], "content": block["text"]})
+
+
+def rebuild_from_capture(manifest, archive):
+    """
+    Rebuild a scrape_linkedin result offline from the archived feed DOM,
+    parsed with html_extract's equivalent of the in-page extractor.
+    Every post in the captured DOM is returned, including ones an
+    incremental scrape skipped as already known.
+    """
+    company_url = manifest["target"]
+    for capture in manifest["captures"]:
+        if capture["kind"] == "feed_html":
+            extracted = extract_linkedin(archive.read(capture), POST_SELECTORS, LIMIT)
+            posts = [p for p in (_to_post(block, company_url) for block in extracted["posts"]) if p]
+            return {
+                "company_url": company_url,
+                "company_info": extracted["company_info"],
+                "recent_posts": posts,
+                "total_collected": len(posts)
+            }
+    return None
+
+
+async def _extract_new_posts(page, skip_keys):
+    """
+    Extract posts in the browser with a single evaluate call.
+    Returns {"company_info", "posts": [{"key", "urn", "text", "image_url",
+    "timestamp"}], "used_selector"}, leaving out posts whose key is in
+    `skip_keys` and stopping once LIMIT posts exist in total.
+    """
+    return await page.evaluate(
+        _EXTRACT_POSTS_JS,
+        {"selectors": POST_SELECTORS, "limit": LIMIT, "skip": skip_keys, "hidden": INVISIBLE_TAGS},
+    )
+
+
+async def scrape_linkedin(company_url, known_post_ids=None):
     """
     Scrape LinkedIn company page and posts.
-    Requires a valid session file.
+    Requires a valid session file. Session validity is cached (see
+    linkedin_session); the company page load doubles as the check.
+
+    If `known_post_ids` (post_key ids from a previous scrape) is given,
+    scrolling stops once known posts are reached and they are not returned.
     """
+    known_post_ids = known_post_ids or set()
+    capture = capture_archive.start("linkedin", company_url, incremental=bool(known_post_ids))
     print(f"\n{'='*60}")
     print(f"LINKEDIN SCRAPER STARTED")
     print(f"{'='*60}")
     print(f"Company URL: {company_url}\n")
+
+    session_expired = {
+        "company_url": company_url,
+        "company_info": {"error": "Session expired - run linkedin_login.py again"},
+        "recent_posts": [],
+        "total_collected": 0
+    }
+    if session_health.status() == INVALID:
+        print("Cached session check says the session is expired, skipping scrape.")
+        print("Please run: cd sessions && python linkedin_login.py\n")
+        return session_expired
     
     try:
         async with async_playwright() as p:
@@ -31,7 +196,7 @@ async def scrape_linkedin(company_url):
             
             try:
                 print("2️ Loading session file...")
-                session_file = Path(__file__).parent / "session_storage" / "linkedin_session.json"
+                session_file = SESSION_FILE
                 print(f"   Session file path: {session_file}")
                 
                 if not session_file.exists():
@@ -47,7 +212,7 @@ async def scrape_linkedin(company_url):
                 
                 print(f"Session file found\n")
                 
-                context = await create_stealth_context(browser, storage_state=str(session_file))
+                context = await create_stealth_context(browser, storage_state=str(session_file), block_profile="linkedin")
                 page = await create_stealth_page(context)
                 print("Stealth browser context created with session\n")
             except Exception as e:
@@ -56,177 +221,96 @@ async def scrape_linkedin(company_url):
                 raise
 
             try:
-                print(f"3️ Validating session...")
-                await page.goto("https://www.linkedin.com/feed/", timeout=60000, wait_until="domcontentloaded")
+                print(f"3️ Navigating to company page: {company_url}")
+                print(f"   Cached session status: {session_health.status()}")
+                await page.goto(company_url, timeout=60000, wait_until="domcontentloaded")
                 await page.wait_for_timeout(3000)
-                
+
                 current_url = page.url
                 page_title = await page.title()
                 print(f"   Page title: {page_title}")
                 print(f"   Current URL: {current_url}")
-                
-                is_logged_out = (
-                    "login" in current_url.lower()
-                    or "authwall" in current_url.lower()
-                    or "signup" in current_url.lower()
-                    or "sign-up" in current_url.lower()
-                    or "checkpoint" in current_url.lower()
-                    or "Sign Up" in page_title
-                    or "Log In" in page_title
-                    or "Join" in page_title
-                )
-                
-                if is_logged_out:
+
+                if is_logged_out(current_url):
+                    # Confirm against /feed before marking the shared session invalid
+                    session_health.revalidate_in_background()
                     print("\n   SESSION EXPIRED! LinkedIn is not recognizing the session.")
                     print("   Please run: cd sessions && python linkedin_login.py")
                     print("   Log in manually, wait for session to save, then try again.\n")
                     await browser.close()
-                    return {
-                        "company_url": company_url,
-                        "company_info": {"error": "Session expired - run linkedin_login.py again"},
-                        "recent_posts": [],
-                        "total_collected": 0
-                    }
-                
-                print("Session is valid! Logged in successfully.\n")
-            except Exception as e:
-                print(f"Session validation failed: {e}")
-                await browser.close()
-                raise
+                    return session_expired
 
-            try:
-                print(f"4️ Navigating to company page: {company_url}")
-                await page.goto(company_url, timeout=60000, wait_until="domcontentloaded")
-                await page.wait_for_timeout(3000)
                 print("Company page loaded successfully\n")
             except Exception as e:
                 print(f"Failed to load company page: {e}")
+                session_health.revalidate_in_background()
                 await browser.close()
                 raise
 
+            company_data = {}
+            collected = {}  # post key -> compact post, in feed order
+            used_selector = None
             try:
-                print("5️ Scrolling to load posts...")
+                print("4️ Scrolling and extracting posts in-page...")
+                extracted = await _extract_new_posts(page, [])
+                company_data = extracted["company_info"]
+                used_selector = extracted["used_selector"]
+                for post in extracted["posts"]:
+                    collected[post["key"]] = post
+
                 for i in range(8):
+                    if len(collected) >= LIMIT:
+                        break
+                    keys = [_block_key(post) for post in collected.values()]
+                    if known_post_ids and reached_known(keys, known_post_ids):
+                        print("   Reached previously scraped posts, stopping scroll")
+                        break
                     await page.mouse.wheel(0, 5000)
                     await page.wait_for_timeout(2000)
-                    print(f"   Scroll {i+1}/8 complete")
+                    # Only posts not pulled yet cross the browser boundary
+                    extracted = await _extract_new_posts(page, list(collected))
+                    used_selector = used_selector or extracted["used_selector"]
+                    for post in extracted["posts"]:
+                        collected.setdefault(post["key"], post)
+                    print(f"   Scroll {i+1}/8 complete: {len(extracted['posts'])} new posts, {len(collected)} total")
                 print("Scrolling complete\n")
             except Exception as e:
-                print(f"Scrolling error (continuing anyway): {e}\n")
+                print(f"Scrolling/extraction error (continuing with {len(collected)} posts): {e}\n")
 
-            try:
-                print("6️ Extracting page content...")
-                html = await page.content()
-                soup = BeautifulSoup(html, "html.parser")
-                print("Page content extracted\n")
-            except Exception as e:
-                print(f"Failed to extract content: {e}")
-                await browser.close()
-                raise
+            if capture_archive.enabled:
+                # Raw DOM for offline re-parsing when selectors change
+                try:
+                    await asyncio.to_thread(capture.add, "feed_html", company_url, await page.content())
+                except Exception as e:
+                    print(f"Could not capture page DOM: {e}")
 
-            try:
-                print("7️ Extracting company info...")
-                company_data = {}
-
-                title = soup.find("title")
-                if title:
-                    company_data["company_name"] = title.text.strip()
-                    print(f"   Company: {company_data['company_name']}")
-
-                about_section = soup.find("p", class_="break-words")
-                if not about_section:
-                    about_section = soup.find("p")
-                if about_section:
-                    company_data["about"] = about_section.text.strip()
-                    print(f"   About: {company_data['about'][:50]}...")
-                
-                print("Company info extracted\n")
-            except Exception as e:
-                print(f"Failed to extract company info: {e}")
-                company_data = {}
+            if company_data.get("company_name"):
+                print(f"   Company: {company_data['company_name']}")
+            if company_data.get("about"):
+                print(f"   About: {company_data['about'][:50]}...")
 
             try:
-                print("8️ Finding posts...")
+                print("5️ Building posts...")
                 posts = []
-                
-                post_selectors = [
-                    "div.feed-shared-update-v2",
-                    "div[data-urn*='activity']",
-                    "div.occludable-update",
-                    "article",
-                ]
-                
-                post_blocks = []
-                used_selector = None
-                for selector in post_selectors:
-                    post_blocks = soup.select(selector)
-                    if post_blocks:
-                        used_selector = selector
-                        break
-                
+                post_blocks = list(collected.values())[:LIMIT]
+
                 print(f"   Found {len(post_blocks)} post blocks (selector: {used_selector or 'none matched'})")
-                
-                if len(post_blocks) == 0:
-                    print("   Trying Playwright live DOM selectors...")
-                    
-                    pw_selectors = [
-                        "div.feed-shared-update-v2",
-                        "[data-urn*='activity']",
-                        ".occludable-update",
-                        "article",
-                    ]
-                    
-                    for sel in pw_selectors:
-                        elements = await page.query_selector_all(sel)
-                        if elements:
-                            print(f"   Found {len(elements)} elements with selector: {sel}")
-                            for idx, elem in enumerate(elements[:LIMIT], 1):
-                                try:
-                                    text = await elem.inner_text()
-                                    
-                                    # Try to find an image in this post
-                                    image_url = ""
-                                    try:
-                                        img_elem = await elem.query_selector("img")
-                                        if img_elem:
-                                            src = await img_elem.get_attribute("src")
-                                            if src and not src.startswith("data:"):
-                                                image_url = src
-                                    except:
-                                        pass
-                                        
-                                    if text and len(text.strip()) > 20:
-                                        posts.append({
-                                            "content": text.strip(),
-                                            "post_date": "",
-                                            "post_url": company_url,
-                                            "image_url": image_url
-                                        })
-                                        print(f"   Post {idx}: {text.strip()[:50]}...")
-                                except:
-                                    continue
-                            break
+
+                for idx, block in enumerate(post_blocks, 1):
+                    if _block_key(block) in known_post_ids:
+                        continue
+                    post = _to_post(block, company_url)
+                    if post:
+                        posts.append(post)
+                        print(f"   Post {idx}: {post['content'][:50]}...")
+
+                if post_blocks:
+                    session_health.record(True)
                 else:
-                    for idx, block in enumerate(post_blocks[:LIMIT], 1):
-                        try:
-                            text = block.get_text(" ", strip=True)
-                            
-                            image_url = ""
-                            img = block.find("img")
-                            if img and img.get("src") and not img.get("src").startswith("data:"):
-                                image_url = img.get("src")
-                            
-                            if text and len(text) > 20:
-                                posts.append({
-                                    "content": text,
-                                    "post_date": "",  
-                                    "post_url": company_url,
-                                    "image_url": image_url
-                                })
-                                print(f"   Post {idx}: {text[:50]}...")
-                        except Exception as e:
-                            print(f"   Post {idx}: Failed - {e}")
-                            continue
+                    # Nothing rendered at all: check the session before blaming the page
+                    if not await session_health.validate(page):
+                        print("   SESSION EXPIRED! /feed redirected to login.")
+                        company_data = session_expired["company_info"]
 
                 if not posts:
                     print("   No posts found. Possible reasons:")
@@ -236,9 +320,11 @@ async def scrape_linkedin(company_url):
                     
                 print(f"Extracted {len(posts)} posts\n")
             except Exception as e:
-                print(f"   Failed to find posts: {e}")
+                print(f"   Failed to build posts: {e}")
                 posts = []
 
+            traffic = context.traffic_stats.summary()
+            context.traffic_stats.log("LinkedIn")
             await browser.close()
             
             print(f"\n{'='*60}")
@@ -251,7 +337,8 @@ async def scrape_linkedin(company_url):
                 "company_url": company_url,
                 "company_info": company_data,
                 "recent_posts": posts,
-                "total_collected": len(posts)
+                "total_collected": len(posts),
+                "traffic": traffic
             }
             
     except Exception as e:
@@ -267,6 +354,8 @@ async def scrape_linkedin(company_url):
             "recent_posts": [],
             "total_collected": 0
         }
+    finally:
+        await asyncio.to_thread(capture.save)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+"""
+LinkedIn session health.
+
+Caches whether the saved LinkedIn session is still logged in, so
+`scrape_linkedin` can go straight to the company page instead of loading
+/feed to check the session on every run.
+
+  - A successful company page load records the session as valid.
+  - Only a /feed check records it as invalid; later scrapes then fail
+    fast until the session file is replaced.
+  - A company page that redirects to the login/authwall, and other company
+    page failures (timeouts, no posts), trigger a /feed revalidation
+    instead of a preflight on every run.
+  - A background task revalidates entries older than the TTL, off the
+    scrape path.
+  - In a scrape worker process (see scrape_workers) a requested
+    revalidation is reported back and run by the parent, since the worker
+    exits as soon as its scrape returns.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from app.utils.stealth_browser import get_shared_browser, create_stealth_context, create_stealth_page
+
+SESSION_FILE = Path(os.getenv(
+    "LINKEDIN_SESSION_FILE", str(Path(__file__).parent / "session_storage" / "linkedin_session.json")
+))
+FEED_URL = "https://www.linkedin.com/feed/"
+
+LINKEDIN_SESSION_TTL = int(os.getenv("LINKEDIN_SESSION_TTL_SECONDS", str(6 * 60 * 60)))
+
+_DEFAULT_STATE_PATH = Path("data/scrape_state/linkedin_session_health.json")
+
+VALID = "valid"
+INVALID = "invalid"
+UNKNOWN = "unknown"
+
+
+# Paths LinkedIn redirects to when the session isn't accepted
+LOGGED_OUT_PATH_PREFIXES = ("/login", "/authwall", "/checkpoint", "/signup", "/uas/login")
+
+
+def is_logged_out(url: str) -> bool:
+    """
+    True if LinkedIn bounced the page to a login, authwall, signup or
+    checkpoint wall. Only the final URL's path prefix is checked, so a
+    company slug or page title containing "login"/"Join" doesn't match.
+    """
+    path = urlparse(url).path.lower()
+    return path.startswith(LOGGED_OUT_PATH_PREFIXES)
+
+
+class LinkedInSessionHealth:
+    """
+    JSON-backed record of the last session check, tied to the session
+    file's mtime so a fresh login invalidates a cached "invalid".
+    """
+
+    def __init__(self, state_path: Path = _DEFAULT_STATE_PATH, session_file: Path = SESSION_FILE,
+                 ttl_seconds: int = LINKEDIN_SESSION_TTL):
+        self.state_path = Path(state_path)
+        self.session_file = Path(session_file)
+        self.ttl_seconds = ttl_seconds
+        self.state = self._load()
+        self._state_mtime = self._file_mtime(self.state_path)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._validate_lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Set in scrape workers: record revalidation requests instead of running them
+        self.defer_revalidation = False
+        self.revalidation_requested = False
+
+    def _load(self) -> Dict:
+        if self.state_path.exists():
+            try:
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"[LinkedInSession] Could not read {self.state_path}: {e}")
+        return {}
+
+    def _save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+        self._state_mtime = self._file_mtime(self.state_path)
+
+    @staticmethod
+    def _file_mtime(path: Path) -> Optional[float]:
+        try:
+            return path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _session_mtime(self) -> Optional[float]:
+        return self._file_mtime(self.session_file)
+
+    def _reload_if_changed(self):
+        # Scrapes in worker processes record checks in their own instance
+        mtime = self._file_mtime(self.state_path)
+        if mtime != self._state_mtime:
+            self.state = self._load()
+            self._state_mtime = mtime
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last check, or None if never checked."""
+        self._reload_if_changed()
+        if "checked_at" not in self.state:
+            return None
+        return time.time() - self.state["checked_at"]
+
+    def status(self) -> str:
+        """VALID / INVALID while the last check is within the TTL and the session file is unchanged, else UNKNOWN."""
+        self._reload_if_changed()
+        if self.state.get("session_mtime") != self._session_mtime():
+            return UNKNOWN
+        age = self.age()
+        if age is None or age > self.ttl_seconds:
+            return UNKNOWN
+        return VALID if self.state.get("valid") else INVALID
+
+    def record(self, valid: bool, reason: str = ""):
+        """Store the outcome of a check (a /feed load or a company page load)."""
+        changed = self.state.get("valid") != valid
+        self.state = {
+            "valid": valid,
+            "reason": reason,
+            "checked_at": time.time(),
+            "session_mtime": self._session_mtime(),
+        }
+        self._save()
+        if changed:
+            print(f"[LinkedInSession] Session marked {'valid' if valid else 'INVALID'}"
+                  f"{f' ({reason})' if reason else ''}")
+
+    def _lock(self) -> asyncio.Lock:
+        # An asyncio.Lock is bound to one event loop; workers and scripts run their own
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._validate_lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._validate_lock
+
+    @staticmethod
+    async def _check_feed(page) -> bool:
+        await page.goto(FEED_URL, timeout=60000, wait_until="domcontentloaded")
+        await page.wait_for_timeout(3000)
+        return not is_logged_out(page.url)
+
+    async def validate(self, page=None) -> bool:
+        """
+        Load /feed with the saved session and record the result.
+        Reuses `page` (already carrying the session) if given, otherwise
+        opens a context in the shared browser.
+        """
+        async with self._lock():
+            if not self.session_file.exists():
+                self.record(False, "session file not found")
+                return False
+
+            print("[LinkedInSession] Revalidating session via /feed...")
+            if page is not None:
+                valid = await self._check_feed(page)
+            else:
+                browser = await get_shared_browser()
+                context = await create_stealth_context(browser, storage_state=str(self.session_file),
+                                                       block_profile="linkedin")
+                try:
+                    valid = await self._check_feed(await create_stealth_page(context))
+                finally:
+                    await context.close()
+
+            self.record(valid, "" if valid else "redirected to login from /feed")
+            return valid
+
+    def revalidate_in_background(self):
+        """Schedule a /feed check unless one is already running."""
+        if self.defer_revalidation:
+            self.revalidation_requested = True
+            return
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task and not task.done() and task.get_loop() is loop:
+            return
+        self._refresh_task = loop.create_task(self._revalidate_quietly())
+
+    async def _revalidate_quietly(self):
+        try:
+            await self.validate()
+        except Exception as e:
+            print(f"[LinkedInSession] Background revalidation failed: {e}")
+
+    async def refresh_loop(self, interval_seconds: Optional[float] = None):
+        """
+        Keep the cached status fresh: whenever the last check is older than
+        the TTL, revalidate. Scrapes that load the company page reset the
+        clock, so this only costs a page load for idle sessions.
+        """
+        interval_seconds = interval_seconds or max(60, self.ttl_seconds // 4)
+        while True:
+            await asyncio.sleep(interval_seconds)
+            age = self.age()
+            if self.session_file.exists() and (age is None or age > self.ttl_seconds):
+                await self._revalidate_quietly()
+
+
+session_health = LinkedInSessionHealth()
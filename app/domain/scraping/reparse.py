@@ -0,0 +1,193 @@
+"""
+Offline Re-parse
+----------------
+Rebuilds scraped_data from the archived raw captures (see
+app/utils/capture_archive.py) with the current parsers, then re-ingests it
+into the vector DB. Use it after changing a selector or parser instead of
+scraping the platforms again.
+
+Social scrapes are incremental by default, so one manifest often holds only
+a delta. Posts are merged across the kept manifests, newest first, back to
+the newest full scrape. Only a rebuild that reaches a full scrape replaces
+the scrape cache entry.
+
+The rebuild makes no network requests. Re-ingesting still calls the
+embedding API, but VectorDB.add_posts skips chunks it already holds, so
+only text the new parser produces differently is embedded.
+
+Usage:
+    python -m app.domain.scraping.reparse --company "Acme" \\
+        [--instagram acme] [--linkedin acme-inc] [--twitter acme] \\
+        [--website https://acme.com] [--no-ingest] [--no-cache] [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.brand.scraping_orchestrator import ScrapingOrchestrator, POSTS_KEYS
+from app.domain.scraping import instagram_service, linkedin_service, twitter_service, website_scraper
+from app.domain.scraping.high_water_marks import post_key
+from app.utils.capture_archive import capture_archive, CaptureArchive
+from app.utils.scrape_cache import scrape_cache
+
+REBUILDERS = {
+    "instagram": instagram_service.rebuild_from_capture,
+    "linkedin": linkedin_service.rebuild_from_capture,
+    "twitter": twitter_service.rebuild_from_capture,
+    "website": website_scraper.rebuild_from_capture,
+}
+
+# Posts a scraper returns at most, applied to merged results
+POST_LIMITS = {
+    "instagram": instagram_service.POSTS_LIMIT,
+    "linkedin": linkedin_service.LIMIT,
+    "twitter": twitter_service.TWEET_LIMIT,
+}
+
+
+def _website_target(website_url: str) -> str:
+    # Same normalisation scrape_website applies before capturing
+    if not website_url.startswith("http"):
+        website_url = "https://" + website_url
+    return website_url.rstrip("/")
+
+
+def _merge_results(platform: str, results: List[Dict]) -> Dict:
+    """
+    One result from per-manifest results (newest first): profile data from
+    the newest usable one, posts merged by post_key, newest first.
+    """
+    merged = dict(next((r for r in results if not ScrapingOrchestrator.is_failed(platform, r)), results[0]))
+    posts_key = POSTS_KEYS[platform]
+    posts = {}
+    for result in results:
+        for post in result.get(posts_key, []):
+            posts.setdefault(post_key(post), post)
+    merged[posts_key] = list(posts.values())[:POST_LIMITS[platform]]
+    if "total_collected" in merged:
+        merged["total_collected"] = len(merged[posts_key])
+    return merged
+
+
+def rebuild_platform(platform: str, handle: str,
+                     archive: CaptureArchive = capture_archive) -> Tuple[Optional[Dict], bool]:
+    """
+    Rebuild one platform's scrape result from its archived captures.
+    Returns (result, complete): result is None if there are no captures,
+    and complete is False when no full (non-incremental) scrape was among
+    the kept manifests, so the result may be missing older posts.
+    """
+    if platform == "website":
+        target = _website_target(handle)
+    else:
+        target = ScrapingOrchestrator.platform_target(platform, handle)
+
+    paths = archive.manifests(platform, target)
+    if not paths:
+        print(f"[Reparse] No archived {platform} capture for {target}")
+        return None, False
+
+    results, complete = [], False
+    for path in paths:
+        manifest = archive.read_manifest(path)
+        print(f"[Reparse] Rebuilding {platform} from {len(manifest['captures'])} captures "
+              f"taken {manifest['started_at']}")
+        result = REBUILDERS[platform](manifest, archive)
+        if result:
+            results.append(result)
+        if platform == "website" or not manifest.get("incremental", True):
+            # A full scrape (website crawls always are) needs nothing older
+            complete = True
+            break
+
+    if not results:
+        return None, complete
+    if platform == "website":
+        return results[0], complete
+    return _merge_results(platform, results), complete
+
+
+def rebuild_scraped_data(handles: Dict[str, str], update_cache: bool = True,
+                         archive: CaptureArchive = capture_archive) -> Dict:
+    """
+    Rebuild scraped_data ({platform: result}) for the given handles.
+    Rebuilt results that reach a full scrape replace the scrape cache
+    entries unless `update_cache` is False.
+    """
+    scraped_data = {}
+    for platform, handle in handles.items():
+        try:
+            result, complete = rebuild_platform(platform, handle, archive)
+        except Exception as e:
+            print(f"[Reparse] Rebuilding {platform} failed: {e}")
+            continue
+        if not result:
+            continue
+        scraped_data[platform] = result
+
+        if platform == "website":
+            print(f"[Reparse] website: {len(result.get('pages', []))} pages")
+            if update_cache and result.get("pages"):
+                scrape_cache.set("website", result["url"], result)
+        else:
+            print(f"[Reparse] {platform}: {len(result.get(POSTS_KEYS[platform], []))} posts")
+            if not complete:
+                print(f"[Reparse] No full {platform} scrape among the kept captures; "
+                      f"not replacing its scrape cache entry")
+            elif update_cache and not ScrapingOrchestrator.is_failed(platform, result):
+                scrape_cache.set(platform, handle, result)
+    return scraped_data
+
+
+async def reingest(scraped_data: Dict, company: str) -> int:
+    """Chunk and embed rebuilt data into the company's collection. Returns the chunk count."""
+    from app.utils.text_processor import TextProcessor
+    from app.utils.vector_db import VectorDB
+
+    chunks = TextProcessor.process_all_platforms(scraped_data, company)
+    if chunks:
+        await asyncio.to_thread(VectorDB().add_posts, company, chunks)
+    print(f"[Reparse] Re-ingested {len(chunks)} chunks for {company}")
+    return len(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company", required=True, help="Company name (vector DB collection)")
+    parser.add_argument("--instagram", help="Instagram handle")
+    parser.add_argument("--linkedin", help="LinkedIn company handle")
+    parser.add_argument("--twitter", help="Twitter username")
+    parser.add_argument("--website", help="Website URL")
+    parser.add_argument("--no-ingest", action="store_true", help="Rebuild only, don't touch the vector DB")
+    parser.add_argument("--no-cache", action="store_true", help="Don't replace scrape cache entries")
+    parser.add_argument("--output", help="Also write the rebuilt scraped_data to this JSON file")
+    args = parser.parse_args()
+
+    handles = {
+        platform: handle
+        for platform, handle in (("instagram", args.instagram), ("linkedin", args.linkedin),
+                                 ("twitter", args.twitter), ("website", args.website))
+        if handle
+    }
+    if not handles:
+        parser.error("give at least one of --instagram, --linkedin, --twitter, --website")
+
+    scraped_data = rebuild_scraped_data(handles, update_cache=not args.no_cache)
+    if not scraped_data:
+        print("[Reparse] Nothing rebuilt")
+        sys.exit(1)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(scraped_data, f, indent=2, ensure_ascii=False)
+        print(f"[Reparse] Wrote {args.output}")
+
+    if not args.no_ingest:
+        asyncio.run(reingest(scraped_data, args.company))
+
+
+if __name__ == "__main__":
+    main()
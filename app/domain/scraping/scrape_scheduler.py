@@ -0,0 +1,217 @@
+"""
+Scrape scheduler.
+
+Sits behind ScrapingOrchestrator so concurrent campaigns share one set of
+per-platform limits instead of each launching its own browsers:
+
+  - Concurrency slots per platform (one LinkedIn session at a time by
+    default, since every scrape reuses the same logged-in account).
+  - Token-bucket pacing per platform, so slots freeing up quickly don't
+    turn into a burst of page loads.
+  - Per-brand fairness: waiting jobs are granted slots round-robin by
+    brand, so a brand with many queued scrapes can't starve the others.
+  - Single-flight coalescing: concurrent requests for the same platform
+    and handle share one scrape. It is cancelled only once every caller
+    waiting on it has been cancelled (e.g. timed out).
+  - Queue-depth / wait-time metrics per platform, see `metrics()`.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+
+def _limit(platform: str, name: str, default: str) -> float:
+    return float(os.getenv(f"SCRAPE_{platform.upper()}_{name}", default))
+
+
+# Slots, sustained rate (scrapes per minute) and burst per platform.
+# Override with e.g. SCRAPE_LINKEDIN_CONCURRENCY / SCRAPE_LINKEDIN_RATE_PER_MINUTE / SCRAPE_LINKEDIN_BURST.
+PLATFORM_LIMITS: Dict[str, Dict[str, float]] = {
+    platform: {
+        "concurrency": int(_limit(platform, "CONCURRENCY", concurrency)),
+        "rate_per_minute": _limit(platform, "RATE_PER_MINUTE", rate),
+        "burst": _limit(platform, "BURST", burst),
+    }
+    for platform, concurrency, rate, burst in (
+        ("instagram", "2", "6", "2"),
+        ("linkedin", "1", "4", "1"),
+        ("twitter", "2", "6", "2"),
+    )
+}
+_DEFAULT_LIMITS = {"concurrency": 2, "rate_per_minute": 10.0, "burst": 2.0}
+
+
+class _TokenBucket:
+    """Classic token bucket: `rate` tokens/second, holding at most `capacity`."""
+
+    def __init__(self, rate_per_minute: float, capacity: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1.0:
+                if self.rate <= 0:
+                    break  # pacing disabled
+                delay = (1.0 - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens = max(0.0, self.tokens - 1.0)
+        return waited
+
+
+class _PlatformLane:
+    """Slots, pacing and a per-brand round-robin wait queue for one platform."""
+
+    def __init__(self, platform: str, limits: Dict[str, float]):
+        self.platform = platform
+        self.slots = max(1, int(limits["concurrency"]))
+        self.bucket = _TokenBucket(limits["rate_per_minute"], limits["burst"])
+        self.active = 0
+        self.waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+
+    def queue_depth(self) -> int:
+        return sum(len(q) for q in self.waiting.values())
+
+    def _dispatch(self):
+        """Grant free slots to waiting jobs, one brand at a time in rotation."""
+        while self.active < self.slots and self.waiting:
+            brand, queue = next(iter(self.waiting.items()))
+            waiter = queue.popleft()
+            if queue:
+                self.waiting.move_to_end(brand)
+            else:
+                del self.waiting[brand]
+            if waiter.done():  # caller was cancelled while queued
+                continue
+            self.active += 1
+            waiter.set_result(None)
+
+    async def run(self, brand: str, job: Callable[[], Awaitable]):
+        queued_at = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiting.setdefault(brand, deque()).append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth())
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted just as we were cancelled; hand it on
+                self.active -= 1
+                self._dispatch()
+            raise
+
+        try:
+            await self.bucket.acquire()
+            self.total_wait_seconds += time.monotonic() - queued_at
+            result = await job()
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.active -= 1
+            self._dispatch()
+
+    def metrics(self) -> Dict:
+        started = self.completed + self.failed
+        return {
+            "slots": self.slots,
+            "active": self.active,
+            "queued": self.queue_depth(),
+            "queued_by_brand": {brand: len(q) for brand, q in self.waiting.items()},
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "avg_wait_seconds": round(self.total_wait_seconds / started, 2) if started else 0.0,
+        }
+
+
+class ScrapeScheduler:
+    """Process-wide scheduler for platform scrapes."""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self.limits = limits or PLATFORM_LIMITS
+        self.lanes: Dict[str, _PlatformLane] = {}
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._waiters: Dict[Tuple, int] = {}
+
+    def _lane(self, platform: str) -> _PlatformLane:
+        if platform not in self.lanes:
+            self.lanes[platform] = _PlatformLane(platform, self.limits.get(platform, _DEFAULT_LIMITS))
+        return self.lanes[platform]
+
+    @staticmethod
+    def _flight_key(platform: str, handle: str, variant: Tuple) -> Tuple:
+        return (platform, handle.lower().strip().rstrip("/")) + variant
+
+    async def submit(self, platform: str, handle: str, brand: str,
+                     job: Callable[[], Awaitable], variant: Tuple = ()):
+        """
+        Run `job` (a zero-arg coroutine function scraping `handle`) under the
+        platform's limits and return its result. A concurrent submit with the
+        same platform, handle and `variant` awaits the same run instead.
+        """
+        lane = self._lane(platform)
+        key = self._flight_key(platform, handle, variant)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            lane.coalesced += 1
+            print(f"[ScrapeScheduler] {platform}:{handle} already in flight, sharing its result")
+        else:
+            task = asyncio.create_task(lane.run(brand or handle, job))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+            depth = lane.queue_depth()
+            if depth:
+                print(f"[ScrapeScheduler] {platform}: {lane.active}/{lane.slots} slots busy, "
+                      f"{depth} queued")
+
+        # Shield so one caller going away doesn't cancel a scrape others share;
+        # the last one to leave cancels it
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1 and not task.done():
+                print(f"[ScrapeScheduler] Cancelling {platform}:{handle}, no callers left")
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Per-platform slots, queue depth and throughput counters."""
+        return {platform: lane.metrics() for platform, lane in self.lanes.items()}
+
+
+scrape_scheduler = ScrapeScheduler()
@@ -0,0 +1,152 @@
+"""
+Process-isolated scraper workers.
+
+With SCRAPE_WORKER_PROCESSES > 0, ScrapingOrchestrator runs each platform
+scrape in a separate worker process instead of the API's event loop, so
+Playwright and the parsing of large pages can't stall API requests.
+
+  - At most SCRAPE_WORKER_PROCESSES workers run at once. Each job gets a
+    fresh process, so a crashed or wedged browser never poisons the next
+    job.
+  - Workers lead their own process group. On timeout or cancellation the
+    whole group (Python, the Playwright driver and Chromium) is killed.
+  - Results come back over a pipe as zlib-compressed compact JSON, along
+    with whether the LinkedIn session needs a /feed revalidation; the
+    parent runs that check, as the worker exits right after the scrape.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import zlib
+from typing import Dict, List, Optional, Set
+
+SCRAPE_WORKER_PROCESSES = int(os.getenv("SCRAPE_WORKER_PROCESSES", "0"))
+# Hard cap for one job, on top of the orchestrator's per-platform timeouts
+SCRAPE_WORKER_TIMEOUT = float(os.getenv("SCRAPE_WORKER_TIMEOUT_SECONDS", "600"))
+
+_ctx = multiprocessing.get_context("spawn")
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def workers_enabled() -> bool:
+    return SCRAPE_WORKER_PROCESSES > 0
+
+
+def encode_result(result: Optional[Dict]) -> bytes:
+    return zlib.compress(json.dumps(result, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def decode_result(payload: bytes) -> Optional[Dict]:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+async def _run_scraper(platform: str, target: str, known_post_ids: Set[str]) -> Optional[Dict]:
+    from app.utils.stealth_browser import close_shared_browser
+
+    try:
+        if platform == "instagram":
+            from app.domain.scraping.instagram_service import scrape_instagram
+            return await scrape_instagram(target, known_post_ids=known_post_ids)
+        if platform == "linkedin":
+            from app.domain.scraping.linkedin_service import scrape_linkedin
+            return await scrape_linkedin(target, known_post_ids=known_post_ids)
+        if platform == "twitter":
+            from app.domain.scraping.twitter_service import get_twitter_data
+            return await get_twitter_data(target, known_post_ids=known_post_ids)
+        raise ValueError(f"Unknown platform: {platform}")
+    finally:
+        await close_shared_browser()
+
+
+def _worker_main(platform: str, target: str, known_post_ids: List[str], conn):
+    """
+    Worker process entry point: scrape, then send the encoded reply
+    {"result": result or None on error, "revalidate_linkedin_session": bool}.
+    """
+    from app.domain.scraping.linkedin_session import session_health
+
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()  # so the parent can kill browser children with the worker
+    session_health.defer_revalidation = True
+    try:
+        result = asyncio.run(_run_scraper(platform, target, set(known_post_ids)))
+    except Exception as e:
+        print(f"[ScrapeWorker] {platform} scrape failed in worker {os.getpid()}: {e}")
+        result = None
+    conn.send_bytes(encode_result({
+        "result": result,
+        "revalidate_linkedin_session": session_health.revalidation_requested,
+    }))
+    conn.close()
+
+
+def _kill(proc):
+    """Kill a worker and everything it spawned."""
+    if proc.pid is None:
+        return
+    try:
+        if hasattr(os, "killpg"):
+            # Even after a clean exit, an orphaned Chromium may be left in the group
+            os.killpg(proc.pid, signal.SIGKILL)
+        elif proc.exitcode is None:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _receive(conn, timeout: float) -> Optional[bytes]:
+    """Block (in a thread) until the worker replies; None if it died without replying."""
+    if not conn.poll(timeout):
+        raise TimeoutError(f"no result after {timeout:g}s")
+    try:
+        return conn.recv_bytes()
+    except EOFError:
+        return None
+
+
+async def run_in_worker(platform: str, target: str, known_post_ids: Optional[Set[str]] = None,
+                        timeout: float = SCRAPE_WORKER_TIMEOUT) -> Optional[Dict]:
+    """
+    Run one platform scrape in a worker process and return its result.
+    Returns None if the worker crashed, timed out or the scrape raised.
+    """
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, SCRAPE_WORKER_PROCESSES))
+
+    async with _slots:
+        recv_conn, send_conn = _ctx.Pipe(duplex=False)
+        proc = _ctx.Process(
+            target=_worker_main,
+            args=(platform, target, sorted(known_post_ids or ()), send_conn),
+            daemon=True,
+        )
+        proc.start()
+        send_conn.close()
+        print(f"[ScrapeWorker] {platform} scrape started in worker {proc.pid}")
+
+        try:
+            payload = await asyncio.to_thread(_receive, recv_conn, timeout)
+            if payload is None:
+                await asyncio.to_thread(proc.join, 5)
+                print(f"[ScrapeWorker] Worker {proc.pid} exited without a result "
+                      f"(exit code {proc.exitcode}), treating {platform} as failed")
+                return None
+            reply = decode_result(payload)
+            if reply.get("revalidate_linkedin_session"):
+                from app.domain.scraping.linkedin_session import session_health
+                session_health.revalidate_in_background()
+            result = reply["result"]
+            print(f"[ScrapeWorker] {platform} result received from worker {proc.pid} "
+                  f"({len(payload) / 1024:.1f} KB compressed)")
+            return result
+        except TimeoutError as e:
+            print(f"[ScrapeWorker] Worker {proc.pid} hung ({e}), killing it")
+            return None
+        finally:
+            _kill(proc)
+            await asyncio.to_thread(proc.join, 5)
+            recv_conn.close()
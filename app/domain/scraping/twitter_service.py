@@ -1,20 +1,167 @@
 import asyncio
+import html
 from playwright.async_api import async_playwright
 import json
 from app.utils.stealth_browser import create_stealth_browser, create_stealth_context, create_stealth_page
+from app.domain.scraping.high_water_marks import post_key, KNOWN_STREAK_TO_STOP
+from app.utils.capture_archive import capture_archive
 
+# GraphQL operations whose JSON responses carry the timeline tweets
+TIMELINE_OPERATIONS = ("UserTweets", "UserTweetsAndReplies", "UserMedia")
 
-async def get_twitter_data(username: str = "elonmusk"):
+# Tweets kept per scrape
+TWEET_LIMIT = 25
+
+
+def _tweet_text(result, legacy):
+    """
+    Tweet text as shown on the page: long-form text when present, t.co
+    links expanded, trailing media links dropped and HTML entities decoded.
+    """
+    note = ((result.get("note_tweet") or {}).get("note_tweet_results") or {}).get("result") or {}
+    text = note.get("text") or legacy.get("full_text") or ""
+    entities = (note.get("entity_set") if note.get("text") else None) or legacy.get("entities") or {}
+    for url in entities.get("urls", []):
+        if url.get("url"):
+            text = text.replace(url["url"], url.get("expanded_url") or url.get("display_url") or "")
+    for media in entities.get("media", []):
+        if media.get("url"):
+            text = text.replace(media["url"], "")
+    return html.unescape(text).strip()
+
+
+def _tweet_from_result(result):
+    """Tweet dict from a GraphQL tweet result node, or None."""
+    legacy = result.get("legacy") or {}
+    text = _tweet_text(result, legacy)
+    if not text:
+        return None
+    image_url = ""
+    for media in (legacy.get("extended_entities") or legacy.get("entities") or {}).get("media", []):
+        if "twimg.com/media" in media.get("media_url_https", ""):
+            image_url = media["media_url_https"]
+            break
+    tweet = {"content": text, "image_url": image_url}
+
+    tweet_id = result.get("rest_id") or legacy.get("id_str")
+    if tweet_id:
+        # A /status/ URL makes post_key stable across text changes
+        user = ((result.get("core") or {}).get("user_results") or {}).get("result") or {}
+        screen_name = (user.get("core") or {}).get("screen_name") or (user.get("legacy") or {}).get("screen_name")
+        tweet["post_url"] = f"https://x.com/{screen_name or 'i/web'}/status/{tweet_id}"
+    return tweet
+
+
+def parse_timeline_json(payload):
+    """Tweets in a timeline GraphQL response, in timeline order."""
+    tweets = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            result = node.get("tweet_results", {}).get("result") if "tweet_results" in node else None
+            if result:
+                # Tweets behind a visibility interstitial are wrapped once more
+                tweet = _tweet_from_result(result.get("tweet", result))
+                if tweet:
+                    tweets.append(tweet)
+                return
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(payload)
+    return tweets
+
+
+def select_tweets(timeline_tweets, known_post_ids=None, limit=TWEET_LIMIT):
+    """
+    The scrape result from parsed timeline tweets: de-duplicated, known
+    posts skipped, capped at `limit`. Returns (tweets, known posts seen).
+    Shared by the live scrape and the offline rebuild so both agree.
+    """
+    known_post_ids = known_post_ids or set()
+    collected = {}
+    known_seen = set()
+    for tweet in timeline_tweets:
+        key = post_key(tweet)
+        if key in known_post_ids:
+            known_seen.add(key)
+        elif key not in collected:
+            collected[key] = tweet
+    return list(collected.values())[:limit], known_seen
+
+
+def rebuild_from_capture(manifest, archive):
+    """Rebuild a get_twitter_data result offline from archived timeline responses."""
+    timeline_tweets = []
+    for capture in manifest["captures"]:
+        if capture["kind"] == "timeline_json":
+            timeline_tweets.extend(parse_timeline_json(archive.read(capture)))
+    tweets, _ = select_tweets(timeline_tweets)
+    return {"platform": "twitter", "posts": tweets}
+
+
+async def _dom_tweets(page):
+    """Fallback when no timeline JSON was seen: read tweets from the rendered articles."""
+    tweets = []
+    for article in await page.query_selector_all("article"):
+        try:
+            text_element = await article.query_selector("div[data-testid='tweetText']")
+            if not text_element:
+                text_element = await article.query_selector("div[lang]")
+
+            image_url = ""
+            try:
+                # Look for media images (excluding avatars and emojis)
+                img_elements = await article.query_selector_all("div[data-testid='tweetPhoto'] img")
+                if img_elements:
+                    src = await img_elements[0].get_attribute("src")
+                    if src and "twimg.com/media" in src:
+                        image_url = src
+            except:
+                pass
+
+            if text_element:
+                text = await text_element.inner_text()
+                if text:
+                    tweets.append({"content": text, "image_url": image_url})
+        except:
+            continue
+    return tweets
+
+
+async def get_twitter_data(username: str = "elonmusk", known_post_ids=None):
     """
     Scrape Twitter/X data using Playwright stealth mode.
     No login or session files required — scrapes publicly visible tweets.
 
     Args:
         username: Twitter username (without @)
+        known_post_ids: Post ids from a previous scrape; scrolling stops once
+            enough of them are seen and they are not returned again
 
     Returns:
         dict: Contains platform name and list of posts
+
+    Tweets are parsed from the timeline GraphQL responses the page loads
+    (parse_timeline_json), falling back to the rendered articles only if
+    none arrive. The responses are kept in the capture archive, so an
+    offline re-parse runs the same parser.
     """
+    capture = capture_archive.start("twitter", username, incremental=bool(known_post_ids))
+    timeline_tweets = []
+
+    async def _on_timeline(response):
+        if "/graphql/" in response.url and any(op in response.url for op in TIMELINE_OPERATIONS):
+            try:
+                payload = await response.json()
+                timeline_tweets.extend(parse_timeline_json(payload))
+                await asyncio.to_thread(capture.add, "timeline_json", response.url, payload)
+            except Exception as e:
+                print(f"   Could not read timeline response: {e}")
+
     print(f"\n{'='*60}")
     print(f"TWITTER SCRAPER STARTED")
     print(f"{'='*60}")
@@ -25,8 +172,9 @@ async def get_twitter_data(username: str = "elonmusk"):
             print("1️ Launching stealth browser...")
             try:
                 browser = await create_stealth_browser(p, headless=True)
-                context = await create_stealth_context(browser)
+                context = await create_stealth_context(browser, block_profile="twitter")
                 page = await create_stealth_page(context)
+                page.on("response", _on_timeline)
                 print("Stealth browser launched successfully\n")
             except Exception as e:
                 print(f"Failed to launch browser: {e}")
@@ -89,6 +237,7 @@ async def get_twitter_data(username: str = "elonmusk"):
 
             print("3️ Scrolling and extracting tweets...")
             tweets = []
+            dom_tweets = []
             max_scrolls = 30
             no_new_count = 0
 
@@ -100,42 +249,23 @@ async def get_twitter_data(username: str = "elonmusk"):
                         except:
                             pass
 
-                    articles = await page.query_selector_all("article")
                     old_count = len(tweets)
+                    if not timeline_tweets:
+                        # The timeline is virtualized: keep what earlier scrolls rendered
+                        dom_tweets.extend(await _dom_tweets(page))
+                    tweets, known_seen = select_tweets(timeline_tweets or dom_tweets, known_post_ids)
 
-                    for article in articles:
-                        try:
-                            text_element = await article.query_selector("div[data-testid='tweetText']")
-                            if not text_element:
-                                text_element = await article.query_selector("div[lang]")
-
-                            image_url = ""
-                            try:
-                                # Look for media images (excluding avatars and emojis)
-                                img_elements = await article.query_selector_all("div[data-testid='tweetPhoto'] img")
-                                if img_elements:
-                                    src = await img_elements[0].get_attribute("src")
-                                    if src and "twimg.com/media" in src:
-                                        image_url = src
-                            except:
-                                pass
-
-                            if text_element:
-                                text = await text_element.inner_text()
-                                if text and text not in [t["content"] for t in tweets]:
-                                    tweets.append({
-                                        "content": text,
-                                        "image_url": image_url
-                                    })
-                        except:
-                            continue
-
-                    print(f"   Scroll {i+1}/{max_scrolls} — {len(tweets)}/25 tweets collected")
+                    source = "timeline JSON" if timeline_tweets else "page"
+                    print(f"   Scroll {i+1}/{max_scrolls} — {len(tweets)}/{TWEET_LIMIT} tweets collected ({source})")
 
-                    if len(tweets) >= 25:
+                    if len(tweets) >= TWEET_LIMIT:
                         print("   Target reached!")
                         break
 
+                    if len(known_seen) >= KNOWN_STREAK_TO_STOP:
+                        print(f"   Reached {len(known_seen)} previously scraped tweets, stopping...")
+                        break
+
                     if len(tweets) == old_count:
                         no_new_count += 1
                     else:
@@ -151,14 +281,16 @@ async def get_twitter_data(username: str = "elonmusk"):
             except Exception as e:
                 print(f"Scrolling/extraction error: {e}\n")
 
+            traffic = context.traffic_stats.summary()
+            context.traffic_stats.log("Twitter")
             await browser.close()
 
             print(f"{'='*60}")
             print(f"TWITTER SCRAPING COMPLETE")
-            print(f"   Tweets scraped: {len(tweets)}/25")
+            print(f"   Tweets scraped: {len(tweets)}/{TWEET_LIMIT}")
             print(f"{'='*60}\n")
 
-            return {"platform": "twitter", "posts": tweets}
+            return {"platform": "twitter", "posts": tweets, "traffic": traffic}
 
     except Exception as e:
         print(f"\n{'='*60}")
@@ -168,6 +300,8 @@ async def get_twitter_data(username: str = "elonmusk"):
         print(f"{'='*60}\n")
 
         return {"platform": "twitter", "posts": []}
+    finally:
+        await asyncio.to_thread(capture.save)
 
 
 if __name__ == "__main__":
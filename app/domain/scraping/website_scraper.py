@@ -2,24 +2,42 @@
 WebsiteScraper — Crawl a company's website and extract text content.
 
 Strategy:
-  1. Try direct HTTP (requests + BeautifulSoup) first — works for
-     server-rendered sites.
-  2. If direct crawl yields little/no text (JS-rendered SPA), fall back
-     to Gemini to extract website content.
+  1. Discover pages from robots.txt / sitemap.xml and same-origin links,
+     within depth, page-count, byte and time budgets.
+  2. Fetch them with a pooled async httpx client (concurrent, capped per
+     host) and parse with the configured html_extract backend. Page bodies are cached with their
+     ETag / Last-Modified so re-crawls send conditional GETs and skip
+     parsing unchanged pages.
+  3. If direct HTTP yields little/no text (JS-rendered SPA), render the
+     page in the shared headless browser and extract text locally.
+  4. Only if no page yields text that way, fall back to Gemini — once per
+     site, not once per page.
+  5. Strip text blocks repeated across pages (nav, footer, cookie banners)
+     before truncating each page, so the per-page budget goes to unique content.
 """
 
-import re
+import asyncio
 import os
-from urllib.parse import urljoin, urlparse
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlparse, urldefrag
+from urllib.robotparser import RobotFileParser
 from typing import Optional
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
 from google import genai
 
+from app.utils.scrape_cache import scrape_cache, page_cache
+from app.utils.capture_archive import capture_archive
+from app.utils.llm_cache import llm_cache
+from app.utils.html_extract import extract_page
+from app.utils.stealth_browser import get_shared_browser, create_stealth_context
+from app.domain.scraping.boilerplate import strip_boilerplate
+
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
+GEMINI_MODEL = "gemini-2.5-flash"
 
-# Subpaths to attempt crawling in addition to the homepage
+# Subpaths preferred when choosing among discovered pages, and guessed
+# only when neither the sitemap nor the homepage yields any links
 _KEY_SUBPATHS = [
     "/about", "/about-us", "/aboutus",
     "/products", "/services", "/solutions",
@@ -36,52 +54,53 @@ _HEADERS = {
 _TIMEOUT = 20
 _MAX_CHARS_PER_PAGE = 4000
 
+# Concurrent requests per host, and wall-clock budget for a whole site crawl
+_MAX_CONCURRENCY_PER_HOST = int(os.getenv("WEBSITE_CRAWL_CONCURRENCY", "4"))
+_CRAWL_BUDGET_SECONDS = float(os.getenv("WEBSITE_CRAWL_BUDGET_SECONDS", "60"))
 
-def _extract_text_from_html(html: str) -> tuple[str, str, str]:
-    """
-    Extract title, meta description, and body text from raw HTML.
-    Returns (title, meta_description, content).
-    """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Title
-    title = ""
-    if soup.title and soup.title.string:
-        title = soup.title.string.strip()
+# Discovery budgets
+_MAX_DEPTH = int(os.getenv("WEBSITE_CRAWL_MAX_DEPTH", "2"))
+_MAX_PAGES = int(os.getenv("WEBSITE_CRAWL_MAX_PAGES", "12"))
+_MAX_BYTES = int(os.getenv("WEBSITE_CRAWL_MAX_BYTES", str(5 * 1024 * 1024)))
+# Pages that don't exist aren't worth a headless render
+_NOT_FOUND_STATUSES = (404, 410)
+_MAX_RENDERS_IN_FLIGHT = 2
+_RENDER_TIMEOUT_MS = 20000
+_MAX_SITEMAPS = 5
+_MAX_SITEMAP_URLS = 500
 
-    # Meta description
-    meta_desc = ""
-    for attr in [{"name": "description"}, {"property": "og:description"}]:
-        tag = soup.find("meta", attrs=attr)
-        if tag and tag.get("content"):
-            meta_desc = tag["content"].strip()
-            break
+_SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico",
+    ".zip", ".gz", ".mp4", ".mp3", ".css", ".js", ".xml", ".json",
+)
 
-    # Body content — try structured tags first
-    text_parts = []
-    for tag in soup.find_all(["p", "h1", "h2", "h3", "h4", "h5", "h6", "li",
-                               "blockquote", "td", "th", "article", "section"]):
-        t = tag.get_text(separator=" ", strip=True)
-        if t and len(t) > 10:
-            text_parts.append(t)
 
-    content = " ".join(text_parts)
-    content = re.sub(r"\s+", " ", content).strip()
-
-    # Fallback: ALL visible text
-    if len(content) < 100:
-        for tag in soup.find_all(["script", "style", "noscript", "iframe", "svg"]):
-            tag.decompose()
-        content = soup.get_text(separator=" ", strip=True)
-        content = re.sub(r"\s+", " ", content).strip()
-
-    return title, meta_desc, content
+def _parse_page(html: str, url: str) -> dict:
+    """
+    Parse a page once and return {"title", "meta_description", "content",
+    "blocks", "links"}, where links are the same-origin page links in
+    document order.
+    """
+    page = extract_page(html)
+    links = []
+    for href in page["hrefs"]:
+        link = _normalise_link(url, href)
+        if link and _same_origin(url, link):
+            links.append(link)
+    return {
+        "title": page["title"],
+        "meta_description": page["meta_description"],
+        "content": page["content"],
+        "blocks": page["blocks"],
+        "links": list(dict.fromkeys(links)),
+    }
 
 
-def _crawl_with_gemini(website_url: str) -> str:
+def _crawl_with_gemini(website_url: str, use_cache: bool = True) -> str:
     """
     Use Gemini to extract content from a website URL.
     Gemini 2.5 Flash supports URL context and can fetch page content.
+    Extractions go through the LLM response cache unless use_cache is False.
     """
     if not GOOGLE_API_KEY:
         print("[WebsiteScraper] No GOOGLE_API_KEY set, skipping Gemini fallback.")
@@ -101,13 +120,20 @@ Instructions:
 - Do NOT make up content — only return what's actually on the website
 - Include any pricing info, team info, company descriptions, etc. that you find"""
 
+        if use_cache:
+            cached = llm_cache.get("website_gemini", GEMINI_MODEL, None, prompt)
+            if cached is not None:
+                return cached
+
         response = client.models.generate_content(
-            model="gemini-2.5-flash",
+            model=GEMINI_MODEL,
             contents=prompt,
         )
         text = response.text.strip() if response.text else ""
         if text:
             print(f"[WebsiteScraper] Gemini extracted {len(text)} chars for {website_url}")
+            if use_cache:
+                llm_cache.set("website_gemini", GEMINI_MODEL, None, prompt, text)
         return text
 
     except Exception as e:
@@ -115,48 +141,309 @@ Instructions:
         return ""
 
 
-def _crawl_page(url: str) -> Optional[dict]:
+def _normalise_link(base_url: str, href: str) -> Optional[str]:
+    """Absolute, fragment-free http(s) URL for a crawlable page, else None."""
+    href = href.strip()
+    if not href or href.startswith(("mailto:", "tel:", "javascript:", "#")):
+        return None
+    link, _ = urldefrag(urljoin(base_url, href))
+    parsed = urlparse(link)
+    if parsed.scheme not in ("http", "https"):
+        return None
+    if parsed.path.lower().endswith(_SKIP_EXTENSIONS):
+        return None
+    return link
+
+
+def _same_origin(url_a: str, url_b: str) -> bool:
+    host_a = urlparse(url_a).netloc.lower().removeprefix("www.")
+    host_b = urlparse(url_b).netloc.lower().removeprefix("www.")
+    return host_a == host_b
+
+
+def _normalise_key(url: str) -> str:
+    return url.rstrip("/").lower()
+
+
+def _priority(url: str) -> tuple:
+    """Sort key: pages matching _KEY_SUBPATHS first, then shallow paths."""
+    path = urlparse(url).path.lower().rstrip("/")
+    is_key_page = any(path.endswith(sub) for sub in _KEY_SUBPATHS)
+    return (0 if is_key_page else 1, path.count("/"), len(url))
+
+
+class _CrawlBudget:
+    """Page-count, byte and wall-clock limits for one site crawl."""
+
+    def __init__(self):
+        self.deadline = asyncio.get_running_loop().time() + _CRAWL_BUDGET_SECONDS
+        self.pages_used = 0
+        self.bytes_used = 0
+
+    def time_left(self) -> float:
+        return max(0.0, self.deadline - asyncio.get_running_loop().time())
+
+    def pages_left(self) -> int:
+        return max(0, _MAX_PAGES - self.pages_used)
+
+    def bytes_exhausted(self) -> bool:
+        return self.bytes_used >= _MAX_BYTES
+
+    def exhausted(self) -> bool:
+        return self.time_left() <= 0 or self.pages_left() <= 0 or self.bytes_exhausted()
+
+
+async def _discover(client: httpx.AsyncClient, base_origin: str,
+                    budget: _CrawlBudget) -> tuple[list[str], Optional[RobotFileParser]]:
     """
-    Crawl a single page. Tries direct HTTP first, then Gemini fallback.
+    Read robots.txt and the sitemap(s) it lists (or /sitemap.xml).
+    Returns (same-origin page URLs from the sitemaps, robots parser or None).
+    """
+    robots = None
+    sitemaps = []
+    try:
+        r = await client.get(f"{base_origin}/robots.txt")
+        budget.bytes_used += len(r.content)
+        if r.status_code == 200:
+            robots = RobotFileParser()
+            robots.parse(r.text.splitlines())
+            sitemaps = list(robots.site_maps() or [])
+    except Exception as e:
+        print(f"[WebsiteScraper] robots.txt fetch failed for {base_origin}: {e}")
+
+    if not sitemaps:
+        sitemaps = [f"{base_origin}/sitemap.xml"]
+
+    page_urls: list[str] = []
+    fetched = 0
+    while sitemaps and fetched < _MAX_SITEMAPS and len(page_urls) < _MAX_SITEMAP_URLS:
+        sitemap_url = sitemaps.pop(0)
+        fetched += 1
+        try:
+            r = await client.get(sitemap_url)
+            budget.bytes_used += len(r.content)
+            if r.status_code != 200:
+                continue
+            root = ET.fromstring(r.content)
+        except Exception as e:
+            print(f"[WebsiteScraper] Sitemap unavailable at {sitemap_url}: {e}")
+            continue
+
+        for node in root:
+            loc = next((child.text for child in node if child.tag.endswith("loc")), None)
+            if not loc:
+                continue
+            loc = loc.strip()
+            if node.tag.endswith("sitemap"):
+                sitemaps.append(loc)
+            elif _same_origin(base_origin, loc) and not urlparse(loc).path.lower().endswith(_SKIP_EXTENSIONS):
+                page_urls.append(loc)
+
+    if page_urls:
+        print(f"[WebsiteScraper] Sitemap listed {len(page_urls)} pages")
+    return page_urls[:_MAX_SITEMAP_URLS], robots
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Pooled HTTP/2-capable client shared by every page of one site crawl."""
+    return httpx.AsyncClient(
+        http2=True,
+        headers=_HEADERS,
+        timeout=_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=_MAX_CONCURRENCY_PER_HOST * 2,
+            max_keepalive_connections=_MAX_CONCURRENCY_PER_HOST,
+        ),
+    )
+
+
+class _HostLimiter:
+    """One semaphore per host so no site sees more than N concurrent requests."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.limit)
+        return self._semaphores[host]
+
+
+class _Renderer:
+    """
+    Renders JS-only pages in the shared headless browser.
+    One context per site crawl, created lazily on the first render.
+    """
+
+    def __init__(self, capture=None):
+        self._context = None
+        self._context_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(_MAX_RENDERS_IN_FLIGHT)
+        self._capture = capture
+
+    async def _get_context(self):
+        async with self._context_lock:
+            if self._context is None:
+                browser = await get_shared_browser()
+                self._context = await create_stealth_context(browser, block_profile="default")
+            return self._context
+
+    async def render(self, url: str) -> Optional[dict]:
+        """Render a page and parse it like a direct fetch."""
+        async with self._semaphore:
+            context = await self._get_context()
+            page = await context.new_page()
+            try:
+                await page.goto(url, timeout=_RENDER_TIMEOUT_MS, wait_until="domcontentloaded")
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=_RENDER_TIMEOUT_MS // 2)
+                except Exception:
+                    pass  # long-polling sites never go idle; use what has rendered
+                html = await page.content()
+                final_url = page.url
+            finally:
+                await page.close()
+
+        if self._capture is not None:
+            await asyncio.to_thread(self._capture.add, "rendered_html", url, html)
+        return await asyncio.to_thread(_parse_page, html, final_url)
+
+    async def close(self):
+        if self._context is not None:
+            await self._context.close()
+            self._context = None
+
+
+async def _fetch_page(client: httpx.AsyncClient, limiter: _HostLimiter, url: str,
+                      budget: _CrawlBudget, capture=None) -> tuple[Optional[int], Optional[dict]]:
+    """
+    Fetch and parse a page with a conditional GET, recording the raw HTML
+    in `capture` if given.
+    Returns (HTTP status or None if skipped,
+             {"title", "meta_description", "content", "blocks", "links"} or None).
+    """
+    if budget.bytes_exhausted():
+        return None, None
+
+    async with limiter(url):
+        r = await client.get(url, headers=page_cache.conditional_headers(url))
+    budget.bytes_used += len(r.content)
+
+    if r.status_code == 304:
+        cached = page_cache.get(url)
+        if cached:
+            print(f"[WebsiteScraper] Not modified, reusing cached parse: {url}")
+            if capture is not None:
+                capture.reuse(cached.get("capture"))
+            return r.status_code, cached["page"]
+        return r.status_code, None
+
+    if r.status_code != 200 or len(r.text) <= 200:
+        return r.status_code, None
+
+    entry = None
+    if capture is not None:
+        entry = await asyncio.to_thread(capture.add, "page_html", url, r.text)
+    parsed = await asyncio.to_thread(_parse_page, r.text, str(r.url))
+    page_cache.set(url, parsed, r.headers.get("etag"), r.headers.get("last-modified"), capture=entry)
+    return r.status_code, parsed
+
+
+async def _crawl_page(client: httpx.AsyncClient, limiter: _HostLimiter, renderer: _Renderer,
+                      url: str, budget: _CrawlBudget, capture=None) -> tuple[Optional[dict], list[str]]:
+    """
+    Crawl a single page. Tries direct HTTP first, then a headless render.
+    Returns (page_data or None, same-origin links found on the page).
+    Content is left untruncated, with its text blocks, for the site-level
+    boilerplate pass.
     """
     title = ""
     meta_desc = ""
     content = ""
+    blocks: list[str] = []
+    links: list[str] = []
+    status = None
 
     # --- Attempt 1: Direct HTTP ---
     try:
-        r = requests.get(url, timeout=_TIMEOUT, headers=_HEADERS, allow_redirects=True)
-        if r.status_code == 200 and len(r.text) > 200:
-            title, meta_desc, content = _extract_text_from_html(r.text)
+        status, parsed = await _fetch_page(client, limiter, url, budget, capture)
+        if parsed:
+            title = parsed["title"]
+            meta_desc = parsed["meta_description"]
+            content = parsed["content"]
+            blocks = parsed.get("blocks", [])  # absent in pre-existing page cache entries
+            links = parsed["links"]
     except Exception as e:
-        print(f"[WebsiteScraper] requests failed for {url}: {e}")
-
-    # --- Attempt 2: Gemini fallback for JS-rendered pages ---
-    if len(content) < 100:
-        print(f"[WebsiteScraper] Direct crawl got {len(content)} chars, trying Gemini fallback for {url}...")
-        gemini_content = _crawl_with_gemini(url)
-        if gemini_content and len(gemini_content) > len(content):
-            content = gemini_content
+        print(f"[WebsiteScraper] HTTP fetch failed for {url}: {e}")
+
+    # --- Attempt 2: Headless render for JS-rendered pages ---
+    if len(content) < 100 and status not in _NOT_FOUND_STATUSES:
+        print(f"[WebsiteScraper] Direct crawl got {len(content)} chars, rendering {url} in headless browser...")
+        try:
+            rendered = await renderer.render(url)
+            if rendered and len(rendered["content"]) > len(content):
+                title = rendered["title"] or title
+                meta_desc = rendered["meta_description"] or meta_desc
+                content = rendered["content"]
+                blocks = rendered["blocks"]
+                links = list(dict.fromkeys(links + rendered["links"]))
+        except Exception as e:
+            print(f"[WebsiteScraper] Headless render failed for {url}: {e}")
 
     if len(content) < 30:
-        return None
-
-    content = content[:_MAX_CHARS_PER_PAGE]
+        return None, links
 
     return {
         "url": url,
         "title": title,
         "meta_description": meta_desc,
         "content": content,
-    }
+        "blocks": blocks,
+    }, links
 
 
-def scrape_website(website_url: str) -> dict:
+def _finish_pages(pages: list[dict]):
+    """Drop cross-page boilerplate, then spend the per-page budget on what's left (in place)."""
+    strip_boilerplate(pages)
+    for page_data in pages:
+        page_data.pop("blocks", None)
+        page_data["content"] = page_data["content"][:_MAX_CHARS_PER_PAGE]
+
+        # ── Print to console ──
+        print(f"\n{'─'*50}")
+        print(f"[WebsiteScraper] ✅ Page: {page_data['url']}")
+        print(f"  Title: {page_data['title']}")
+        if page_data["meta_description"]:
+            print(f"  Meta:  {page_data['meta_description']}")
+        print(f"  Content length: {len(page_data['content'])} chars")
+        print(f"  Content:\n{page_data['content']}")
+        print(f"{'─'*50}")
+
+
+def _with_gemini_page(pages: list[dict], website_url: str, gemini_content: str) -> list[dict]:
+    """Put the Gemini fallback text first, in place of any thin homepage."""
+    if len(gemini_content) < 30:
+        return pages
+    pages = [page for page in pages if page["url"] != website_url]
+    pages.insert(0, {
+        "url": website_url,
+        "title": "",
+        "meta_description": "",
+        "content": gemini_content[:_MAX_CHARS_PER_PAGE],
+    })
+    return pages
+
+
+async def scrape_website(website_url: str, force_refresh: bool = False) -> dict:
     """
     Scrape a company website.
 
     Args:
         website_url: Base URL (e.g. https://example.com)
+        force_refresh: Ignore a cached result younger than the cache TTL
 
     Returns:
         {"url": "...", "pages": [{"url", "title", "meta_description", "content"}, ...]}
@@ -165,46 +452,134 @@ def scrape_website(website_url: str) -> dict:
         website_url = "https://" + website_url
     website_url = website_url.rstrip("/")
 
+    if not force_refresh:
+        cached = scrape_cache.get("website", website_url)
+        if cached is not None:
+            return cached
+
     parsed = urlparse(website_url)
     base_origin = f"{parsed.scheme}://{parsed.netloc}"
 
     pages: list[dict] = []
     visited: set[str] = set()
 
-    # Homepage + key subpaths
-    urls_to_try = [website_url]
-    for subpath in _KEY_SUBPATHS:
-        urls_to_try.append(urljoin(base_origin, subpath))
-
     print(f"\n{'='*60}")
     print(f"[WebsiteScraper] 🌐 Crawling website: {website_url}")
     print(f"{'='*60}\n")
 
-    for url in urls_to_try:
-        normalised = url.rstrip("/").lower()
-        if normalised in visited:
-            continue
-        visited.add(normalised)
-
-        page_data = _crawl_page(url)
-        if not page_data:
-            continue
-
-        pages.append(page_data)
-
-        # ── Print to console ──
-        print(f"\n{'─'*50}")
-        print(f"[WebsiteScraper] ✅ Page: {url}")
-        print(f"  Title: {page_data['title']}")
-        if page_data["meta_description"]:
-            print(f"  Meta:  {page_data['meta_description']}")
-        print(f"  Content length: {len(page_data['content'])} chars")
-        print(f"  Content:\n{page_data['content']}")
-        print(f"{'─'*50}")
-
-    print(f"\n[WebsiteScraper] Done — scraped {len(pages)} pages from {website_url}\n")
-
-    return {
+    capture = capture_archive.start("website", website_url)
+    limiter = _HostLimiter(_MAX_CONCURRENCY_PER_HOST)
+    renderer = _Renderer(capture)
+    budget = _CrawlBudget()
+    try:
+        async with _build_client() as client:
+            # Sitemap discovery runs alongside the homepage fetch
+            discovery = asyncio.create_task(_discover(client, base_origin, budget))
+            sitemap_urls: list[str] = []
+            robots = None
+
+            frontier = [website_url]
+            depth = 0
+            while frontier and depth <= _MAX_DEPTH and not budget.exhausted():
+                batch = frontier[:budget.pages_left()]
+                budget.pages_used += len(batch)
+                visited.update(_normalise_key(url) for url in batch)
+
+                tasks = [asyncio.create_task(_crawl_page(client, limiter, renderer, url, budget, capture)) for url in batch]
+                done, pending = await asyncio.wait(tasks, timeout=budget.time_left())
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    print(f"[WebsiteScraper] Crawl budget of {_CRAWL_BUDGET_SECONDS}s exhausted, "
+                          f"dropped {len(pending)} pending pages")
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+                discovered: list[str] = []
+                for url, task in zip(batch, tasks):
+                    if task not in done or task.exception():
+                        continue
+                    page_data, links = task.result()
+                    discovered.extend(links)
+                    if page_data:
+                        pages.append(page_data)
+
+                if depth == 0:
+                    try:
+                        sitemap_urls, robots = await asyncio.wait_for(discovery, timeout=budget.time_left())
+                    except Exception as e:
+                        print(f"[WebsiteScraper] Sitemap discovery failed: {e}")
+                    discovered = sitemap_urls + discovered
+                    if not discovered:
+                        discovered = [urljoin(base_origin, subpath) for subpath in _KEY_SUBPATHS]
+
+                candidates = {}
+                for url in discovered:
+                    key = _normalise_key(url)
+                    if key in visited or key in candidates:
+                        continue
+                    if robots and not robots.can_fetch(_HEADERS["User-Agent"], url):
+                        continue
+                    candidates[key] = url
+                frontier = sorted(candidates.values(), key=_priority)
+                depth += 1
+    finally:
+        # Also on errors and cancellation, or the browser context leaks
+        try:
+            await renderer.close()
+        except Exception as e:
+            print(f"[WebsiteScraper] Failed to close render context: {e}")
+
+    _finish_pages(pages)
+
+    # --- Last resort: Gemini, once for the whole site ---
+    if not any(len(page["content"]) >= 100 for page in pages):
+        print(f"[WebsiteScraper] No page yielded text locally, trying Gemini fallback once for {website_url}...")
+        gemini_content = await asyncio.to_thread(_crawl_with_gemini, website_url, not force_refresh)
+        if len(gemini_content) >= 30:
+            await asyncio.to_thread(capture.add, "gemini_text", website_url, gemini_content)
+        pages = _with_gemini_page(pages, website_url, gemini_content)
+    await asyncio.to_thread(capture.save)
+
+    print(f"\n[WebsiteScraper] Done — scraped {len(pages)} pages from {website_url} "
+          f"({budget.pages_used} fetched, {budget.bytes_used / 1024:.0f} KB)\n")
+
+    result = {
         "url": website_url,
         "pages": pages,
     }
+    if pages:
+        scrape_cache.set("website", website_url, result)
+    return result
+
+
+def rebuild_from_capture(manifest: dict, archive) -> dict:
+    """
+    Rebuild a scrape_website result from an archived capture, re-running
+    the page parser and boilerplate pass offline. Where a page was both
+    fetched and rendered, the capture with more text wins, as in the crawl.
+    """
+    website_url = manifest["target"]
+    best: dict[str, dict] = {}
+    gemini_content = ""
+    for entry in manifest.get("captures", []):
+        if entry["kind"] == "gemini_text":
+            gemini_content = archive.read(entry)
+            continue
+        if entry["kind"] not in ("page_html", "rendered_html"):
+            continue
+        parsed = _parse_page(archive.read(entry), entry["url"])
+        current = best.get(entry["url"])
+        if current is None or len(parsed["content"]) > len(current["content"]):
+            best[entry["url"]] = {
+                "url": entry["url"],
+                "title": parsed["title"] or (current or {}).get("title", ""),
+                "meta_description": parsed["meta_description"] or (current or {}).get("meta_description", ""),
+                "content": parsed["content"],
+                "blocks": parsed.get("blocks", []),
+            }
+
+    pages = [page for page in best.values() if len(page["content"]) >= 30]
+    _finish_pages(pages)
+    if not any(len(page["content"]) >= 100 for page in pages):
+        pages = _with_gemini_page(pages, website_url, gemini_content)
+    return {"url": website_url, "pages": pages}
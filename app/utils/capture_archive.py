@@ -0,0 +1,240 @@
+"""
+Capture Archive
+---------------
+Compressed, content-addressed store of the raw pages and JSON responses
+each scrape saw, so scraped_data can be rebuilt offline when a parser or
+selector changes (see app/domain/scraping/reparse.py).
+
+Layout under SCRAPE_CAPTURE_DIR (default data/captures/):
+  blobs/<sha[:2]>/<sha256>.z               zlib-compressed capture bodies
+  scrapes/<platform>/<target-hash>/<ts>.json  manifest of one scrape
+
+Manifests record whether the scrape was incremental (a delta that skipped
+already-known posts), so a re-parse can tell when it has seen a full one.
+
+Identical bodies (e.g. an unchanged profile page) are stored once. Only
+the newest SCRAPE_CAPTURE_KEEP manifests per target are kept; blobs no
+manifest references are removed when old manifests are pruned.
+Set SCRAPE_CAPTURE_ARCHIVE=false to disable capturing.
+"""
+
+import hashlib
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+
+SCRAPE_CAPTURE_ARCHIVE = os.getenv("SCRAPE_CAPTURE_ARCHIVE", "true").lower() in ("1", "true", "yes")
+SCRAPE_CAPTURE_DIR = Path(os.getenv("SCRAPE_CAPTURE_DIR", "data/captures"))
+SCRAPE_CAPTURE_KEEP = int(os.getenv("SCRAPE_CAPTURE_KEEP", "5"))
+
+# Blobs younger than this may belong to a scrape whose manifest isn't written yet
+_BLOB_GRACE_SECONDS = 3600
+
+
+def _target_key(target: str) -> str:
+    return target.lower().strip().rstrip("/")
+
+
+class ScrapeCapture:
+    """Captures recorded during one scrape; `save()` writes the manifest."""
+
+    def __init__(self, archive: "CaptureArchive", platform: str, target: str, incremental: bool = False):
+        self.archive = archive
+        self.platform = platform
+        self.target = target
+        self.incremental = incremental
+        self.started_at = datetime.now().isoformat()
+        self.captures: List[Dict] = []
+
+    def add(self, kind: str, url: str, body: Union[str, bytes, Dict, List]) -> Optional[Dict]:
+        """
+        Record one capture. `kind` tells the re-parser what it is
+        (e.g. "profile_html", "post_html", "feed_html", "timeline_json").
+        Returns the manifest entry, or None if it couldn't be stored.
+        """
+        try:
+            if isinstance(body, (dict, list)):
+                data, encoding = json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), "json"
+            elif isinstance(body, str):
+                data, encoding = body.encode("utf-8"), "text"
+            else:
+                data, encoding = body, "bytes"
+            sha = self.archive.put_blob(data)
+            entry = {
+                "kind": kind,
+                "url": url,
+                "sha256": sha,
+                "encoding": encoding,
+                "bytes": len(data),
+                "captured_at": datetime.now().isoformat(),
+            }
+            self.captures.append(entry)
+            return entry
+        except Exception as e:
+            print(f"[CaptureArchive] Could not store {kind} capture for {url}: {e}")
+            return None
+
+    def reuse(self, entry: Optional[Dict]):
+        """
+        Record an earlier capture again, e.g. a page that came back
+        304 Not Modified. Skipped if its blob has since been pruned.
+        """
+        if not entry or not self.archive.has_blob(entry["sha256"]):
+            return
+        self.archive.touch_blob(entry["sha256"])
+        self.captures.append(dict(entry, captured_at=datetime.now().isoformat()))
+
+    def save(self) -> Optional[Path]:
+        """Write the manifest (if anything was captured) and prune old scrapes."""
+        if not self.captures:
+            return None
+        try:
+            path = self.archive.write_manifest(self)
+            total_kb = sum(c["bytes"] for c in self.captures) / 1024
+            print(f"[CaptureArchive] Saved {len(self.captures)} {self.platform} captures "
+                  f"({total_kb:.0f} KB raw) to {path}")
+            self.archive.prune(self.platform, self.target)
+            return path
+        except Exception as e:
+            print(f"[CaptureArchive] Could not save {self.platform} manifest: {e}")
+            return None
+
+
+class _NullCapture:
+    """Stand-in used when archiving is disabled."""
+
+    def add(self, kind: str, url: str, body):
+        return None
+
+    def reuse(self, entry):
+        pass
+
+    def save(self):
+        return None
+
+
+class CaptureArchive:
+    """Content-addressed blob store plus per-scrape manifests."""
+
+    def __init__(self, root: Path = SCRAPE_CAPTURE_DIR, keep: int = SCRAPE_CAPTURE_KEEP,
+                 enabled: bool = SCRAPE_CAPTURE_ARCHIVE):
+        self.root = Path(root)
+        self.keep = keep
+        self.enabled = enabled
+
+    # ── Blobs ────────────────────────────────────────────────────────────
+    def _blob_path(self, sha: str) -> Path:
+        return self.root / "blobs" / sha[:2] / f"{sha}.z"
+
+    def put_blob(self, data: bytes) -> str:
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        if path.exists():
+            os.utime(path)  # keep it out of an in-progress prune's reach
+            return sha
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(data, 6))
+        os.replace(tmp_path, path)
+        return sha
+
+    def has_blob(self, sha: str) -> bool:
+        return self._blob_path(sha).exists()
+
+    def touch_blob(self, sha: str):
+        """Mark an existing blob as in use so a concurrent prune leaves it."""
+        try:
+            os.utime(self._blob_path(sha))
+        except FileNotFoundError:
+            pass
+
+    def get_blob(self, sha: str) -> bytes:
+        with open(self._blob_path(sha), "rb") as f:
+            return zlib.decompress(f.read())
+
+    def read(self, capture: Dict) -> Union[str, bytes, Dict, List]:
+        """Body of a manifest entry, decoded the way it was added."""
+        data = self.get_blob(capture["sha256"])
+        if capture.get("encoding") == "json":
+            return json.loads(data.decode("utf-8"))
+        if capture.get("encoding") == "text":
+            return data.decode("utf-8")
+        return data
+
+    # ── Manifests ────────────────────────────────────────────────────────
+    def _scrape_dir(self, platform: str, target: str) -> Path:
+        digest = hashlib.sha1(_target_key(target).encode("utf-8")).hexdigest()[:16]
+        return self.root / "scrapes" / platform / digest
+
+    def start(self, platform: str, target: str, incremental: bool = False):
+        """
+        Begin recording a scrape of `target` (the URL/handle given to the
+        scraper); `incremental` marks a delta scrape that skipped known posts.
+        """
+        if not self.enabled:
+            return _NullCapture()
+        return ScrapeCapture(self, platform, target, incremental)
+
+    def write_manifest(self, capture: ScrapeCapture) -> Path:
+        scrape_dir = self._scrape_dir(capture.platform, capture.target)
+        scrape_dir.mkdir(parents=True, exist_ok=True)
+        path = scrape_dir / f"{time.time_ns()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "platform": capture.platform,
+                "target": capture.target,
+                "started_at": capture.started_at,
+                "incremental": capture.incremental,
+                "captures": capture.captures,
+            }, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def manifests(self, platform: str, target: str) -> List[Path]:
+        """Manifest paths for a target, newest first."""
+        scrape_dir = self._scrape_dir(platform, target)
+        if not scrape_dir.exists():
+            return []
+        return sorted(scrape_dir.glob("*.json"), key=lambda p: int(p.stem), reverse=True)
+
+    @staticmethod
+    def read_manifest(path: Path) -> Dict:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def latest(self, platform: str, target: str) -> Optional[Dict]:
+        """The newest manifest for a target, or None."""
+        paths = self.manifests(platform, target)
+        if not paths:
+            return None
+        return self.read_manifest(paths[0])
+
+    def prune(self, platform: str, target: str):
+        """Drop manifests beyond `keep` for a target, then unreferenced blobs."""
+        stale = self.manifests(platform, target)[self.keep:]
+        if not stale:
+            return
+        for path in stale:
+            path.unlink(missing_ok=True)
+
+        referenced = set()
+        for path in (self.root / "scrapes").glob("*/*/*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    referenced.update(c["sha256"] for c in json.load(f).get("captures", []))
+            except Exception:
+                return  # unreadable manifest: keep every blob rather than guess
+        cutoff = time.time() - _BLOB_GRACE_SECONDS
+        for blob in (self.root / "blobs").glob("*/*.z"):
+            if blob.stem not in referenced and blob.stat().st_mtime < cutoff:
+                blob.unlink(missing_ok=True)
+
+
+capture_archive = CaptureArchive()
@@ -0,0 +1,140 @@
+"""
+Graph Checkpointer
+------------------
+Postgres-backed LangGraph checkpoints via langgraph-checkpoint-postgres'
+AsyncPostgresSaver, so a campaign paused before "publish" can be resumed by
+any worker and checkpoints no longer pile up in process memory.
+
+The graph is compiled at import with an in-process MemorySaver;
+`open_checkpointer` (app startup) swaps in the Postgres saver, since its
+connection pool needs the running event loop. The saver creates and
+migrates its tables (checkpoints, checkpoint_blobs, checkpoint_writes,
+checkpoint_migrations) on startup and only stores the channels a step
+changed. Channel values and pending writes are also zlib-compressed.
+
+Storage stays bounded:
+  - the publish route deletes a campaign's thread once it has published;
+  - a periodic sweep deletes threads idle for CHECKPOINT_TTL_HOURS
+    (default 72) whose campaign is finished (SWEEPABLE_STATUSES) or gone.
+    Campaigns still running or paused before publish are never swept.
+
+GRAPH_CHECKPOINTER=memory keeps the MemorySaver, e.g. for local runs
+without Postgres.
+"""
+
+import asyncio
+import os
+import zlib
+from typing import Optional, Tuple
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from langgraph.checkpoint.serde.encrypted import EncryptedSerializer
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from app.utils.db_service import DATABASE_URL
+
+
+GRAPH_CHECKPOINTER = os.getenv("GRAPH_CHECKPOINTER", "postgres")
+CHECKPOINT_TTL_HOURS = float(os.getenv("CHECKPOINT_TTL_HOURS", "72"))
+CHECKPOINT_SWEEP_INTERVAL = int(os.getenv("CHECKPOINT_SWEEP_INTERVAL_SECONDS", "3600"))
+CHECKPOINT_DB_POOL_SIZE = int(os.getenv("CHECKPOINT_DB_POOL_SIZE", "8"))
+
+# campaigns.status values whose thread will never be resumed
+SWEEPABLE_STATUSES = ["published", "failed", "interrupted", "rejected"]
+
+_COMPRESS_LEVEL = 6
+
+_EXPIRED_THREADS = """
+SELECT t.thread_id
+FROM (
+    SELECT thread_id, MAX((checkpoint->>'ts')::timestamptz) AS last_ts
+    FROM checkpoints
+    GROUP BY thread_id
+) t
+LEFT JOIN campaigns c ON c.id::text = t.thread_id
+WHERE t.last_ts < NOW() - make_interval(secs => %s)
+  AND (c.id IS NULL OR c.status = ANY(%s))
+"""
+
+
+class _ZlibCodec:
+    """A CipherProtocol that compresses, so EncryptedSerializer tags and zlibs every value."""
+
+    def encrypt(self, plaintext: bytes) -> Tuple[str, bytes]:
+        return "zlib", zlib.compress(plaintext, _COMPRESS_LEVEL)
+
+    def decrypt(self, ciphername: str, ciphertext: bytes) -> bytes:
+        if ciphername != "zlib":
+            raise ValueError(f"Unknown checkpoint codec: {ciphername}")
+        return zlib.decompress(ciphertext)
+
+
+class PostgresCheckpointer(AsyncPostgresSaver):
+    """AsyncPostgresSaver on its own connection pool, plus the TTL sweep."""
+
+    def __init__(self, pool: AsyncConnectionPool, ttl_hours: float = CHECKPOINT_TTL_HOURS):
+        super().__init__(pool, serde=EncryptedSerializer(_ZlibCodec(), JsonPlusSerializer()))
+        self.ttl_hours = ttl_hours
+
+    @classmethod
+    async def open(cls, dsn: Optional[str] = None, pool_size: int = CHECKPOINT_DB_POOL_SIZE,
+                   ttl_hours: float = CHECKPOINT_TTL_HOURS) -> "PostgresCheckpointer":
+        """Opens the pool (callers wait for a free connection) and creates the tables."""
+        pool = AsyncConnectionPool(
+            dsn or DATABASE_URL, min_size=1, max_size=pool_size, open=False,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        )
+        await pool.open()
+        saver = cls(pool, ttl_hours)
+        await saver.setup()
+        return saver
+
+    async def close(self):
+        await self.conn.close()
+
+    # ── TTL ──────────────────────────────────────────────────────────────
+    async def sweep_expired(self) -> int:
+        """
+        Deletes threads whose newest checkpoint is older than the TTL and
+        whose campaign is finished or gone. Returns how many.
+        """
+        async with self.conn.connection() as conn:
+            cur = await conn.execute(_EXPIRED_THREADS, (self.ttl_hours * 3600, SWEEPABLE_STATUSES))
+            expired = [row["thread_id"] for row in await cur.fetchall()]
+        for thread_id in expired:
+            await self.adelete_thread(thread_id)
+        if expired:
+            print(f"[Checkpointer] Deleted {len(expired)} finished threads idle for over {self.ttl_hours:g}h")
+        return len(expired)
+
+    async def sweep_loop(self, interval: int = CHECKPOINT_SWEEP_INTERVAL):
+        """Background task: runs sweep_expired every `interval` seconds."""
+        while True:
+            try:
+                await self.sweep_expired()
+            except Exception as e:
+                print(f"[Checkpointer] TTL sweep failed: {e}")
+            await asyncio.sleep(interval)
+
+
+def build_checkpointer() -> MemorySaver:
+    """Checkpointer the graph is compiled with; replaced on startup by `open_checkpointer`."""
+    return MemorySaver()
+
+
+async def open_checkpointer(graph) -> Optional[PostgresCheckpointer]:
+    """
+    App startup: switch `graph` to the Postgres saver selected by
+    GRAPH_CHECKPOINTER ("postgres" or "memory"). Returns it, or None when
+    the graph keeps its MemorySaver.
+    """
+    if GRAPH_CHECKPOINTER == "memory":
+        print("[Checkpointer] Using in-process MemorySaver (GRAPH_CHECKPOINTER=memory)")
+        return None
+    saver = await PostgresCheckpointer.open()
+    graph.checkpointer = saver
+    print("[Checkpointer] Using Postgres checkpoints")
+    return saver
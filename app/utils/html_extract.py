@@ -0,0 +1,303 @@
+"""
+HTML Extraction
+---------------
+Pluggable HTML parsing backends for the scrapers.
+
+All backends implement the same extraction semantics as the original
+BeautifulSoup("html.parser") code in the website, LinkedIn and Instagram
+scrapers; they only differ in how fast they build and walk the tree.
+
+Backends:
+  - "html.parser": BeautifulSoup with the pure-Python parser (reference)
+  - "lxml":        BeautifulSoup with the lxml tree builder (same code path, faster parse)
+  - "selectolax":  selectolax's lexbor engine (fastest, text equal after whitespace collapse)
+
+Select with HTML_PARSER_BACKEND (default "selectolax"); if its library is
+not installed the next fastest available backend is used.
+Compare them with `python -m benchmarks.html_parsers`.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    _HAS_SELECTOLAX = True
+except ImportError:
+    _HAS_SELECTOLAX = False
+
+
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "selectolax")
+
+# Tags whose text makes up a website page's body content
+CONTENT_TAGS = ["p", "h1", "h2", "h3", "h4", "h5", "h6", "li",
+                "blockquote", "td", "th", "article", "section"]
+# Tags dropped before the "all visible text" fallback, and from LinkedIn post text
+INVISIBLE_TAGS = ["script", "style", "noscript", "iframe", "svg"]
+
+_WS = re.compile(r"\s+")
+_SPACE_RUN = re.compile(r" {2,}")
+
+
+class _SoupBackend:
+    """BeautifulSoup extraction, parameterised by tree builder."""
+
+    def __init__(self, parser: str):
+        self.name = parser
+        self.parser = parser
+
+    def _soup(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, self.parser)
+
+    def page(self, html: str) -> Dict:
+        soup = self._soup(html)
+
+        hrefs = [a["href"] for a in soup.find_all("a", href=True)]
+
+        title = ""
+        if soup.title and soup.title.string:
+            title = soup.title.string.strip()
+
+        meta_desc = ""
+        for attr in [{"name": "description"}, {"property": "og:description"}]:
+            tag = soup.find("meta", attrs=attr)
+            if tag and tag.get("content"):
+                meta_desc = tag["content"].strip()
+                break
+
+        text_parts = []
+        for tag in soup.find_all(CONTENT_TAGS):
+            t = tag.get_text(separator=" ", strip=True)
+            if t and len(t) > 10:
+                text_parts.append(t)
+        content = _WS.sub(" ", " ".join(text_parts)).strip()
+
+        if len(content) < 100:
+            for tag in soup.find_all(INVISIBLE_TAGS):
+                tag.decompose()
+            content = _WS.sub(" ", soup.get_text(separator=" ", strip=True)).strip()
+            text_parts = []
+
+        return {"title": title, "meta_description": meta_desc, "content": content,
+                "blocks": text_parts, "hrefs": hrefs}
+
+    def og_meta(self, html: str) -> Dict:
+        soup = self._soup(html)
+        result = {}
+        for prop in ("og:description", "og:image"):
+            tag = soup.find("meta", property=prop)
+            if tag and tag.get("content") is not None:
+                result[prop] = tag["content"]
+        time_tag = soup.find("time")
+        if time_tag:
+            result["time"] = time_tag.get("datetime", "")
+        return result
+
+    def hrefs(self, html: str) -> List[str]:
+        return [a["href"] for a in self._soup(html).find_all("a", href=True)]
+
+    def linkedin(self, html: str, selectors: List[str], limit: int) -> Dict:
+        soup = self._soup(html)
+        company = {}
+
+        title = soup.find("title")
+        if title:
+            company["company_name"] = title.text.strip()
+
+        about = soup.find("p", class_="break-words") or soup.find("p")
+        if about:
+            company["about"] = about.text.strip()
+
+        for tag in soup(INVISIBLE_TAGS):
+            tag.decompose()
+
+        blocks, used_selector = [], None
+        for selector in selectors:
+            blocks = soup.select(selector)
+            if blocks:
+                used_selector = selector
+                break
+
+        posts = []
+        for block in blocks[:limit]:
+            urn = block.get("data-urn")
+            if not urn:
+                inner = block.find(attrs={"data-urn": True})
+                urn = inner.get("data-urn") if inner else ""
+            image_url = ""
+            img = block.find("img")
+            if img and img.get("src") and not img.get("src").startswith("data:"):
+                image_url = img.get("src")
+            posts.append({
+                "text": _WS.sub(" ", block.get_text(" ", strip=True)).strip(),
+                "image_url": image_url,
+                "urn": urn or "",
+            })
+
+        return {"company_info": company, "posts": posts, "used_selector": used_selector}
+
+
+class _SelectolaxBackend:
+    """selectolax (lexbor) extraction mirroring _SoupBackend."""
+
+    name = "selectolax"
+
+    @staticmethod
+    def _text(node) -> str:
+        # lexbor keeps a separator for whitespace-only nodes; bs4 drops them
+        return _SPACE_RUN.sub(" ", node.text(deep=True, separator=" ", strip=True))
+
+    def page(self, html: str) -> Dict:
+        tree = LexborHTMLParser(html)
+
+        hrefs = [a.attributes["href"] for a in tree.css("a[href]") if a.attributes.get("href") is not None]
+
+        title = ""
+        title_node = tree.css_first("title")
+        if title_node:
+            title = title_node.text().strip()
+
+        meta_desc = ""
+        for selector in ('meta[name="description"]', 'meta[property="og:description"]'):
+            tag = tree.css_first(selector)
+            if tag and tag.attributes.get("content"):
+                meta_desc = tag.attributes["content"].strip()
+                break
+
+        text_parts = []
+        for node in tree.css(", ".join(CONTENT_TAGS)):
+            t = self._text(node)
+            if t and len(t) > 10:
+                text_parts.append(t)
+        content = _WS.sub(" ", " ".join(text_parts)).strip()
+
+        if len(content) < 100:
+            tree.strip_tags(INVISIBLE_TAGS)
+            content = _WS.sub(" ", self._text(tree.root)).strip() if tree.root else ""
+            text_parts = []
+
+        return {"title": title, "meta_description": meta_desc, "content": content,
+                "blocks": text_parts, "hrefs": hrefs}
+
+    def og_meta(self, html: str) -> Dict:
+        tree = LexborHTMLParser(html)
+        result = {}
+        for prop in ("og:description", "og:image"):
+            tag = tree.css_first(f'meta[property="{prop}"]')
+            if tag and tag.attributes.get("content") is not None:
+                result[prop] = tag.attributes["content"]
+        time_tag = tree.css_first("time")
+        if time_tag:
+            result["time"] = time_tag.attributes.get("datetime") or ""
+        return result
+
+    def hrefs(self, html: str) -> List[str]:
+        tree = LexborHTMLParser(html)
+        return [a.attributes["href"] for a in tree.css("a[href]") if a.attributes.get("href") is not None]
+
+    def linkedin(self, html: str, selectors: List[str], limit: int) -> Dict:
+        tree = LexborHTMLParser(html)
+        company = {}
+
+        title = tree.css_first("title")
+        if title:
+            company["company_name"] = title.text().strip()
+
+        about = tree.css_first("p.break-words") or tree.css_first("p")
+        if about:
+            company["about"] = about.text().strip()
+
+        tree.strip_tags(INVISIBLE_TAGS)
+
+        blocks, used_selector = [], None
+        for selector in selectors:
+            blocks = tree.css(selector)
+            if blocks:
+                used_selector = selector
+                break
+
+        posts = []
+        for block in blocks[:limit]:
+            urn = block.attributes.get("data-urn")
+            if not urn:
+                inner = block.css_first("[data-urn]")
+                urn = inner.attributes.get("data-urn") if inner else ""
+            image_url = ""
+            img = block.css_first("img")
+            src = img.attributes.get("src") if img else None
+            if src and not src.startswith("data:"):
+                image_url = src
+            posts.append({
+                "text": _WS.sub(" ", self._text(block)).strip(),
+                "image_url": image_url,
+                "urn": urn or "",
+            })
+
+        return {"company_info": company, "posts": posts, "used_selector": used_selector}
+
+
+def available_backends() -> List[str]:
+    """Backends whose libraries are installed, slowest first."""
+    names = ["html.parser"]
+    if _HAS_LXML:
+        names.append("lxml")
+    if _HAS_SELECTOLAX:
+        names.append("selectolax")
+    return names
+
+
+_backends: Dict[str, object] = {}
+
+
+def get_backend(name: Optional[str] = None):
+    """Return the extraction backend `name` (default HTML_PARSER_BACKEND)."""
+    name = name or HTML_PARSER_BACKEND
+    available = available_backends()
+    if name not in available:
+        fallback = available[-1]
+        print(f"[HtmlExtract] Backend '{name}' not available, using {fallback}")
+        name = fallback
+
+    if name not in _backends:
+        _backends[name] = _SelectolaxBackend() if name == "selectolax" else _SoupBackend(name)
+    return _backends[name]
+
+
+def extract_page(html: str, backend: Optional[str] = None) -> Dict:
+    """
+    Website page extraction.
+    Returns {"title", "meta_description", "content", "blocks", "hrefs"}, where
+    "blocks" are the per-tag text parts `content` was joined from (empty when
+    the all-visible-text fallback was used).
+    """
+    return get_backend(backend).page(html)
+
+
+def extract_og_meta(html: str, backend: Optional[str] = None) -> Dict:
+    """
+    Instagram-style page metadata.
+    Returns a dict with any of "og:description", "og:image", "time".
+    """
+    return get_backend(backend).og_meta(html)
+
+
+def extract_hrefs(html: str, backend: Optional[str] = None) -> List[str]:
+    """All anchor hrefs, in document order."""
+    return get_backend(backend).hrefs(html)
+
+
+def extract_linkedin(html: str, selectors: List[str], limit: int, backend: Optional[str] = None) -> Dict:
+    """
+    LinkedIn company page extraction.
+    Returns {"company_info": {...}, "posts": [{"text", "image_url", "urn"}], "used_selector"}.
+    """
+    return get_backend(backend).linkedin(html, selectors, limit)
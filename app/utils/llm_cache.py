@@ -0,0 +1,280 @@
+"""
+LLM Response Cache
+------------------
+Disk-backed cache of LLM responses, keyed by (model, temperature, sha256 of
+the rendered prompt). Re-running a campaign with identical inputs (retries,
+test runs, duplicate submissions) then reuses the earlier responses instead
+of calling Gemini again.
+
+Shared by the brain agents, ContentAgent, VisualAnalyzerAgent and the
+website scraper's Gemini fallback. Entries live one JSON file each under
+LLM_CACHE_DIR (default data/llm_cache/):
+
+  - expire after LLM_CACHE_TTL_SECONDS (default 24h)
+  - are evicted least-recently-used first once the cache grows past
+    LLM_CACHE_MAX_MB (default 200)
+
+Callers can opt out per call (use_cache=False); LLM_CACHE_ENABLED=false
+turns the cache off entirely. Hit rates per caller are in `stats()`.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", "data/llm_cache"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+# Eviction trims down to this share of the limit so it doesn't run on every write
+_EVICT_TO_FRACTION = 0.9
+
+
+def parses_as_json(text: str) -> bool:
+    """True if `text` holds a JSON object/array (fenced or embedded); used to avoid caching junk."""
+    cleaned = re.sub(r"```(?:json)?", "", text).strip().rstrip("`").strip()
+    try:
+        json.loads(cleaned)
+        return True
+    except ValueError:
+        pass
+    match = re.search(r"\{.*\}|\[.*\]", cleaned, re.DOTALL)
+    if not match:
+        return False
+    try:
+        json.loads(match.group())
+        return True
+    except ValueError:
+        return False
+
+
+def message_text(message) -> str:
+    """Text of a chat model response (content may be a string or a list of parts)."""
+    content = getattr(message, "content", message)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return str(content)
+
+
+class LLMCache:
+    """File-backed TTL + size-bounded cache of LLM response text."""
+
+    def __init__(self, cache_dir: Path = LLM_CACHE_DIR, ttl_seconds: int = LLM_CACHE_TTL,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES, enabled: bool = LLM_CACHE_ENABLED):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled and ttl_seconds > 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None  # measured on first write
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+
+    # ── Keys & files ─────────────────────────────────────────────────────
+    @staticmethod
+    def key(model: str, temperature: Optional[float], prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(json.dumps([model, temperature, prompt_hash]).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _count(self, namespace: str, event: str):
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {"hits": 0, "misses": 0, "writes": 0, "bypassed": 0})
+            counters[event] += 1
+
+    # ── Get / set ────────────────────────────────────────────────────────
+    def get(self, namespace: str, model: str, temperature: Optional[float], prompt: str) -> Optional[str]:
+        """Cached response text, or None if missing, expired or disabled."""
+        if not self.enabled:
+            return None
+        path = self._path(self.key(model, temperature, prompt))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._count(namespace, "misses")
+            return None
+        except Exception as e:
+            print(f"[LLMCache] Could not read cache entry {path}: {e}")
+            self._count(namespace, "misses")
+            return None
+
+        age = time.time() - entry.get("stored_at", 0)
+        if age > self.ttl_seconds:
+            self._remove(path)
+            self._count(namespace, "misses")
+            return None
+
+        try:
+            os.utime(path)  # recency for LRU eviction
+        except OSError:
+            pass
+        self._count(namespace, "hits")
+        print(f"[LLMCache] Hit for {namespace} ({model}, age {int(age)}s)")
+        return entry.get("response")
+
+    def set(self, namespace: str, model: str, temperature: Optional[float], prompt: str, response: str):
+        """Store a response; evicts least recently used entries past the size limit."""
+        if not self.enabled or not response:
+            return
+        path = self._path(self.key(model, temperature, prompt))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "namespace": namespace,
+                    "model": model,
+                    "temperature": temperature,
+                    "stored_at": time.time(),
+                    "response": response,
+                }, f, ensure_ascii=False)
+            size = tmp_path.stat().st_size
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[LLMCache] Could not write cache entry {path}: {e}")
+            return
+        self._count(namespace, "writes")
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._measure()
+            else:
+                self._total_bytes += size - previous
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def _remove(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _measure(self) -> int:
+        return sum(p.stat().st_size for p in self.cache_dir.glob("*/*.json"))
+
+    def _evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * _EVICT_TO_FRACTION
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            self._total_bytes = total
+            self.evictions += removed
+        if removed:
+            print(f"[LLMCache] Evicted {removed} least recently used entries "
+                  f"({total / 1024 / 1024:.1f} MB left)")
+
+    # ── LangChain helpers ────────────────────────────────────────────────
+    @staticmethod
+    def _llm_params(llm):
+        return getattr(llm, "model", "") or getattr(llm, "model_name", ""), getattr(llm, "temperature", None)
+
+    def invoke(self, llm, prompt, inputs: Dict, namespace: str, use_cache: bool = True,
+               accept: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Render `prompt` (a ChatPromptTemplate) with `inputs` and return the
+        LLM's response text, from the cache when possible. Responses that
+        `accept` rejects (e.g. unparseable JSON) are returned but not cached.
+        """
+        prompt_value = prompt.invoke(inputs)
+        model, temperature = self._llm_params(llm)
+        rendered = prompt_value.to_string()
+
+        if use_cache:
+            cached = self.get(namespace, model, temperature, rendered)
+            if cached is not None:
+                return cached
+        else:
+            self._count(namespace, "bypassed")
+
+        text = message_text(llm.invoke(prompt_value))
+        if use_cache and (accept is None or accept(text)):
+            self.set(namespace, model, temperature, rendered, text)
+        return text
+
+    async def ainvoke(self, llm, prompt, inputs: Dict, namespace: str, use_cache: bool = True,
+                      accept: Optional[Callable[[str], bool]] = None) -> str:
+        """Async `invoke`: cache file IO runs in a thread, the LLM call via `ainvoke`."""
+        prompt_value = await prompt.ainvoke(inputs)
+        model, temperature = self._llm_params(llm)
+        rendered = prompt_value.to_string()
+
+        if use_cache:
+            cached = await asyncio.to_thread(self.get, namespace, model, temperature, rendered)
+            if cached is not None:
+                return cached
+        else:
+            self._count(namespace, "bypassed")
+
+        text = message_text(await llm.ainvoke(prompt_value))
+        if use_cache and (accept is None or accept(text)):
+            await asyncio.to_thread(self.set, namespace, model, temperature, rendered, text)
+        return text
+
+    # ── Stats ────────────────────────────────────────────────────────────
+    def stats(self) -> Dict:
+        """Hit rate per caller since start-up, plus overall size."""
+        with self._lock:
+            counters = {namespace: dict(c) for namespace, c in self._counters.items()}
+            total_bytes = self._total_bytes
+        if total_bytes is None and self.cache_dir.exists():
+            total_bytes = self._measure()
+
+        by_namespace = {}
+        hits = misses = 0
+        for namespace, c in sorted(counters.items()):
+            lookups = c["hits"] + c["misses"]
+            by_namespace[namespace] = {**c, "hit_rate": round(c["hits"] / lookups, 3) if lookups else 0.0}
+            hits += c["hits"]
+            misses += c["misses"]
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "evictions": self.evictions,
+            "size_mb": round((total_bytes or 0) / 1024 / 1024, 2),
+            "max_mb": round(self.max_bytes / 1024 / 1024, 1),
+            "ttl_seconds": self.ttl_seconds,
+            "by_caller": by_namespace,
+        }
+
+
+llm_cache = LLMCache()
@@ -0,0 +1,157 @@
+"""
+Scrape Cache
+------------
+Persistent TTL cache for scrape results, keyed by platform and handle/URL,
+plus an optional variant (e.g. "delta" for incremental scrapes, so a delta
+is never served to a caller asking for a full scrape).
+
+Lets repeated campaigns (or /api/scrape-company calls) for the same brand
+reuse a recent scrape instead of launching browsers again. Entries are
+stored as one JSON file per key under data/scrape_cache/.
+
+PageCache keeps website page bodies with their ETag / Last-Modified
+validators so re-crawls can send conditional GETs and skip parsing
+pages that returned 304 Not Modified.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+SCRAPE_CACHE_DIR = Path(os.getenv("SCRAPE_CACHE_DIR", "data/scrape_cache"))
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+
+
+class ScrapeCache:
+    """File-backed TTL cache of scrape results."""
+
+    def __init__(self, cache_dir: Path = SCRAPE_CACHE_DIR, ttl_seconds: int = SCRAPE_CACHE_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(platform: str, handle: str, variant: str = "") -> str:
+        key = f"{platform}:{handle.lower().strip().rstrip('/')}"
+        return f"{key}#{variant}" if variant else key
+
+    def _path(self, platform: str, handle: str, variant: str = "") -> Path:
+        digest = hashlib.sha1(self._key(platform, handle, variant).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{platform}_{digest}.json"
+
+    def get(self, platform: str, handle: str, variant: str = "") -> Optional[Dict]:
+        """Return the cached result, or None if missing/expired/disabled."""
+        if self.ttl_seconds <= 0:
+            return None
+
+        path = self._path(platform, handle, variant)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception as e:
+            print(f"[ScrapeCache] Could not read cache entry {path}: {e}")
+            return None
+
+        age = time.time() - entry.get("stored_at", 0)
+        if age > self.ttl_seconds:
+            return None
+
+        print(f"[ScrapeCache] Hit for {self._key(platform, handle, variant)} (age {int(age)}s)")
+        return entry.get("data")
+
+    def set(self, platform: str, handle: str, data: Dict, variant: str = ""):
+        """Store a scrape result."""
+        if self.ttl_seconds <= 0:
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(platform, handle, variant)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"key": self._key(platform, handle, variant), "stored_at": time.time(), "data": data},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[ScrapeCache] Could not write cache entry {path}: {e}")
+
+    def invalidate(self, platform: str, handle: str, variant: str = ""):
+        """Drop a cached result."""
+        path = self._path(platform, handle, variant)
+        if path.exists():
+            path.unlink()
+
+
+class PageCache:
+    """
+    Per-URL cache of parsed website pages plus HTTP validators.
+    Entries don't expire; the origin server decides freshness via 304s.
+    """
+
+    def __init__(self, cache_dir: Path = SCRAPE_CACHE_DIR / "pages"):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha1(url.rstrip("/").lower().encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return {"etag", "last_modified", "page", "capture"} for a URL, or None."""
+        path = self._path(url)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[PageCache] Could not read cache entry {path}: {e}")
+            return None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a cached URL."""
+        entry = self.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def set(self, url: str, page: Dict, etag: Optional[str], last_modified: Optional[str],
+            capture: Optional[Dict] = None):
+        """
+        Store a parsed page; pages without validators are not worth caching.
+        `capture` is the page's raw capture entry, reused when a 304 comes back.
+        """
+        if not etag and not last_modified:
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(url)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"url": url, "etag": etag, "last_modified": last_modified,
+                     "stored_at": time.time(), "page": page, "capture": capture},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[PageCache] Could not write cache entry {path}: {e}")
+
+
+scrape_cache = ScrapeCache()
+page_cache = PageCache()
@@ -0,0 +1,194 @@
+"""
+Semantic Cache
+--------------
+Reuses AI Brain agent outputs across near-identical campaigns. Each output
+is stored in a Chroma collection together with an embedding of the
+campaign inputs that shaped it (product, description, ICP, tone...). A new
+run for the same brand and agent whose inputs embed within
+SEMANTIC_CACHE_THRESHOLD cosine similarity (default 0.95) gets the stored
+output instead of a fresh LLM call.
+
+Complements the exact-match LLM response cache (app/utils/llm_cache.py):
+that one needs byte-identical prompts, this one catches campaigns that
+differ only in wording.
+
+Entries are also scoped to a digest of the brand's ingested content
+(`context_key`, see orchestrator._context_digest), so newly ingested posts
+invalidate them instead of being ignored for the whole TTL.
+
+Entries expire after SEMANTIC_CACHE_TTL_SECONDS (default 7 days);
+SEMANTIC_CACHE_ENABLED=false turns the cache off.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google.genai import types
+
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+
+_COLLECTION_NAME = "semantic_cache"
+
+
+def _brand_key(brand: str) -> str:
+    return brand.strip().lower()
+
+
+def key_text(fields: Dict[str, str]) -> str:
+    """The text embedded for a lookup: one "name: value" line per input."""
+    return "\n".join(f"{name}: {value or ''}".strip() for name, value in fields.items())
+
+
+class SemanticCache:
+    """Embedding-similarity cache of agent outputs, scoped per brand and agent."""
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl_seconds: int = SEMANTIC_CACHE_TTL,
+                 enabled: bool = SEMANTIC_CACHE_ENABLED):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and ttl_seconds > 0
+        self._vector_db = None
+        self._collection = None
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _get_collection(self):
+        # Created on first use so importing this module doesn't open Chroma
+        with self._lock:
+            if self._collection is None:
+                from app.utils.vector_db import VectorDB
+                self._vector_db = VectorDB()
+                self._collection = self._vector_db.client.get_or_create_collection(
+                    name=_COLLECTION_NAME,
+                    metadata={"hnsw:space": "cosine"},
+                )
+            return self._collection
+
+    def _embed(self, text: str) -> List[float]:
+        self._get_collection()
+        response = self._vector_db.genai_client.models.embed_content(
+            model=self._vector_db.embedding_model,
+            contents=text,
+            config=types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY"),
+        )
+        return response.embeddings[0].values
+
+    def _count(self, agent: str, event: str):
+        with self._lock:
+            counters = self._counters.setdefault(agent, {"hits": 0, "misses": 0, "stores": 0})
+            counters[event] += 1
+
+    # ── Lookup / store ───────────────────────────────────────────────────
+    def lookup(self, brand: str, agent: str, text: str, context_key: str = "") -> Tuple[Optional[dict], List[float]]:
+        """
+        Nearest stored output for this brand, agent and context, if similar
+        enough. Returns (output or None, embedding of `text`) so a miss can
+        be stored without embedding again.
+        """
+        embedding = self._embed(text)
+        results = self._get_collection().query(
+            query_embeddings=[embedding],
+            n_results=1,
+            where={"$and": [
+                {"brand": _brand_key(brand)},
+                {"agent": agent},
+                {"context": context_key},
+                {"stored_at": {"$gte": time.time() - self.ttl_seconds}},
+            ]},
+            include=["metadatas", "distances"],
+        )
+        if results["metadatas"] and results["metadatas"][0]:
+            similarity = 1 - results["distances"][0][0]
+            if similarity >= self.threshold:
+                self._count(agent, "hits")
+                print(f"[SemanticCache] Hit for {agent} ({brand}, similarity {similarity:.3f})")
+                return json.loads(results["metadatas"][0][0]["output"]), embedding
+            print(f"[SemanticCache] Nearest {agent} entry for {brand} at similarity "
+                  f"{similarity:.3f}, below {self.threshold}")
+        self._count(agent, "misses")
+        return None, embedding
+
+    def store(self, brand: str, agent: str, text: str, output: dict, embedding: Optional[List[float]] = None,
+              context_key: str = ""):
+        """Store an agent output under the embedding of its inputs (replacing the same inputs' entry)."""
+        if embedding is None:
+            embedding = self._embed(text)
+        entry_id = hashlib.sha256(
+            f"{_brand_key(brand)}\n{agent}\n{context_key}\n{text}".encode("utf-8")
+        ).hexdigest()
+        self._get_collection().upsert(
+            ids=[entry_id],
+            embeddings=[embedding],
+            documents=[text],
+            metadatas=[{
+                "brand": _brand_key(brand),
+                "agent": agent,
+                "context": context_key,
+                "stored_at": time.time(),
+                "output": json.dumps(output, ensure_ascii=False),
+            }],
+        )
+        self._count(agent, "stores")
+
+    async def get_or_run(self, brand: str, agent: str, fields: Dict[str, str],
+                         run: Callable[[], Awaitable[dict]], use_cache: bool = True,
+                         accept: Optional[Callable[[dict], bool]] = None,
+                         context_key: str = "") -> Tuple[dict, bool]:
+        """
+        Return a cached output for inputs similar to `fields` (and the same
+        `context_key`), else await `run()` and store its result if `accept`
+        allows. Returns (output, served_from_cache). Cache failures are
+        logged and fall through to `run()`; they never fail the agent.
+        """
+        if not (self.enabled and use_cache):
+            return await run(), False
+
+        text = key_text(fields)
+        embedding = None
+        try:
+            cached, embedding = await asyncio.to_thread(self.lookup, brand, agent, text, context_key)
+            if cached is not None:
+                return cached, True
+        except Exception as e:
+            print(f"[SemanticCache] Lookup failed for {agent}: {e}")
+
+        output = await run()
+        if accept is None or accept(output):
+            try:
+                await asyncio.to_thread(self.store, brand, agent, text, output, embedding, context_key)
+            except Exception as e:
+                print(f"[SemanticCache] Store failed for {agent}: {e}")
+        return output, False
+
+    # ── Stats ────────────────────────────────────────────────────────────
+    def stats(self) -> Dict:
+        """Hit rate per agent since start-up."""
+        with self._lock:
+            counters = {agent: dict(c) for agent, c in self._counters.items()}
+        by_agent = {}
+        hits = misses = 0
+        for agent, c in sorted(counters.items()):
+            lookups = c["hits"] + c["misses"]
+            by_agent[agent] = {**c, "hit_rate": round(c["hits"] / lookups, 3) if lookups else 0.0}
+            hits += c["hits"]
+            misses += c["misses"]
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "by_agent": by_agent,
+        }
+
+
+semantic_cache = SemanticCache()
@@ -10,14 +10,70 @@ Uses playwright-stealth v2 Stealth class which patches:
 - Plugin/language enumeration
 - WebGL vendor/renderer fingerprinting
 - Permissions API, error prototype, and more
+
+Contexts can also carry a per-platform resource blocking profile that
+aborts media, font and analytics requests the scrapers never read, and
+records bytes transferred / requests blocked for each scrape.
+
+For offline runs (benchmarks/scrapers.py), SCRAPE_REPLAY_URL sends every
+request to a local replay stand-in instead of the network, and
+SCRAPE_RECORD_HAR_DIR records each context's traffic as a HAR fixture.
 """
 
+import asyncio
+import os
 import random
-from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext, Route
 from playwright_stealth import Stealth
 
 _stealth = Stealth()
 
+# Set SCRAPE_BLOCK_RESOURCES=false to load every resource (useful for A/B timing runs)
+BLOCK_RESOURCES = os.getenv("SCRAPE_BLOCK_RESOURCES", "true").lower() in ("1", "true", "yes")
+
+# Replay stand-in base URL (e.g. http://127.0.0.1:8900); empty means live network
+SCRAPE_REPLAY_URL = os.getenv("SCRAPE_REPLAY_URL", "").rstrip("/")
+# Directory to record one HAR per browser context into; empty means off
+SCRAPE_RECORD_HAR_DIR = os.getenv("SCRAPE_RECORD_HAR_DIR", "")
+
+_ANALYTICS_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "facebook.com/tr",
+    "hotjar.com",
+    "segment.io",
+    "scorecardresearch.com",
+]
+
+# Per-platform blocking profiles.
+# Scrapers only read text, post URLs and image *URLs* (src / og:image), so the
+# image bytes themselves are only needed where the page lazy-loads them.
+BLOCK_PROFILES: Dict[str, Dict] = {
+    "instagram": {
+        "resource_types": {"image", "media", "font"},
+        "url_patterns": _ANALYTICS_HOSTS + ["/logging_client_events", "/ajax/bz"],
+    },
+    "linkedin": {
+        # LinkedIn lazy-loads post images on scroll, keep them so src is populated
+        "resource_types": {"media", "font"},
+        "url_patterns": _ANALYTICS_HOSTS + ["px.ads.linkedin.com", "snap.licdn.com"],
+    },
+    "twitter": {
+        "resource_types": {"image", "media", "font"},
+        "url_patterns": _ANALYTICS_HOSTS + ["analytics.twitter.com", "ads-twitter.com", "/jot/"],
+    },
+    "default": {
+        "resource_types": {"media", "font"},
+        "url_patterns": _ANALYTICS_HOSTS,
+    },
+}
+
 
 DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 
@@ -47,13 +103,112 @@ async def create_stealth_browser(playwright: Playwright, headless: bool = True)
     return browser
 
 
+class TrafficStats:
+    """
+    Per-context traffic counters: requests, bytes transferred and
+    requests aborted by the blocking profile.
+    """
+
+    def __init__(self, profile: Optional[str]):
+        self.profile = profile
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.bytes_transferred = 0
+        self.blocked: Dict[str, int] = {}
+
+    def record_blocked(self, resource_type: str):
+        self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+
+    async def on_request_finished(self, request):
+        self.requests += 1
+        try:
+            sizes = await request.sizes()
+            self.bytes_transferred += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:
+            pass
+
+    def summary(self) -> Dict:
+        return {
+            "profile": self.profile or "none",
+            "elapsed_seconds": round(time.monotonic() - self.started_at, 2),
+            "requests": self.requests,
+            "bytes_transferred": self.bytes_transferred,
+            "requests_blocked": sum(self.blocked.values()),
+            "blocked_by_type": dict(self.blocked),
+        }
+
+    def log(self, label: str):
+        s = self.summary()
+        print(
+            f"[{label}] Traffic: {s['bytes_transferred'] / 1024:.0f} KB over {s['requests']} requests, "
+            f"{s['requests_blocked']} blocked {s['blocked_by_type']} in {s['elapsed_seconds']}s "
+            f"(profile: {s['profile']})"
+        )
+
+
+def _should_block(profile: Dict, resource_type: str, url: str) -> bool:
+    if resource_type in profile["resource_types"]:
+        return True
+    return any(pattern in url for pattern in profile["url_patterns"])
+
+
+async def apply_block_profile(context: BrowserContext, block_profile: Optional[str]) -> TrafficStats:
+    """
+    Install the blocking route for `block_profile` on the context and attach
+    a TrafficStats instance as `context.traffic_stats`.
+    """
+    stats = TrafficStats(block_profile if BLOCK_RESOURCES else None)
+    context.on("requestfinished", stats.on_request_finished)
+    context.traffic_stats = stats
+
+    if not block_profile or not BLOCK_RESOURCES:
+        return stats
+
+    profile = BLOCK_PROFILES.get(block_profile, BLOCK_PROFILES["default"])
+
+    async def _route(route: Route):
+        request = route.request
+        if _should_block(profile, request.resource_type, request.url):
+            stats.record_blocked(request.resource_type)
+            await route.abort()
+        else:
+            await route.fallback()  # to the replay route if there is one, else the network
+
+    await context.route("**/*", _route)
+    return stats
+
+
+async def apply_replay(context: BrowserContext, replay_url: str):
+    """
+    Answer every request on the context from the replay stand-in at
+    `replay_url`, which looks up the original URL in its fixtures.
+    """
+    async def _route(route: Route):
+        request = route.request
+        try:
+            response = await route.fetch(
+                url=f"{replay_url}/__replay__?url={quote(request.url, safe='')}",
+                max_redirects=0,
+            )
+            await route.fulfill(response=response)
+        except Exception:
+            await route.abort()
+
+    await context.route("**/*", _route)
+
+
 async def create_stealth_context(
     browser: Browser,
-    storage_state: str = None
+    storage_state: str = None,
+    block_profile: Optional[str] = None
 ) -> BrowserContext:
     """
     Create a browser context with realistic fingerprints.
     Uses a fixed user agent for session consistency.
+
+    If `block_profile` names an entry in BLOCK_PROFILES ("instagram",
+    "linkedin", "twitter", "default"), matching requests are aborted.
+    Traffic counters are always available on `context.traffic_stats`.
     """
     context_options = {
         "viewport": {"width": 1920, "height": 1080},
@@ -66,11 +221,58 @@ async def create_stealth_context(
     if storage_state:
         context_options["storage_state"] = storage_state
 
+    if SCRAPE_RECORD_HAR_DIR:
+        har_dir = Path(SCRAPE_RECORD_HAR_DIR)
+        har_dir.mkdir(parents=True, exist_ok=True)
+        context_options["record_har_path"] = str(har_dir / f"{block_profile or 'context'}-{time.time_ns()}.har")
+        context_options["record_har_content"] = "embed"
+
     context = await browser.new_context(**context_options)
+    if SCRAPE_REPLAY_URL:
+        # Registered first so the blocking route runs ahead of it
+        await apply_replay(context, SCRAPE_REPLAY_URL)
+    await apply_block_profile(context, block_profile)
 
     return context
 
 
+# Process-wide headless browser for short render jobs (e.g. JS-only website pages)
+_shared_playwright: Optional[Playwright] = None
+_shared_browser: Optional[Browser] = None
+_shared_lock = asyncio.Lock()
+
+
+async def get_shared_browser() -> Browser:
+    """
+    Return the shared stealth browser, launching it on first use
+    (or again if it has crashed / disconnected).
+    Callers create their own contexts and must not close the browser.
+    """
+    global _shared_playwright, _shared_browser
+    async with _shared_lock:
+        if _shared_browser is None or not _shared_browser.is_connected():
+            if _shared_playwright is None:
+                _shared_playwright = await async_playwright().start()
+            _shared_browser = await create_stealth_browser(_shared_playwright, headless=True)
+            print("[StealthBrowser] Shared headless browser launched")
+        return _shared_browser
+
+
+async def close_shared_browser():
+    """Close the shared browser and stop its Playwright driver."""
+    global _shared_playwright, _shared_browser
+    async with _shared_lock:
+        if _shared_browser is not None:
+            try:
+                await _shared_browser.close()
+            except Exception:
+                pass
+            _shared_browser = None
+        if _shared_playwright is not None:
+            await _shared_playwright.stop()
+            _shared_playwright = None
+
+
 async def create_stealth_page(context: BrowserContext):
     """
     Create a new page with playwright-stealth v2 evasions applied.
@@ -9,6 +9,13 @@ from typing import List, Dict, Optional
 from google import genai
 from google.genai import types
 
+# Texts per embed_content request when embedding in batches (API limit is 100)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "100"))
+
+# "platform" values of scraped content; agent insights carry no platform
+SCRAPED_PLATFORMS = ["instagram", "linkedin", "twitter", "website"]
+_SCRAPED_ONLY = {"platform": {"$in": SCRAPED_PLATFORMS}}
+
 
 class VectorDB:
     """
@@ -54,6 +61,25 @@ class VectorDB:
             print(f"Error generating embedding: {e}")
             raise
     
+    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several documents in one embed_content request per
+        EMBED_BATCH_SIZE texts instead of one request each.
+        """
+        embeddings = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            batch = texts[start:start + EMBED_BATCH_SIZE]
+            response = self.genai_client.models.embed_content(
+                model=self.embedding_model,
+                contents=batch,
+                config=types.EmbedContentConfig(
+                    task_type="RETRIEVAL_DOCUMENT",
+                    title="Company Post"
+                )
+            )
+            embeddings.extend(e.values for e in response.embeddings)
+        return embeddings
+
     def get_or_create_collection(self, company_name: str):
         """
         Get or create a collection for a specific company.
@@ -73,7 +99,7 @@ class VectorDB:
         
         return collection
     
-    def add_posts(self, company: str, chunks: List[Dict]) -> None:
+    def add_posts(self, company: str, chunks: List[Dict]) -> int:
         """
         Add posts to the vector database for a company.
         Automatically appends new posts and skips duplicates.
@@ -81,10 +107,13 @@ class VectorDB:
         Args:
             company: Company name
             chunks: List of chunks with 'text' and 'metadata'
+
+        Returns:
+            Number of chunks that failed to embed (and were not stored)
         """
         if not chunks:
             print("No chunks to add")
-            return
+            return 0
         
         collection = self.get_or_create_collection(company)
 
@@ -128,7 +157,7 @@ class VectorDB:
         
         if not new_chunks:
             print("No new posts to add (all were duplicates)")
-            return
+            return 0
         
         print(f"Adding {len(new_chunks)} new posts to vector database...")
         
@@ -136,6 +165,7 @@ class VectorDB:
         embeddings = []
         metadatas = []
         ids = []
+        failed = 0
         
         for idx, chunk in enumerate(new_chunks):
             text = chunk.get("text", "")
@@ -147,6 +177,7 @@ class VectorDB:
                 embedding = self._generate_embedding(text)
             except Exception as e:
                 print(f"  ⚠ Failed to embed post {idx + 1}: {e}", flush=True)
+                failed += 1
                 continue
             
             documents.append(text)
@@ -176,8 +207,9 @@ class VectorDB:
                     )
                 else:
                     raise
-            print(f"Successfully added {len(new_chunks)} new posts!")
+            print(f"Successfully added {len(documents)} new posts!")
             print(f"Total posts in database: {collection.count()}")
+        return failed
 
     @staticmethod
     def _chunk_text(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
@@ -220,7 +252,8 @@ class VectorDB:
         """
         Add raw texts with metadata to the vector database for a company.
         Used by orchestrator to store AI agent outputs.
-        Automatically chunks long texts before embedding.
+        Automatically chunks long texts, then embeds all chunks in batches
+        and adds them in one write.
         """
         if not texts or len(texts) != len(metadatas):
             print("Invalid inputs to add_texts")
@@ -228,10 +261,9 @@ class VectorDB:
             
         collection = self.get_or_create_collection(company)
         
-        documents = []
-        embeddings = []
-        valid_metadatas = []
-        ids = []
+        chunk_texts = []
+        chunk_metadatas = []
+        chunk_ids = []
         
         for idx, text in enumerate(texts):
             if not text:
@@ -241,15 +273,29 @@ class VectorDB:
             text_chunks = self._chunk_text(text)
             
             for chunk_idx, chunk in enumerate(text_chunks):
-                try:
-                    embedding = self._generate_embedding(chunk)
-                    documents.append(chunk)
-                    embeddings.append(embedding)
-                    meta = {**metadatas[idx], "chunk_index": chunk_idx, "total_chunks": len(text_chunks)}
-                    valid_metadatas.append(meta)
-                    ids.append(f"{company}_ai_{hash(chunk)}_{chunk_idx}")
-                except Exception as e:
-                    print(f"Failed to embed text {idx} chunk {chunk_idx}: {e}")
+                chunk_id = f"{company}_ai_{hash(chunk)}_{chunk_idx}"
+                if chunk_id in chunk_ids:
+                    continue  # identical chunk earlier in this batch
+                chunk_texts.append(chunk)
+                chunk_metadatas.append({**metadatas[idx], "chunk_index": chunk_idx, "total_chunks": len(text_chunks)})
+                chunk_ids.append(chunk_id)
+
+        documents = []
+        embeddings = []
+        valid_metadatas = []
+        ids = []
+
+        for start in range(0, len(chunk_texts), EMBED_BATCH_SIZE):
+            end = start + EMBED_BATCH_SIZE
+            try:
+                batch_embeddings = self._generate_embeddings(chunk_texts[start:end])
+            except Exception as e:
+                print(f"Failed to embed text chunks {start + 1}-{min(end, len(chunk_texts))}: {e}")
+                continue
+            documents.extend(chunk_texts[start:end])
+            embeddings.extend(batch_embeddings)
+            valid_metadatas.extend(chunk_metadatas[start:end])
+            ids.extend(chunk_ids[start:end])
                 
         if documents:
             try:
@@ -337,6 +383,11 @@ class VectorDB:
         except Exception as e:
             print(f"Error deleting collection: {e}")
     
+    def scraped_doc_ids(self, company_name: str) -> List[str]:
+        """Sorted ids of the company's scraped posts and pages, leaving out agent insights."""
+        collection = self.get_or_create_collection(company_name)
+        return sorted(collection.get(where=_SCRAPED_ONLY, include=[])["ids"])
+
     def get_company_stats(self, company_name: str) -> Dict:
         """
         Get statistics about stored data for a company.
@@ -0,0 +1,129 @@
+"""
+HTML Parser Benchmark
+---------------------
+Runs the html_extract backends over the saved HTML fixtures and reports
+pages/sec, peak memory and whether each backend's output matches the
+html.parser reference.
+
+Fixtures are picked up by filename prefix from benchmarks/fixtures/html/:
+  website_*.html   → extract_page
+  linkedin_*.html  → extract_linkedin
+  instagram_*.html → extract_og_meta + extract_hrefs
+
+Each backend runs in its own process so peak RSS is not shared.
+
+Usage:
+    python -m benchmarks.html_parsers [--iterations 50] [--fixtures DIR]
+"""
+
+import argparse
+import json
+import multiprocessing
+import re
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils import html_extract
+from app.domain.scraping.linkedin_service import POST_SELECTORS, LIMIT
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+
+
+def _extract(kind: str, html: str, backend: str):
+    if kind == "website":
+        return html_extract.extract_page(html, backend)
+    if kind == "linkedin":
+        return html_extract.extract_linkedin(html, POST_SELECTORS, LIMIT, backend)
+    return {
+        "meta": html_extract.extract_og_meta(html, backend),
+        "hrefs": html_extract.extract_hrefs(html, backend),
+    }
+
+
+def _load_fixtures(fixtures_dir: Path) -> list[tuple[str, str, str]]:
+    fixtures = []
+    for path in sorted(fixtures_dir.glob("*.html")):
+        kind = path.name.split("_", 1)[0]
+        if kind in ("website", "linkedin", "instagram"):
+            fixtures.append((path.name, kind, path.read_text(encoding="utf-8")))
+    return fixtures
+
+
+def _normalise(value) -> str:
+    """Whitespace-insensitive canonical form used to compare backend outputs."""
+    return re.sub(r"\s+", " ", json.dumps(value, sort_keys=True))
+
+
+def _run_backend(backend: str, fixtures_dir: str, iterations: int, queue):
+    fixtures = _load_fixtures(Path(fixtures_dir))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Warm up (imports, selector compilation)
+    for _, kind, html in fixtures:
+        _extract(kind, html, backend)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for _, kind, html in fixtures:
+            _extract(kind, html, backend)
+    elapsed = time.perf_counter() - started
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    outputs = {name: _normalise(_extract(kind, html, backend)) for name, kind, html in fixtures}
+
+    queue.put({
+        "backend": backend,
+        "pages": iterations * len(fixtures),
+        "seconds": elapsed,
+        "pages_per_sec": iterations * len(fixtures) / elapsed if elapsed else 0.0,
+        "py_peak_kb": py_peak / 1024,
+        "rss_growth_kb": rss_after - rss_before,  # ru_maxrss is KB on Linux
+        "outputs": outputs,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--fixtures", default=str(FIXTURES_DIR))
+    args = parser.parse_args()
+
+    fixtures = _load_fixtures(Path(args.fixtures))
+    if not fixtures:
+        print(f"No fixtures found in {args.fixtures}")
+        return
+    total_kb = sum(len(html.encode("utf-8")) for _, _, html in fixtures) / 1024
+    print(f"{len(fixtures)} fixtures ({total_kb:.0f} KB), {args.iterations} iterations each\n")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for backend in html_extract.available_backends():
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run_backend, args=(backend, args.fixtures, args.iterations, queue))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+
+    reference = next(r for r in results if r["backend"] == "html.parser")["outputs"]
+
+    print(f"{'backend':<12} {'pages/sec':>10} {'speedup':>8} {'py peak KB':>11} {'RSS +KB':>9}  matches html.parser")
+    base = results[0]["pages_per_sec"]
+    for r in results:
+        mismatched = [name for name, out in r["outputs"].items() if out != reference[name]]
+        match = "all" if not mismatched else f"differs: {', '.join(mismatched)}"
+        print(
+            f"{r['backend']:<12} {r['pages_per_sec']:>10.1f} {r['pages_per_sec'] / base:>7.1f}x "
+            f"{r['py_peak_kb']:>11.0f} {r['rss_growth_kb']:>9}  {match}"
+        )
+
+
+if __name__ == "__main__":
+    main()
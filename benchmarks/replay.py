@@ -0,0 +1,235 @@
+"""
+Scraper Replay Stand-in
+-----------------------
+A local HTTP server that answers scraper traffic from recorded fixtures
+instead of the live sites, so scrapers can be benchmarked and regression
+tested offline.
+
+Fixtures are either:
+  - saved DOM: a routes.json mapping original URLs (fnmatch patterns
+    allowed) to HTML files, see benchmarks/fixtures/replay/routes.json
+  - HAR files, e.g. recorded with SCRAPE_RECORD_HAR_DIR=<dir> set while
+    running a scraper against the live site
+
+Browser scrapers reach the stand-in through SCRAPE_REPLAY_URL (see
+app/utils/stealth_browser.py), which forwards each request as
+/__replay__?url=<original URL>. Plain HTTP clients such as the website
+scraper are pointed at the stand-in directly; those requests are looked up
+under the fixture set's `site_origin`.
+
+Unknown URLs get a 404. Bytes served, requests and HTML pages are counted
+for the benchmark, see `stats`.
+
+Usage (serve fixtures for manual runs):
+    python -m benchmarks.replay [--routes FILE | --har FILE ...] [--port 8900]
+"""
+
+import argparse
+import base64
+import fnmatch
+import json
+import mimetypes
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urldefrag, urlsplit
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+ROUTES_FILE = FIXTURES_DIR / "replay" / "routes.json"
+
+# (status, headers, body)
+Response = Tuple[int, Dict[str, str], bytes]
+
+# Headers that describe the recorded transfer rather than the body we serve
+_HOP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _html_response(body: bytes) -> Response:
+    return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+
+
+def load_routes(spec: Dict, base_dir: Path = FIXTURES_DIR) -> Dict[str, Response]:
+    """Saved-DOM fixtures: {url or pattern: file relative to base_dir} -> responses."""
+    responses = {}
+    for url, file_name in spec.items():
+        path = base_dir / file_name
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type == "text/html":
+            responses[url] = _html_response(path.read_bytes())
+        else:
+            responses[url] = (200, {"Content-Type": content_type}, path.read_bytes())
+    return responses
+
+
+def load_har(path: Path) -> Dict[str, Response]:
+    """HAR 1.2 fixtures: the last response recorded for each GET URL."""
+    with open(path, "r", encoding="utf-8") as f:
+        har = json.load(f)
+
+    responses = {}
+    for entry in har.get("log", {}).get("entries", []):
+        request, response = entry["request"], entry["response"]
+        if request.get("method", "GET") != "GET" or response.get("status", 0) <= 0:
+            continue
+        content = response.get("content", {})
+        text = content.get("text", "")
+        body = base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+        headers = {
+            h["name"]: h["value"] for h in response.get("headers", [])
+            if h["name"].lower() not in _HOP_HEADERS and not h["name"].startswith(":")
+        }
+        if content.get("mimeType"):
+            headers["Content-Type"] = content["mimeType"]
+        responses[urldefrag(request["url"])[0]] = (response["status"], headers, body)
+    return responses
+
+
+class ReplayStats:
+    """Counters for what the stand-in served since the last reset."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.misses = 0
+            self.pages = 0
+            self.bytes_served = 0
+            self.missed_urls: List[str] = []
+
+    def record(self, url: str, status: int, content_type: str, size: int):
+        with self._lock:
+            self.requests += 1
+            self.bytes_served += size
+            if status == 404:
+                self.misses += 1
+                if len(self.missed_urls) < 20:
+                    self.missed_urls.append(url)
+            elif status == 200 and content_type.startswith("text/html"):
+                self.pages += 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "pages": self.pages,
+                "misses": self.misses,
+                "bytes_served": self.bytes_served,
+            }
+
+
+class ReplayServer:
+    """Threaded stand-in serving one fixture set at a time."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.responses: Dict[str, Response] = {}
+        self.patterns: List[Tuple[str, Response]] = []
+        self.site_origin: Optional[str] = None
+        self.stats = ReplayStats()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def load(self, responses: Dict[str, Response], site_origin: Optional[str] = None):
+        """Replace the served fixtures. `site_origin` is where direct requests are looked up."""
+        # Only "*" marks a pattern; "?" and "[" occur in recorded query strings
+        self.responses = {url: r for url, r in responses.items() if "*" not in url}
+        self.patterns = [(url, r) for url, r in responses.items() if "*" in url]
+        self.site_origin = site_origin.rstrip("/") if site_origin else None
+        self.stats.reset()
+
+    def lookup(self, url: str) -> Optional[Response]:
+        url = urldefrag(url)[0]
+        if url.startswith(self.url) and self.site_origin:
+            # A render of a page on the stand-in itself (website scraper fallback)
+            url = self.site_origin + url[len(self.url):]
+        for candidate in (url, url.rstrip("/"), url.rstrip("/") + "/", url.split("?", 1)[0]):
+            if candidate in self.responses:
+                return self.responses[candidate]
+        for pattern, response in self.patterns:
+            if fnmatch.fnmatchcase(url, pattern):
+                return response
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path == "/__replay__":
+                    original = parse_qs(parts.query).get("url", [""])[0]
+                elif server.site_origin:
+                    original = server.site_origin + self.path
+                else:
+                    original = self.path
+
+                status, headers, body = server.lookup(original) or (404, {"Content-Type": "text/plain"}, b"")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.stats.record(original, status, headers.get("Content-Type", ""), len(body))
+
+            def log_message(self, format, *args):
+                pass  # the scrapers' own logs are noisy enough
+
+        return Handler
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", default=str(ROUTES_FILE), help="routes.json with saved-DOM fixture sets")
+    parser.add_argument("--har", action="append", default=[], help="HAR file(s) to serve instead of --routes")
+    parser.add_argument("--site-origin", help="Origin direct requests are looked up under")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+
+    responses: Dict[str, Response] = {}
+    site_origin = args.site_origin
+    if args.har:
+        for path in args.har:
+            responses.update(load_har(Path(path)))
+    else:
+        with open(args.routes, "r", encoding="utf-8") as f:
+            for name, fixture_set in json.load(f).items():
+                responses.update(load_routes(fixture_set["routes"]))
+                if name == "website":
+                    site_origin = site_origin or fixture_set["target"]
+
+    server = ReplayServer(port=args.port)
+    server.load(responses, site_origin)
+    server.start()
+    print(f"[Replay] Serving {len(responses)} fixture URLs at {server.url}")
+    print(f"[Replay] Run scrapers with SCRAPE_REPLAY_URL={server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Scraper Replay Benchmark
+------------------------
+Runs scrape_instagram, scrape_linkedin, get_twitter_data and scrape_website
+against recorded fixtures served by the replay stand-in (benchmarks/replay.py)
+and reports, per scraper:
+
+  wall time       scraper call only, interpreter start-up excluded
+  pages/sec       HTML pages served by the stand-in per second of wall time
+  KB served       bytes the stand-in sent (bodies)
+  browser MB      peak RSS of the Chromium processes the scrape launched
+  items           posts/pages returned, checked against the fixture set's
+                  expect_items so a broken parser fails the run
+
+Each scrape runs in a fresh Python process in a scratch directory, so
+caches, high-water marks and LinkedIn session state never leak between
+runs (or into data/). Scrape capture archiving is off. Note that the
+scrapers' fixed waits (page settle, scroll delays) dominate wall time;
+compare runs against each other rather than reading absolute numbers.
+
+Exits non-zero if any scraper fails or returns fewer items than expected,
+so it can gate CI. Needs Playwright's Chromium (`playwright install chromium`).
+
+Usage:
+    python -m benchmarks.scrapers [--platforms instagram,linkedin,twitter,website]
+        [--iterations 1] [--routes FILE] [--har PLATFORM=FILE ...] [--json FILE]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.replay import ReplayServer, ROUTES_FILE, load_routes, load_har
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PLATFORMS = ("instagram", "linkedin", "twitter", "website")
+
+# Where each scraper puts the list the benchmark counts as items
+ITEMS_KEYS = {
+    "instagram": "last_10_posts_and_reels",
+    "linkedin": "recent_posts",
+    "twitter": "posts",
+    "website": "pages",
+}
+
+_BROWSER_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+# ── Child process: one scrape ───────────────────────────────────────────
+
+def _scrape_error(platform: str, result: Dict) -> Optional[str]:
+    if platform == "instagram":
+        return result.get("profile", {}).get("error")
+    if platform == "linkedin":
+        return result.get("company_info", {}).get("error")
+    return None
+
+
+def _run_one(platform: str, target: str, result_path: str):
+    """Entry point of the per-scrape child process (see _spawn)."""
+    import asyncio
+
+    if platform == "linkedin":
+        # An empty storage state stands in for the logged-in session
+        Path(os.environ["LINKEDIN_SESSION_FILE"]).write_text('{"cookies": [], "origins": []}')
+
+    async def run() -> Tuple[float, Dict]:
+        if platform == "instagram":
+            from app.domain.scraping.instagram_service import scrape_instagram as scrape
+        elif platform == "linkedin":
+            from app.domain.scraping.linkedin_service import scrape_linkedin as scrape
+        elif platform == "twitter":
+            from app.domain.scraping.twitter_service import get_twitter_data as scrape
+        else:
+            from app.domain.scraping.website_scraper import scrape_website
+            scrape = lambda url: scrape_website(url, force_refresh=True)
+        from app.utils.stealth_browser import close_shared_browser
+
+        started = time.perf_counter()
+        try:
+            result = await scrape(target)
+        finally:
+            await close_shared_browser()
+        return time.perf_counter() - started, result
+
+    seconds, result = asyncio.run(run())
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "seconds": seconds,
+            "items": len(result.get(ITEMS_KEYS[platform]) or []),
+            "error": _scrape_error(platform, result),
+            "traffic": result.get("traffic"),
+        }, f)
+
+
+# ── Parent: memory sampling ─────────────────────────────────────────────
+
+def _process_table() -> Dict[int, Tuple[int, str]]:
+    """{pid: (ppid, name)} from /proc; empty where /proc isn't available."""
+    table = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            raw = stat.read_text()
+        except OSError:
+            continue
+        name = raw[raw.index("(") + 1:raw.rindex(")")]
+        ppid = int(raw[raw.rindex(")") + 2:].split()[1])
+        table[int(stat.parent.name)] = (ppid, name)
+    return table
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        pages = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _tree_rss(root_pid: int) -> Tuple[int, int]:
+    """(RSS of the whole process tree, RSS of its browser processes) in bytes."""
+    table = _process_table()
+    children: Dict[int, list] = {}
+    for pid, (ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+
+    total = browser = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        rss = _rss_bytes(pid)
+        total += rss
+        name = table.get(pid, (0, ""))[1].lower()
+        if any(b in name for b in _BROWSER_PROCESS_NAMES):
+            browser += rss
+        stack.extend(children.get(pid, []))
+    return total, browser
+
+
+class _MemorySampler(threading.Thread):
+    """Tracks the peak RSS of a process tree until stopped."""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_total = 0
+        self.peak_browser = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            total, browser = _tree_rss(self.pid)
+            self.peak_total = max(self.peak_total, total)
+            self.peak_browser = max(self.peak_browser, browser)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ── Parent: benchmark ───────────────────────────────────────────────────
+
+def _spawn(platform: str, target: str, replay_url: str, timeout: float) -> Dict:
+    """Run one scrape in a fresh process against the stand-in; returns its measurements."""
+    with tempfile.TemporaryDirectory(prefix=f"scrape-bench-{platform}-") as workdir:
+        result_path = os.path.join(workdir, "result.json")
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])),
+            "SCRAPE_REPLAY_URL": replay_url,
+            "SCRAPE_CAPTURE_ARCHIVE": "false",
+            "LINKEDIN_SESSION_FILE": os.path.join(workdir, "linkedin_session.json"),
+        }
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.scrapers", "--run-one", platform, target, result_path],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        sampler = _MemorySampler(proc.pid)
+        sampler.start()
+        try:
+            _, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            _, stderr = proc.communicate()
+            stderr = f"timed out after {timeout:g}s\n{stderr}"
+        finally:
+            sampler.stop()
+
+        if proc.returncode != 0 or not os.path.exists(result_path):
+            lines = (stderr or "").strip().splitlines()
+            return {"error": lines[-1] if lines else f"exit code {proc.returncode}"}
+        with open(result_path, "r", encoding="utf-8") as f:
+            run = json.load(f)
+        run["peak_rss_mb"] = sampler.peak_total / 1024 / 1024
+        run["browser_peak_mb"] = sampler.peak_browser / 1024 / 1024
+        return run
+
+
+def _fixture_set(platform: str, routes: Dict, har_files: Dict[str, str]):
+    fixture_set = routes[platform]
+    if platform in har_files:
+        responses = load_har(Path(har_files[platform]))
+    else:
+        responses = load_routes(fixture_set["routes"])
+    return fixture_set, responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--platforms", default=",".join(PLATFORMS))
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--routes", default=str(ROUTES_FILE))
+    parser.add_argument("--har", action="append", default=[], metavar="PLATFORM=FILE",
+                        help="Replay a recorded HAR for a platform instead of its saved DOM")
+    parser.add_argument("--timeout", type=float, default=600, help="Per-scrape timeout in seconds")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--run-one", nargs=3, metavar=("PLATFORM", "TARGET", "RESULT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        _run_one(*args.run_one)
+        return
+
+    with open(args.routes, "r", encoding="utf-8") as f:
+        routes = json.load(f)
+    har_files = dict(spec.split("=", 1) for spec in args.har)
+    platforms = [p.strip() for p in args.platforms.split(",") if p.strip()]
+
+    server = ReplayServer().start()
+    print(f"Replay stand-in at {server.url}, {args.iterations} iteration(s) per scraper\n")
+
+    report = {}
+    failed = False
+    try:
+        for platform in platforms:
+            fixture_set, responses = _fixture_set(platform, routes, har_files)
+            site_origin = fixture_set["target"] if platform == "website" else None
+            # The website scraper talks HTTP directly, so it is pointed at the stand-in itself
+            target = server.url if platform == "website" else fixture_set["target"]
+
+            runs = []
+            for i in range(args.iterations):
+                server.load(responses, site_origin)
+                run = _spawn(platform, target, server.url, args.timeout)
+                run.update(server.stats.summary())
+                runs.append(run)
+                status = f"error: {run['error']}" if run.get("error") else f"{run['items']} items"
+                print(f"  {platform} run {i + 1}: {status}")
+
+            ok_runs = [r for r in runs if not r.get("error")]
+            expected = fixture_set.get("expect_items", 0)
+            if not ok_runs:
+                report[platform] = {"ok": False, "error": runs[-1]["error"]}
+                failed = True
+                continue
+
+            seconds = statistics.median(r["seconds"] for r in ok_runs)
+            pages = statistics.median(r["pages"] for r in ok_runs)
+            items = min(r["items"] for r in ok_runs)
+            ok = len(ok_runs) == len(runs) and items >= expected
+            failed = failed or not ok
+            report[platform] = {
+                "ok": ok,
+                "seconds": round(seconds, 2),
+                "pages": pages,
+                "pages_per_sec": round(pages / seconds, 2) if seconds else 0.0,
+                "kb_served": round(statistics.median(r["bytes_served"] for r in ok_runs) / 1024, 1),
+                "requests": statistics.median(r["requests"] for r in ok_runs),
+                "misses": max(r["misses"] for r in ok_runs),
+                "browser_peak_mb": round(max(r["browser_peak_mb"] for r in ok_runs), 1),
+                "peak_rss_mb": round(max(r["peak_rss_mb"] for r in ok_runs), 1),
+                "items": items,
+                "expected_items": expected,
+            }
+    finally:
+        server.stop()
+
+    print(f"\n{'scraper':<10} {'wall s':>8} {'pages':>6} {'pages/s':>8} {'KB served':>10} "
+          f"{'browser MB':>11} {'total MB':>9} {'items':>9}")
+    for platform, r in report.items():
+        if "error" in r:
+            print(f"{platform:<10} FAILED: {r['error']}")
+            continue
+        items = f"{r['items']}/{r['expected_items']}" + ("" if r["ok"] else " ✗")
+        print(f"{platform:<10} {r['seconds']:>8.1f} {r['pages']:>6g} {r['pages_per_sec']:>8.2f} "
+              f"{r['kb_served']:>10.0f} {r['browser_peak_mb']:>11.0f} {r['peak_rss_mb']:>9.0f} {items:>9}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
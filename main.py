@@ -8,9 +8,17 @@ import os
 import requests
 
 from app.domain.brand.company_resolver import CompanyResolver
-from app.domain.brand.scraping_orchestrator import ScrapingOrchestrator
+from app.domain.brand.scraping_orchestrator import ScrapingOrchestrator, POSTS_KEYS
 from app.utils.text_processor import TextProcessor
 from app.utils.vector_db import VectorDB
+from app.utils.stealth_browser import close_shared_browser
+from app.domain.scraping.linkedin_session import session_health
+from app.domain.scraping.scrape_scheduler import scrape_scheduler
+from app.utils.llm_cache import llm_cache
+from app.utils.semantic_cache import semantic_cache
+from app.agents.orchestrator import graph, wait_for_memory_writes
+from app.utils.graph_checkpointer import open_checkpointer
+from app.domain.campaign.job_runner import campaign_jobs
 
 from app.api.routes.brand import router as brand_router
 from app.api.routes.campaign import router as campaign_router
@@ -26,6 +34,26 @@ app.include_router(publish_router)
 def read_root():
     return {"message": "Backend is running"}
 
+
+@app.on_event("startup")
+async def start_linkedin_session_refresh():
+    app.state.linkedin_session_refresh = asyncio.create_task(session_health.refresh_loop())
+    app.state.checkpointer = await open_checkpointer(graph)
+    if app.state.checkpointer:
+        app.state.checkpoint_sweep = asyncio.create_task(app.state.checkpointer.sweep_loop())
+    await campaign_jobs.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_shared_browser():
+    app.state.linkedin_session_refresh.cancel()
+    await campaign_jobs.stop()
+    await close_shared_browser()
+    await wait_for_memory_writes()
+    if app.state.checkpointer:
+        app.state.checkpoint_sweep.cancel()
+        await app.state.checkpointer.close()
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -48,6 +76,7 @@ class ScrapeCompanyRequest(BaseModel):
     instagram_handle: Optional[str] = None
     linkedin_url: Optional[str] = None
     twitter_handle: Optional[str] = None
+    force_refresh: bool = False
 
 
 class SearchRequest(BaseModel):
@@ -83,37 +112,49 @@ async def scrape_company(request: ScrapeCompanyRequest):
 
         print(f"Resolved handles: {handles}\n")
 
-        print("Step 2: Scraping social media platforms...")
-        scraped_data = await ScrapingOrchestrator.scrape_all_platforms(
+        print("Step 2: Scraping social media platforms, embedding each as it finishes...")
+        scraped_data = {}
+        chunks_created = 0
+        async for platform, data in ScrapingOrchestrator.scrape_platforms_as_completed(
             instagram_handle=handles.get("instagram"),
-            linkedin_url=handles.get("linkedin"),
-            twitter_handle=handles.get("twitter")
-        )
+            linkedin_handle=handles.get("linkedin"),
+            twitter_handle=handles.get("twitter"),
+            force_refresh=request.force_refresh,
+            brand=request.company_name
+        ):
+            scraped_data[platform] = data
+            posts = data.get(POSTS_KEYS.get(platform, ""), [])
+            print(f"\n{platform}: {len(posts)} posts scraped")
+
+            print(f"Step 3: Processing and chunking {platform} text...")
+            chunks = text_processor.process_all_platforms({platform: data}, request.company_name)
+            failed = 0
+            if chunks:
+                print(f"Step 4: Embedding {len(chunks)} {platform} chunks into vector DB...")
+                failed = await asyncio.to_thread(vector_db.add_posts, request.company_name, chunks)
+                chunks_created += len(chunks) - failed
+            # Only ingested posts count as seen; failed ones come back in the next delta
+            if not failed:
+                ScrapingOrchestrator.record_high_water_marks(platform, handles[platform], data)
 
         if not scraped_data:
             raise HTTPException(status_code=500, detail="Failed to scrape any platform")
 
-        print("\nSCRAPED DATA SUMMARY:")
-        for platform, data in scraped_data.items():
-            if platform == "instagram":
-                posts = data.get("last_10_posts_and_reels", [])
-            elif platform == "linkedin":
-                posts = data.get("recent_posts", [])
-            elif platform == "twitter":
-                posts = data.get("posts", [])
-            else:
-                posts = []
-            print(f"  {platform}: {len(posts)} posts")
-
-        print("\nStep 3: Processing and chunking text...")
-        chunks = text_processor.process_all_platforms(scraped_data, request.company_name)
-
-        if not chunks:
+        if not chunks_created:
+            # Incremental scrapes only return posts newer than the last run
+            stats = vector_db.get_company_stats(request.company_name)
+            if stats["total_posts"]:
+                return {
+                    "success": True,
+                    "company": request.company_name,
+                    "handles": handles,
+                    "platforms_scraped": list(scraped_data.keys()),
+                    "chunks_created": 0,
+                    "total_posts_in_db": stats["total_posts"],
+                    "message": "No new posts since the last scrape"
+                }
             raise HTTPException(status_code=500, detail="No valid content found to process")
 
-        print("\nStep 4: Generating embeddings and storing in vector DB...")
-        vector_db.add_posts(request.company_name, chunks)
-
         stats = vector_db.get_company_stats(request.company_name)
 
         print(f"\nPipeline complete for {request.company_name}!")
@@ -123,9 +164,9 @@ async def scrape_company(request: ScrapeCompanyRequest):
             "company": request.company_name,
             "handles": handles,
             "platforms_scraped": list(scraped_data.keys()),
-            "chunks_created": len(chunks),
+            "chunks_created": chunks_created,
             "total_posts_in_db": stats["total_posts"],
-            "message": f"Successfully scraped and stored {len(chunks)} posts"
+            "message": f"Successfully scraped and stored {chunks_created} posts"
         }
 
     except HTTPException:
@@ -170,6 +211,25 @@ async def get_company_stats(company_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/scrape-scheduler/metrics")
+async def get_scrape_scheduler_metrics():
+    """Per-platform scrape slots, queue depth and wait times."""
+    return {"success": True, "platforms": scrape_scheduler.metrics()}
+
+
+@app.get("/api/campaign-jobs/metrics")
+async def get_campaign_job_metrics():
+    """Background campaign workers: running campaign ids and queue depth."""
+    return {"success": True, "jobs": campaign_jobs.metrics()}
+
+
+@app.get("/api/llm-cache/stats")
+async def get_llm_cache_stats():
+    """LLM response cache hit rates (overall and per caller), size and evictions,
+    plus the AI Brain semantic cache hit rates per agent."""
+    return {"success": True, "cache": llm_cache.stats(), "semantic": semantic_cache.stats()}
+
+
 @app.get("/api/list-companies")
 async def list_companies():
     """List all companies in the database."""
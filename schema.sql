@@ -21,6 +21,9 @@ CREATE TABLE IF NOT EXISTS campaigns (
     ai_brain            JSONB,
     generated_content   JSONB,                         
     status              VARCHAR(50) DEFAULT 'draft',   
+    progress            JSONB,                         -- per-node pipeline progress (job runner)
+    worker_id           VARCHAR(100),                  -- job runner process holding the campaign
+    heartbeat_at        TIMESTAMP,                     -- last heartbeat of that process
     created_at          TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -40,3 +43,12 @@ CREATE TABLE IF NOT EXISTS brand_social_credentials (
 CREATE INDEX IF NOT EXISTS idx_campaigns_brand_id  ON campaigns(brand_id);
 CREATE INDEX IF NOT EXISTS idx_campaigns_status    ON campaigns(status);
 CREATE INDEX IF NOT EXISTS idx_brands_company      ON brands(company_name);
+
+-- LangGraph checkpoints: langgraph-checkpoint-postgres creates and migrates its own tables
+-- (checkpoints, checkpoint_blobs, checkpoint_writes, checkpoint_migrations) on app startup.
+-- The graph_checkpoint* tables of the earlier custom checkpointer are no longer read and can be dropped.
+
+-- Databases created before the job runner columns existed (the job runner also runs this on startup)
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS progress JSONB;
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS worker_id VARCHAR(100);
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP;